@@ -139,6 +139,47 @@ MEDIA_ROOT = BASE_DIR / "media"
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Cache
+# Wajib backend bersama (Redis, service `redis` di docker-compose) untuk
+# deployment dengan lebih dari satu proses: versi indeks ketersediaan,
+# versi katalog dan purge cache halaman disimpan di sini, dan container
+# scheduler harus bisa menginvalidasi cache milik worker gunicorn.
+# Default LocMemCache hanya aman untuk satu proses (runserver, test).
+CACHES = {
+    "default": {
+        "BACKEND": config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        "LOCATION": config('CACHE_LOCATION', default='unique-snowflake'),
+        "TIMEOUT": config('CACHE_TIMEOUT', default=300, cast=int),
+    }
+}
+
+# Indeks ketersediaan in-memory per ruangan (rooms/availability.py)
+AVAILABILITY_INDEX_ENABLED = config('AVAILABILITY_INDEX_ENABLED', default=True, cast=bool)
+
+# Katalog ruangan aktif di cache bersama, ditambah LRU per proses (rooms/catalog.py)
+ROOM_CATALOG_ENABLED = config('ROOM_CATALOG_ENABLED', default=True, cast=bool)
+ROOM_CATALOG_LOCAL_CACHE = config('ROOM_CATALOG_LOCAL_CACHE', default=True, cast=bool)
+
+# Fragmen HTML kartu ruangan di cache, dikunci id ruangan + updated_at (rooms/templatetags/room_cards.py)
+ROOM_CARD_CACHE_ENABLED = config('ROOM_CARD_CACHE_ENABLED', default=True, cast=bool)
+
+# Cache halaman penuh untuk pengunjung anonim (home, daftar & detail ruangan; rooms/pagecache.py)
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=True, cast=bool)
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Pencarian ruangan memakai indeks FULLTEXT di MySQL (rooms/search.py, migrasi 0009)
+ROOM_SEARCH_FULLTEXT = config('ROOM_SEARCH_FULLTEXT', default=True, cast=bool)
+
+# Booking final (selesai/dibatalkan/ditolak) yang berakhir lebih lama dari ini
+# dipindahkan ke tabel arsip oleh command archive_bookings
+BOOKING_ARCHIVE_AFTER_DAYS = config('BOOKING_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+
+# Jam operasional untuk pencarian slot kosong (waktu lokal, HH:MM)
+BOOKING_BUSINESS_HOURS = (
+    config('BUSINESS_HOURS_START', default='07:00'),
+    config('BUSINESS_HOURS_END', default='18:00'),
+)
+
 # Login URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = '/'
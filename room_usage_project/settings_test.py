@@ -75,6 +75,10 @@ CACHES = {
     }
 }
 
+# Cache halaman anonim tidak dipurge di TestCase (on_commit tidak dijalankan),
+# jadi dimatikan kecuali test yang mengaktifkannya sendiri
+PAGE_CACHE_ENABLED = False
+
 # Security settings for testing
 SECURE_SSL_REDIRECT = False
 SESSION_COOKIE_SECURE = False
@@ -1,11 +1,15 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import Count
 from django.utils.html import format_html
-from .models import Room, Booking, BookingHistory
+from .models import (
+    ArchivedBooking, ArchivedBookingHistory, Booking, BookingHistory, BookingSeries, Facility, Room,
+    RoomDailyStats,
+)
 
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
     list_display = ['name', 'location', 'capacity', 'is_active', 'created_at']
-    list_filter = ['is_active', 'location', 'created_at']
+    list_filter = ['is_active', 'location', 'facility_tags', 'created_at']
     search_fields = ['name', 'location', 'description']
     list_editable = ['is_active']
     readonly_fields = ['created_at', 'updated_at']
@@ -48,8 +52,45 @@ class BookingAdmin(admin.ModelAdmin):
         }),
     )
     
+    actions = ['approve_selected', 'reject_selected']
+    
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user', 'room', 'approved_by')
+    
+    @admin.action(description='Setujui booking pending yang dipilih')
+    def approve_selected(self, request, queryset):
+        actor_name = request.user.get_full_name() or request.user.username
+        approved, conflicts = Booking.objects.bulk_approve(
+            list(queryset.values_list('pk', flat=True)), request.user,
+            notes=f'Booking disetujui oleh {actor_name} (massal)'
+        )
+        self.message_user(request, f'{len(approved)} booking berhasil disetujui.', messages.SUCCESS)
+        if conflicts:
+            pairs = ', '.join(f'#{a} & #{b}' for a, b in conflicts)
+            self.message_user(
+                request,
+                f'Booking berikut tidak disetujui karena jadwalnya bertumpukan: {pairs}',
+                messages.WARNING,
+            )
+    
+    @admin.action(description='Tolak booking pending yang dipilih')
+    def reject_selected(self, request, queryset):
+        actor_name = request.user.get_full_name() or request.user.username
+        rejected = Booking.objects.bulk_transition(
+            list(queryset.values_list('pk', flat=True)), 'pending', 'rejected', request.user,
+            notes=f'Booking ditolak oleh {actor_name} (massal)'
+        )
+        self.message_user(request, f'{len(rejected)} booking berhasil ditolak.', messages.SUCCESS)
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = ['title', 'room', 'user', 'frequency', 'interval', 'start_datetime', 'until', 'count']
+    list_filter = ['frequency', 'room', 'created_at']
+    search_fields = ['title', 'user__username', 'room__name']
+    readonly_fields = ['created_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'room')
 
 @admin.register(BookingHistory)
 class BookingHistoryAdmin(admin.ModelAdmin):
@@ -63,3 +104,69 @@ class BookingHistoryAdmin(admin.ModelAdmin):
     
     def has_change_permission(self, request, obj=None):
         return False
+
+@admin.register(Facility)
+class FacilityAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'room_count']
+    search_fields = ['name', 'slug']
+    # Slug menghubungkan tag dengan teks fasilitas ruangan; nama tampilan boleh diubah
+    readonly_fields = ['slug']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(room_count=Count('rooms'))
+    
+    @admin.display(description='Jumlah Ruangan', ordering='room_count')
+    def room_count(self, obj):
+        return obj.room_count
+    
+    # Tag dibuat dari teks fasilitas saat Room disimpan
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(RoomDailyStats)
+class RoomDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['date', 'room', 'booked_minutes', 'booking_count', 'approved_count',
+                    'pending_count', 'peak_participants']
+    list_filter = ['room', 'date']
+    date_hierarchy = 'date'
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('room')
+    
+    # Rollup hanya ditulis oleh rooms.rollups (perbaiki dengan rebuild_rollups)
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class ArchivedBookingHistoryInline(admin.TabularInline):
+    model = ArchivedBookingHistory
+    fields = ['created_at', 'old_status', 'new_status', 'changed_by', 'notes']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ['id', 'title', 'room', 'user', 'start_datetime', 'status', 'archived_at']
+    list_filter = ['status', 'room', 'start_datetime']
+    search_fields = ['title', 'user__username', 'room__name']
+    date_hierarchy = 'start_datetime'
+    inlines = [ArchivedBookingHistoryInline]
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'room')
+    
+    # Arsip hanya ditulis oleh command archive_bookings
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,243 @@
+"""
+Room Utilization Analytics for Room Booking System
+Occupancy, peak hours, lead time and capacity waste with NumPy
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import F, Func, IntegerField
+from django.utils import timezone
+
+from .rollups import USED_STATUSES
+
+# Try to import numpy; analytics are unavailable without it
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+HOURS_PER_WEEK = 168
+MAX_RANGE_DAYS = 366
+PEAK_HOURS = 5
+
+# 1970-01-01 adalah hari Kamis: jam ke-0 epoch = jam ke-72 dalam minggu (Senin = 0)
+EPOCH_HOUR_OF_WEEK = 3 * 24
+
+
+class Epoch(Func):
+    """
+    Detik sejak epoch (UTC) sebagai integer, dihitung di database
+
+    Mengambil integer jauh lebih murah daripada membuat objek datetime
+    per baris, dan langsung bisa dimasukkan ke array NumPy.
+    """
+    output_field = IntegerField()
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        # Kolom DATETIME disimpan dalam UTC; hindari UNIX_TIMESTAMP yang bergantung zona sesi
+        return self.as_sql(
+            compiler, connection,
+            template="TIMESTAMPDIFF(SECOND, '1970-01-01 00:00:00', %(expressions)s)",
+            **extra_context
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template="CAST(strftime('%%%%s', %(expressions)s) AS INTEGER)",
+            **extra_context
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='EXTRACT(EPOCH FROM %(expressions)s)::bigint',
+            **extra_context
+        )
+
+
+def date_range_bounds(start_date, end_date):
+    """Batas aware [awal start_date, akhir end_date) pada waktu lokal"""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def load_bookings(start, end, room_ids=None, include_archive=False):
+    """
+    Ambil booking terpakai yang bertumpukan dengan [start, end) sebagai array
+
+    Satu query per tabel (Booking, dan ArchivedBooking jika diminta) yang
+    memproyeksikan kolom integer saja (epoch detik), lalu diubah menjadi
+    kolom-kolom array NumPy.
+    """
+    from .models import ArchivedBooking, Booking
+
+    rows = []
+    for model in (Booking, ArchivedBooking) if include_archive else (Booking,):
+        bookings = model.objects.filter(
+            status__in=USED_STATUSES,
+            start_datetime__lt=end,
+            end_datetime__gt=start,
+        )
+        if room_ids is not None:
+            bookings = bookings.filter(room_id__in=room_ids)
+        rows.extend(bookings.order_by().values_list(
+            'room_id',
+            Epoch('start_datetime'),
+            Epoch('end_datetime'),
+            Epoch('created_at'),
+            'participants',
+            F('room__capacity'),
+        ))
+    data = np.array(rows, dtype=np.int64).reshape(-1, 6)
+    return {
+        'room_id': data[:, 0],
+        'start': data[:, 1],
+        'end': data[:, 2],
+        'created': data[:, 3],
+        'participants': data[:, 4],
+        'capacity': data[:, 5],
+    }
+
+
+def _utc_offsets(epochs, start, end):
+    """
+    Offset zona waktu lokal (detik) untuk setiap epoch
+
+    Offset diambil per hari di rentang lalu dipetakan dengan searchsorted,
+    sehingga pergantian DST tetap benar tanpa loop per booking.
+    """
+    tz = timezone.get_current_timezone()
+    days = [start + timedelta(days=i) for i in range((end - start).days + 2)]
+    boundaries = np.array([int(day.timestamp()) for day in days], dtype=np.int64)
+    offsets = np.array([int(timezone.localtime(day, tz).utcoffset().total_seconds()) for day in days],
+                       dtype=np.int64)
+    positions = np.clip(np.searchsorted(boundaries, epochs, side='right') - 1, 0, len(days) - 1)
+    return offsets[positions]
+
+
+def _hour_of_week_counts(start, end):
+    """Berapa kali setiap jam-dalam-minggu muncul di [start, end)"""
+    first = int(start.timestamp()) // 3600
+    hours = np.arange(first, int(end.timestamp()) // 3600, dtype=np.int64)
+    local = hours * 3600 + _utc_offsets(hours * 3600, start, end)
+    how = (local // 3600 + EPOCH_HOUR_OF_WEEK) % HOURS_PER_WEEK
+    return np.bincount(how, minlength=HOURS_PER_WEEK)
+
+
+def aggregate(data, rooms, start, end):
+    """
+    Hitung metrik utilisasi dari array booking
+
+    `rooms` adalah daftar (room_id, name, capacity). Semua perhitungan
+    memakai operasi array: booking dipecah menjadi potongan per jam
+    dengan np.repeat, lalu dijumlahkan per (ruangan, jam-dalam-minggu)
+    dengan satu np.bincount.
+    """
+    room_ids = np.array([room[0] for room in rooms], dtype=np.int64)
+    room_count = len(rooms)
+    range_start, range_end = int(start.timestamp()), int(end.timestamp())
+
+    # Indeks ruangan 0..n-1 untuk setiap booking (booking di luar daftar dibuang)
+    if room_count:
+        order = np.argsort(room_ids)
+        sorted_ids = room_ids[order]
+        clipped = np.minimum(np.searchsorted(sorted_ids, data['room_id']), room_count - 1)
+        known = sorted_ids[clipped] == data['room_id']
+        room_index = order[clipped[known]]
+    else:
+        known = np.zeros(len(data['room_id']), dtype=bool)
+        room_index = np.zeros(0, dtype=np.int64)
+    booking_start = np.maximum(data['start'][known], range_start)
+    booking_end = np.minimum(data['end'][known], range_end)
+    participants = data['participants'][known].astype(np.float64)
+    capacity = data['capacity'][known].astype(np.float64)
+    lead_seconds = (data['start'][known] - data['created'][known]).astype(np.float64)
+    duration = (booking_end - booking_start).astype(np.float64)
+
+    # Geser ke waktu lokal, lalu pecah setiap booking per jam
+    offset = _utc_offsets(booking_start, start, end)
+    local_start = booking_start + offset
+    local_end = booking_end + offset
+    first_hour = local_start // 3600
+    hour_spans = np.maximum(-(-local_end // 3600) - first_hour, 0)
+    piece_owner = np.repeat(np.arange(len(first_hour)), hour_spans)
+    piece_offsets = np.arange(len(piece_owner)) - np.repeat(np.cumsum(hour_spans) - hour_spans, hour_spans)
+    piece_hour = first_hour[piece_owner] + piece_offsets
+    piece_seconds = (
+        np.minimum(local_end[piece_owner], (piece_hour + 1) * 3600)
+        - np.maximum(local_start[piece_owner], piece_hour * 3600)
+    )
+    piece_how = (piece_hour + EPOCH_HOUR_OF_WEEK) % HOURS_PER_WEEK
+    occupied = np.bincount(
+        room_index[piece_owner] * HOURS_PER_WEEK + piece_how,
+        weights=piece_seconds,
+        minlength=room_count * HOURS_PER_WEEK,
+    ).reshape(room_count, HOURS_PER_WEEK)
+
+    available = _hour_of_week_counts(start, end) * 3600.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        room_occupancy = np.where(available > 0, occupied / available, 0.0)
+        overall_by_hour = np.where(
+            available > 0, occupied.sum(axis=0) / (available * max(room_count, 1)), 0.0
+        )
+
+    per_room_bookings = np.bincount(room_index, minlength=room_count)
+    per_room_seconds = np.bincount(room_index, weights=duration, minlength=room_count)
+    per_room_lead = np.bincount(room_index, weights=lead_seconds, minlength=room_count)
+    ratio = np.divide(participants, capacity, out=np.zeros_like(participants), where=capacity > 0)
+    per_room_ratio = np.bincount(room_index, weights=ratio, minlength=room_count)
+    wasted_seat_hours = np.maximum(capacity - participants, 0) * duration / 3600
+    per_room_waste = np.bincount(room_index, weights=wasted_seat_hours, minlength=room_count)
+    total_available = float(available.sum())
+
+    def mean(total, count):
+        return round(float(total) / count, 4) if count else None
+
+    peak = np.argsort(overall_by_hour, kind='stable')[::-1][:PEAK_HOURS]
+    return {
+        'start': timezone.localtime(start).date().isoformat(),
+        'end': (timezone.localtime(end).date() - timedelta(days=1)).isoformat(),
+        'bookings': int(len(room_index)),
+        'overall': {
+            'occupancy': mean(per_room_seconds.sum(), total_available * room_count),
+            'avg_lead_time_hours': mean(lead_seconds.sum() / 3600, len(lead_seconds)),
+            'capacity_utilization': mean(ratio.sum(), len(ratio)),
+            'wasted_seat_hours': round(float(wasted_seat_hours.sum()), 2),
+        },
+        'peak_hours': [
+            {'weekday': int(how // 24), 'hour': int(how % 24), 'occupancy': round(float(overall_by_hour[how]), 4)}
+            for how in peak if overall_by_hour[how] > 0
+        ],
+        'hour_of_week': [round(float(value), 4) for value in overall_by_hour],
+        'rooms': [
+            {
+                'room_id': room_id,
+                'name': name,
+                'capacity': room_capacity,
+                'bookings': int(per_room_bookings[i]),
+                'occupancy': mean(per_room_seconds[i], total_available),
+                'avg_lead_time_hours': mean(per_room_lead[i] / 3600, per_room_bookings[i]),
+                'capacity_utilization': mean(per_room_ratio[i], per_room_bookings[i]),
+                'wasted_seat_hours': round(float(per_room_waste[i]), 2),
+                'hour_of_week': [round(float(value), 4) for value in room_occupancy[i]],
+            }
+            for i, (room_id, name, room_capacity) in enumerate(rooms)
+        ],
+    }
+
+
+def room_utilization(start_date, end_date, room_ids=None, include_archive=False):
+    """Metrik utilisasi untuk tanggal lokal start_date..end_date (inklusif)"""
+    from .models import Room
+
+    start, end = date_range_bounds(start_date, end_date)
+    rooms = Room.objects.filter(is_active=True)
+    if room_ids is not None:
+        rooms = rooms.filter(pk__in=room_ids)
+    rooms = list(rooms.values_list('pk', 'name', 'capacity'))
+    data = load_bookings(start, end, [room[0] for room in rooms], include_archive)
+    return aggregate(data, rooms, start, end)
@@ -0,0 +1,94 @@
+"""
+Booking Archive for Room Booking System
+Moves finished bookings and their history into archive tables in small transactions
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .concurrency import retry_on_deadlock
+
+# Hanya booking yang sudah final yang boleh dipindahkan
+ARCHIVE_STATUSES = ('completed', 'cancelled', 'rejected')
+
+ARCHIVE_CHUNK_SIZE = 500
+
+BOOKING_COLUMNS = (
+    'id', 'user_id', 'room_id', 'title', 'description', 'start_datetime', 'end_datetime',
+    'participants', 'status', 'notes', 'approved_by_id', 'approved_at', 'series_id',
+    'created_at', 'updated_at',
+)
+HISTORY_COLUMNS = ('id', 'booking_id', 'old_status', 'new_status', 'changed_by_id', 'notes', 'created_at')
+
+
+def archive_cutoff(now=None):
+    """Booking yang berakhir sebelum waktu ini boleh diarsipkan (BOOKING_ARCHIVE_AFTER_DAYS)"""
+    days = getattr(settings, 'BOOKING_ARCHIVE_AFTER_DAYS', 365)
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def archivable(cutoff):
+    from .models import Booking
+
+    return Booking.objects.filter(status__in=ARCHIVE_STATUSES, end_datetime__lt=cutoff)
+
+
+@retry_on_deadlock()
+def archive_chunk(pks):
+    """
+    Pindahkan satu potongan booking beserta riwayatnya dalam satu transaksi
+
+    Baris dikunci lalu disalin dengan bulk_create dan dihapus dengan DELETE
+    berbasis himpunan. Penghapusan tidak mengirim signal Booking: booking
+    final tidak ada di indeks ketersediaan, dan rollup harian menghitung
+    kedua tabel. Mengembalikan jumlah booking yang dipindahkan.
+    """
+    from .models import ArchivedBooking, ArchivedBookingHistory, Booking, BookingHistory
+
+    with transaction.atomic():
+        rows = list(
+            Booking.objects.select_for_update()
+            .filter(pk__in=pks, status__in=ARCHIVE_STATUSES)
+            .order_by('pk')
+            .values(*BOOKING_COLUMNS)
+        )
+        if not rows:
+            return 0
+        booking_ids = [row['id'] for row in rows]
+        history = list(
+            BookingHistory.objects.filter(booking_id__in=booking_ids).order_by().values(*HISTORY_COLUMNS)
+        )
+        ArchivedBooking.objects.bulk_create(ArchivedBooking(**row) for row in rows)
+        ArchivedBookingHistory.objects.bulk_create(ArchivedBookingHistory(**row) for row in history)
+        BookingHistory.objects.filter(booking_id__in=booking_ids).delete()
+        # _raw_delete: satu DELETE tanpa memuat instance dan tanpa signal per baris
+        bookings = Booking.objects.filter(pk__in=booking_ids)
+        bookings._raw_delete(bookings.db)
+    return len(booking_ids)
+
+
+def archive_bookings(cutoff=None, chunk_size=ARCHIVE_CHUNK_SIZE, limit=None):
+    """
+    Arsipkan booking final yang berakhir sebelum `cutoff`
+
+    Setiap potongan (urut pk) berjalan di transaksinya sendiri, jadi lock
+    hanya ditahan sebentar dan proses boleh dihentikan kapan saja.
+    Mengembalikan jumlah booking yang dipindahkan.
+    """
+    cutoff = cutoff or archive_cutoff()
+    archived = 0
+    last_pk = 0
+    while limit is None or archived < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - archived)
+        pks = list(
+            archivable(cutoff).filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:size]
+        )
+        if pks:
+            archived += archive_chunk(pks)
+        if len(pks) < size:
+            break
+        last_pk = pks[-1]
+    return archived
@@ -0,0 +1,349 @@
+"""
+Availability Engine for Room Booking System
+In-memory interval index of active bookings per room
+"""
+
+import bisect
+import random
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Status booking yang menempati ruangan (dipakai juga oleh cek konflik)
+ACTIVE_STATUSES = ('approved', 'pending')
+
+VERSION_KEY = 'availability:room:{room_id}:version'
+
+# Booking yang sudah lewat lebih dari ini tidak dimuat ke indeks;
+# pertanyaan untuk waktu sebelum horizon dijawab langsung dari database.
+LOOKBACK = timedelta(days=1)
+
+
+class RoomIntervals:
+    """
+    Sorted interval arrays for one room.
+
+    Intervals are kept sorted by start together with a running maximum of
+    the end times, so an overlap query is a bisect plus a short walk over
+    the intervals that actually overlap: O(log n + k).
+    """
+
+    def __init__(self, rows, version=None, horizon=None):
+        rows = sorted(rows, key=lambda row: row[1])
+        self.ids = [row[0] for row in rows]
+        self.starts = [row[1] for row in rows]
+        self.ends = [row[2] for row in rows]
+        self.max_ends = []
+        running = None
+        for end in self.ends:
+            running = end if running is None or end > running else running
+            self.max_ends.append(running)
+        self.version = version
+        self.horizon = horizon
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows(self):
+        return zip(self.ids, self.starts, self.ends)
+
+    def conflicts(self, start, end, exclude_id=None):
+        """Yield ids of intervals overlapping [start, end)"""
+        index = bisect.bisect_left(self.starts, end) - 1
+        while index >= 0 and self.max_ends[index] > start:
+            if self.ends[index] > start and self.ids[index] != exclude_id:
+                yield self.ids[index]
+            index -= 1
+
+    def overlaps(self, start, end, exclude_id=None):
+        return next(self.conflicts(start, end, exclude_id), None) is not None
+
+    def covers(self, start):
+        """Apakah indeks memuat semua booking yang relevan untuk waktu ini"""
+        return self.horizon is None or start >= self.horizon
+
+    def replace(self, booking_id, start=None, end=None):
+        """Return a copy with booking_id removed and, if given, re-added"""
+        rows = [row for row in self.rows() if row[0] != booking_id]
+        if start is not None and end is not None:
+            rows.append((booking_id, start, end))
+        return RoomIntervals(rows, version=self.version, horizon=self.horizon)
+
+
+class AvailabilityIndex:
+    """
+    Per-process cache of RoomIntervals.
+
+    Every room has a version counter in the shared cache. Writes bump the
+    counter after commit, and each worker compares its local copy against
+    the counter before answering, so gunicorn workers never answer from
+    stale intervals (as long as CACHES points to a shared backend).
+    """
+
+    def __init__(self):
+        self._rooms = {}
+
+    def clear(self):
+        self._rooms = {}
+
+    def get(self, room_id):
+        version = current_version(room_id)
+        intervals = self._rooms.get(room_id)
+        if intervals is None or intervals.version != version:
+            intervals = self._load(room_id, version)
+            self._rooms[room_id] = intervals
+        return intervals
+
+    def _load(self, room_id, version):
+        from .models import Booking
+
+        horizon = timezone.now() - LOOKBACK
+        rows = Booking.objects.filter(
+            room_id=room_id,
+            status__in=ACTIVE_STATUSES,
+            end_datetime__gt=horizon,
+        ).order_by().values_list('pk', 'start_datetime', 'end_datetime')
+        return RoomIntervals(rows, version=version, horizon=horizon)
+
+    def apply(self, room_id, booking_id, start=None, end=None):
+        """Perbarui salinan lokal lalu naikkan versi bersama (setelah commit)"""
+        intervals = self._rooms.get(room_id)
+        if intervals is None:
+            bump_version(room_id)
+            return
+        updated = intervals.replace(booking_id, start, end)
+        version = bump_version(room_id)
+        if version == intervals.version + 1:
+            # Tidak ada penulis lain di antaranya: salinan lokal tetap valid
+            updated.version = version
+            self._rooms[room_id] = updated
+        else:
+            self.discard(room_id)
+
+    def discard(self, room_id):
+        self._rooms.pop(room_id, None)
+
+    def invalidate(self, room_id):
+        self.discard(room_id)
+        bump_version(room_id)
+
+
+index = AvailabilityIndex()
+
+
+def index_enabled():
+    return getattr(settings, 'AVAILABILITY_INDEX_ENABLED', True)
+
+
+def current_version(room_id):
+    key = VERSION_KEY.format(room_id=room_id)
+    version = cache.get(key)
+    if version is None:
+        # Nilai awal acak agar versi lama tidak "cocok" lagi setelah cache dikosongkan
+        cache.add(key, random.getrandbits(48), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(room_id):
+    key = VERSION_KEY.format(room_id=room_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, random.getrandbits(48), None)
+        return cache.get(key)
+
+
+def index_usable():
+    """
+    Indeks hanya dipakai di luar transaksi.
+
+    Di dalam transaksi database adalah sumber kebenaran: perubahan yang
+    belum di-commit tidak boleh masuk ke indeks bersama, dan pengecekan
+    di bawah lock harus melihat data terbaru.
+    """
+    return index_enabled() and not transaction.get_connection().in_atomic_block
+
+
+def has_conflict(room_id, start, end, exclude_id=None, use_index=True):
+    """
+    Cek apakah ada booking aktif yang bertumpukan dengan [start, end)
+
+    Dijawab dari indeks in-memory jika tersedia, selain itu dari database.
+    """
+    if use_index and index_usable():
+        intervals = index.get(room_id)
+        if intervals.covers(start):
+            return intervals.overlaps(start, end, exclude_id)
+
+    from .models import Booking
+
+    conflicting_bookings = Booking.objects.filter(
+        room_id=room_id,
+        status__in=ACTIVE_STATUSES,
+        start_datetime__lt=end,
+        end_datetime__gt=start,
+    )
+    if exclude_id:
+        conflicting_bookings = conflicting_bookings.exclude(pk=exclude_id)
+    return conflicting_bookings.exists()
+
+
+def availability_matrix(room_ids, windows):
+    """
+    Hitung ketersediaan banyak ruangan x banyak jendela waktu
+
+    Satu range query untuk semua ruangan, lalu tiap sel dijawab dengan
+    bisect pada RoomIntervals. Mengembalikan {room_id: [bool, ...]} dengan
+    urutan sesuai `windows`.
+    """
+    from .models import Booking
+
+    if not room_ids or not windows:
+        return {room_id: [] for room_id in room_ids}
+
+    range_start = min(start for start, _ in windows)
+    range_end = max(end for _, end in windows)
+    rows = Booking.objects.filter(
+        room_id__in=room_ids,
+        status__in=ACTIVE_STATUSES,
+        start_datetime__lt=range_end,
+        end_datetime__gt=range_start,
+    ).order_by().values_list('room_id', 'pk', 'start_datetime', 'end_datetime')
+
+    per_room = defaultdict(list)
+    for room_id, pk, start, end in rows:
+        per_room[room_id].append((pk, start, end))
+
+    matrix = {}
+    for room_id in room_ids:
+        intervals = RoomIntervals(per_room.get(room_id, ()))
+        matrix[room_id] = [not intervals.overlaps(start, end) for start, end in windows]
+    return matrix
+
+
+def overlapping_pairs(rows):
+    """
+    Cari pasangan booking yang saling bertumpukan dalam satu kumpulan
+
+    `rows` berisi (pk, room_id, start, end). Diurutkan per ruangan lalu
+    disapu sekali sambil menyimpan interval yang masih terbuka, sehingga
+    biayanya O(n log n + k) untuk k pasangan.
+    """
+    pairs = []
+    open_intervals = []
+    current_room = None
+    for pk, room_id, start, end in sorted(rows, key=lambda row: (row[1], row[2])):
+        if room_id != current_room:
+            current_room, open_intervals = room_id, []
+        open_intervals = [item for item in open_intervals if item[1] > start]
+        pairs.extend((other, pk) for other, _ in open_intervals)
+        open_intervals.append((pk, end))
+    return pairs
+
+
+def business_hours():
+    """Jam operasional (mulai, selesai) dari settings, waktu lokal"""
+    start, end = getattr(settings, 'BOOKING_BUSINESS_HOURS', ('07:00', '18:00'))
+    return time.fromisoformat(start), time.fromisoformat(end)
+
+
+def _open_periods(search_start, search_end, hours=None):
+    """Rentang waktu yang boleh dipakai, dipotong per hari bila ada jam operasional"""
+    if hours is None:
+        yield search_start, search_end
+        return
+
+    tz = timezone.get_current_timezone()
+    day = timezone.localtime(search_start).date()
+    while True:
+        period_start = timezone.make_aware(datetime.combine(day, hours[0]), tz)
+        if period_start >= search_end:
+            return
+        period_end = timezone.make_aware(datetime.combine(day, hours[1]), tz)
+        period_start = max(period_start, search_start)
+        period_end = min(period_end, search_end)
+        if period_start < period_end:
+            yield period_start, period_end
+        day += timedelta(days=1)
+
+
+def _round_up(moment, step):
+    """Bulatkan ke atas ke kelipatan `step` (mis. 15 menit) di waktu lokal"""
+    local = timezone.localtime(moment)
+    midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    remainder = (local - midnight) % step
+    return moment if not remainder else moment + (step - remainder)
+
+
+def find_free_slots(room_id, duration, search_start, search_end, limit=5,
+                    hours=None, step=timedelta(minutes=15)):
+    """
+    Cari jendela kosong berikutnya yang muat untuk `duration`
+
+    Booking aktif ruangan dalam rentang pencarian diambil sekali (urut
+    waktu mulai) lalu disapu bersama rentang jam operasional dalam satu
+    lintasan. Mengembalikan daftar (mulai, selesai) celah kosong; booking
+    baru dapat dimulai kapan saja di dalam celah selama muat `duration`.
+    """
+    from .models import Booking
+
+    search_start = _round_up(search_start, step)
+    rows = list(Booking.objects.filter(
+        room_id=room_id,
+        status__in=ACTIVE_STATUSES,
+        start_datetime__lt=search_end,
+        end_datetime__gt=search_start,
+    ).order_by('start_datetime').values_list('start_datetime', 'end_datetime'))
+
+    slots = []
+    i, n = 0, len(rows)
+    for period_start, period_end in _open_periods(search_start, search_end, hours):
+        cursor = period_start
+        while cursor < period_end:
+            # Lewati booking yang sudah selesai sebelum cursor
+            while i < n and rows[i][1] <= cursor:
+                i += 1
+            next_start = rows[i][0] if i < n else None
+            if next_start is None or next_start >= period_end:
+                gap_end = period_end
+            else:
+                gap_end = next_start
+            if gap_end - cursor >= duration:
+                slots.append((cursor, gap_end))
+                if len(slots) >= limit:
+                    return slots
+            if gap_end == period_end:
+                break
+            # Booking yang melewati akhir periode tetap diperhitungkan di periode berikutnya
+            cursor = _round_up(max(cursor, rows[i][1]), step)
+    return slots
+
+
+def booking_changed(booking, deleted=False):
+    """Dipanggil dari signal Booking untuk menjaga indeks tetap terkini"""
+    booking_id = booking.pk
+    room_id = booking.room_id
+    active = not deleted and booking.status in ACTIVE_STATUSES
+    start, end = booking.start_datetime, booking.end_datetime
+    loaded_room_id = getattr(booking, '_loaded_values', {}).get('room_id')
+
+    def update():
+        if active:
+            index.apply(room_id, booking_id, start, end)
+        else:
+            index.apply(room_id, booking_id)
+        if loaded_room_id is not None and loaded_room_id != room_id:
+            index.apply(loaded_room_id, booking_id)
+
+    transaction.on_commit(update)
+
+
+def invalidate_rooms(room_ids):
+    """Buang salinan lokal dan naikkan versi ruangan setelah commit (update massal)"""
+    for room_id in set(room_ids):
+        transaction.on_commit(lambda room_id=room_id: index.invalidate(room_id))
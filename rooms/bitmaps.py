@@ -0,0 +1,309 @@
+"""
+Slot Bitmaps for Room Booking System
+One 96-bit integer per room per day (15-minute slots) for fast availability checks
+"""
+
+import bisect
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .availability import ACTIVE_STATUSES, VERSION_KEY, current_version, index_usable
+from .rollups import day_start
+
+SLOT = timedelta(minutes=15)
+SLOTS_PER_DAY = 96
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+BITMAP_BYTES = SLOTS_PER_DAY // 8
+
+BITMAP_KEY = 'bitmaps:room:{room_id}:{version}:{day}'
+BITMAP_TIMEOUT = 24 * 60 * 60
+
+# Batas entri (ruangan, hari) yang disimpan per proses
+MAX_LOCAL_ENTRIES = 50000
+
+
+def _slot_position(moment, day):
+    """(indeks slot, tepat di batas slot?) dari `moment` relatif ke awal hari lokal"""
+    offset = moment - day_start(day)
+    return offset // SLOT, not offset % SLOT
+
+
+def day_masks(start, end):
+    """
+    Yield (tanggal lokal, mask, covered) untuk setiap hari yang disentuh [start, end)
+
+    Bit i pada `mask` menandai slot ke-i yang bertumpukan dengan rentang;
+    `covered` hanya memuat slot yang seluruhnya berada di dalam rentang.
+    """
+    day = timezone.localtime(start).date()
+    while True:
+        lower = day_start(day)
+        if lower >= end:
+            return
+        upper = day_start(day + timedelta(days=1))
+        first, first_aligned = _slot_position(max(start, lower), day)
+        last, last_aligned = _slot_position(min(end, upper), day)
+        last = min(last if last_aligned else last + 1, SLOTS_PER_DAY)
+        if first < last:
+            covered_first = first if first_aligned else first + 1
+            covered_last = last if last_aligned else last - 1
+            yield day, _bits(first, last), _bits(covered_first, covered_last)
+        day += timedelta(days=1)
+
+
+def _bits(first, last):
+    """Mask slot first..last-1"""
+    return ((1 << (last - first)) - 1) << first if first < last else 0
+
+
+def build(rows):
+    """Bitmap {(room_id, tanggal): int} dari baris (room_id, start, end)"""
+    bitmaps = defaultdict(int)
+    for room_id, start, end in rows:
+        if start < end:
+            for day, mask, _ in day_masks(start, end):
+                bitmaps[room_id, day] |= mask
+    return bitmaps
+
+
+def encode(bits):
+    return bits.to_bytes(BITMAP_BYTES, 'big')
+
+
+def decode(value):
+    return int.from_bytes(value, 'big')
+
+
+def free_runs(bits, min_slots=1):
+    """Yield (slot pertama, slot setelah terakhir) untuk setiap deret slot kosong"""
+    free = ~bits & FULL_DAY
+    while free:
+        first = (free & -free).bit_length() - 1
+        # Menambah 1 di bit terendah menghapus deret bit 1 pertama dan
+        # membawa carry ke satu bit di atas ujung deret tersebut
+        carried = free + (1 << first)
+        last = (carried & ~free).bit_length() - 1
+        if last - first >= min_slots:
+            yield first, last
+        free &= carried
+
+
+class BitmapStore:
+    """
+    Bitmap per (ruangan, hari) dengan dua lapis cache
+
+    Salinan per proses diberi versi ruangan yang sama dengan AvailabilityIndex,
+    jadi setiap penulisan booking (yang menaikkan versi setelah commit)
+    otomatis membuatnya usang. Lapis kedua adalah cache bersama: 12 byte
+    per (ruangan, versi, hari), dibaca dan ditulis dengan get_many/set_many.
+    Sisanya diambil dari database dengan satu range query.
+    """
+
+    def __init__(self):
+        self._local = {}
+
+    def clear(self):
+        self._local = {}
+
+    def get_many(self, room_ids, days):
+        """{(room_id, tanggal): int} untuk semua kombinasi ruangan x hari"""
+        versions = room_versions(room_ids)
+        result = {}
+        missing = []
+        for room_id in room_ids:
+            for day in days:
+                entry = self._local.get((room_id, day))
+                if entry is not None and entry[0] == versions[room_id]:
+                    result[room_id, day] = entry[1]
+                else:
+                    missing.append((room_id, day))
+        if not missing:
+            return result
+
+        keys = {
+            BITMAP_KEY.format(room_id=room_id, version=versions[room_id], day=day.isoformat()): (room_id, day)
+            for room_id, day in missing
+        }
+        cached = cache.get_many(list(keys))
+        loaded = {keys[key]: decode(value) for key, value in cached.items()}
+        unloaded = [item for item in missing if item not in loaded]
+        if unloaded:
+            fresh = self._load(unloaded)
+            loaded.update(fresh)
+            cache.set_many({
+                BITMAP_KEY.format(room_id=room_id, version=versions[room_id], day=day.isoformat()): encode(bits)
+                for (room_id, day), bits in fresh.items()
+            }, BITMAP_TIMEOUT)
+
+        if len(self._local) + len(loaded) > MAX_LOCAL_ENTRIES:
+            self._local = {}
+        for (room_id, day), bits in loaded.items():
+            self._local[room_id, day] = (versions[room_id], bits)
+        result.update(loaded)
+        return result
+
+    def _load(self, keys):
+        from .models import Booking
+
+        room_ids = {room_id for room_id, _ in keys}
+        first_day = min(day for _, day in keys)
+        last_day = max(day for _, day in keys)
+        rows = Booking.objects.filter(
+            room_id__in=room_ids,
+            status__in=ACTIVE_STATUSES,
+            start_datetime__lt=day_start(last_day + timedelta(days=1)),
+            end_datetime__gt=day_start(first_day),
+        ).order_by().values_list('room_id', 'start_datetime', 'end_datetime')
+        bitmaps = build(rows)
+        return {key: bitmaps.get(key, 0) for key in keys}
+
+
+store = BitmapStore()
+
+
+def room_versions(room_ids):
+    """Versi ruangan dari cache bersama, satu get_many untuk semua ruangan"""
+    keys = {VERSION_KEY.format(room_id=room_id): room_id for room_id in room_ids}
+    versions = {keys[key]: version for key, version in cache.get_many(list(keys)).items()}
+    for room_id in room_ids:
+        if room_id not in versions:
+            versions[room_id] = current_version(room_id)
+    return versions
+
+
+def window_states(room_ids, start, end):
+    """
+    Status [start, end) per ruangan dari bitmap: True kosong, False terisi,
+    None jika bitmap tidak bisa memastikan
+
+    Slot yang semuanya kosong berarti tidak ada booking yang bertumpukan.
+    Slot terisi yang seluruhnya di dalam rentang pasti bentrok; slot terisi
+    di ujung rentang yang tidak sejajar bisa saja hanya terisi di luar rentang.
+    """
+    masks = list(day_masks(start, end))
+    bitmaps = store.get_many(room_ids, [day for day, _, _ in masks])
+    states = {}
+    for room_id in room_ids:
+        state = True
+        for day, mask, covered in masks:
+            bits = bitmaps[room_id, day]
+            if bits & covered:
+                state = False
+                break
+            if bits & mask:
+                state = None
+        states[room_id] = state
+    return states
+
+
+def is_free(room_id, start, end):
+    """Jalur cepat cek ketersediaan: True/False, atau None jika harus cek database"""
+    if not index_usable() or start >= end:
+        return None
+    return window_states([room_id], start, end)[room_id]
+
+
+def availability_matrix(room_ids, windows):
+    """
+    Matriks ketersediaan {room_id: [bool, ...]} dengan jalur cepat bitmap
+
+    Sel yang tidak bisa dipastikan bitmap (jendela tidak sejajar slot yang
+    menyentuh slot terisi) dijawab oleh availability.availability_matrix
+    untuk ruangan yang bersangkutan saja.
+    """
+    from . import availability
+
+    if not index_usable() or not room_ids or not windows:
+        return availability.availability_matrix(room_ids, windows)
+
+    matrix = {room_id: [] for room_id in room_ids}
+    undecided = set()
+    for start, end in windows:
+        states = window_states(room_ids, start, end)
+        for room_id in room_ids:
+            matrix[room_id].append(states[room_id])
+            if states[room_id] is None:
+                undecided.add(room_id)
+    if undecided:
+        exact = availability.availability_matrix(sorted(undecided), windows)
+        for room_id in undecided:
+            matrix[room_id] = [
+                exact[room_id][i] if state is None else state
+                for i, state in enumerate(matrix[room_id])
+            ]
+    return matrix
+
+
+def day_grid(room_ids, days):
+    """
+    Grid ketersediaan untuk UI: {room_id: {tanggal ISO: hex 24 karakter}}
+
+    Setiap karakter hex mewakili 4 slot (1 jam); bit 1 = slot terisi, bit
+    terendah = slot pertama hari itu.
+    """
+    bitmaps = store.get_many(room_ids, days)
+    return {
+        room_id: {day.isoformat(): f'{bitmaps[room_id, day]:0{SLOTS_PER_DAY // 4}x}' for day in days}
+        for room_id in room_ids
+    }
+
+
+def find_free_slots(room_id, duration, search_start, search_end, limit=5, hours=None):
+    """
+    Jalur cepat availability.find_free_slots dari bitmap; None jika harus ke database
+
+    Slot kosong di dalam periode yang boleh dipakai (jam operasional) disapu
+    hari demi hari dan disambung melewati tengah malam. Slot yang menutup
+    sebuah celah bisa hanya sebagian terisi (booking mulai di tengah slot),
+    jadi ujung celah diambil dari waktu mulai tepat booking berikutnya di
+    indeks ketersediaan; hasilnya sama dengan sapuan database.
+    """
+    from .availability import _open_periods, _round_up, index
+
+    if not index_usable():
+        return None
+    search_start = _round_up(search_start, SLOT)
+    if search_start >= search_end:
+        return []
+    days = [day for day, _, _ in day_masks(search_start, search_end)]
+    bits = store.get_many([room_id], days)
+    intervals = None
+
+    def exact_end(run_end, period_end):
+        nonlocal intervals
+        if run_end >= period_end:
+            return run_end
+        if intervals is None:
+            intervals = index.get(room_id)
+        if intervals.covers(run_end):
+            position = bisect.bisect_left(intervals.starts, run_end)
+            next_start = intervals.starts[position] if position < len(intervals.starts) else None
+        else:
+            from .models import Booking
+            next_start = Booking.objects.filter(
+                room_id=room_id, status__in=ACTIVE_STATUSES, start_datetime__gte=run_end,
+            ).order_by('start_datetime').values_list('start_datetime', flat=True).first()
+        return min(next_start or period_end, period_end, run_end + SLOT)
+
+    slots = []
+    for period_start, period_end in _open_periods(search_start, search_end, hours):
+        runs = []
+        for day, _, allowed in day_masks(period_start, period_end):
+            blocked = bits[room_id, day] | (~allowed & FULL_DAY)
+            lower = day_start(day)
+            for first, last in free_runs(blocked):
+                gap_start, gap_end = lower + first * SLOT, lower + last * SLOT
+                if runs and runs[-1][1] == gap_start:
+                    runs[-1][1] = gap_end
+                else:
+                    runs.append([gap_start, gap_end])
+        for run_start, run_end in runs:
+            run_end = exact_end(run_end, period_end)
+            if run_end - run_start >= duration:
+                slots.append((run_start, run_end))
+                if len(slots) >= limit:
+                    return slots
+    return slots
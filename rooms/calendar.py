@@ -0,0 +1,90 @@
+"""
+Calendar Feeds for Room Booking System
+Range-bounded booking events and their HTTP validators
+"""
+
+from datetime import timedelta
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .availability import ACTIVE_STATUSES
+
+# Rentang maksimum satu permintaan feed (tampilan bulan FullCalendar ~6 minggu)
+CALENDAR_MAX_RANGE = timedelta(days=93)
+
+# Status yang ditampilkan di feed: booking aktif plus yang sudah selesai,
+# karena complete_past_bookings mengubah approved -> completed setelah berakhir
+DISPLAY_STATUSES = ACTIVE_STATUSES + ('completed',)
+
+EVENT_FIELDS = ('pk', 'room_id', 'room__name', 'title', 'start_datetime', 'end_datetime', 'status')
+
+EVENT_COLORS = {
+    'approved': '#198754',
+    'pending': '#ffc107',
+    'completed': '#6c757d',
+}
+
+
+def bookings_in_range(start, end, room_id=None):
+    """Semua booking (status apa pun) yang bertumpukan dengan [start, end)"""
+    from .models import Booking
+
+    bookings = Booking.objects.filter(start_datetime__lt=end, end_datetime__gt=start)
+    if room_id is not None:
+        bookings = bookings.filter(room_id=room_id)
+    return bookings.order_by()
+
+
+def events(start, end, room_id=None):
+    """
+    Event kalender untuk [start, end)
+
+    Satu range query yang hanya mengambil kolom yang ditampilkan;
+    hasilnya siap diserialisasi sebagai JSON (format event FullCalendar).
+    """
+    rows = bookings_in_range(start, end, room_id).filter(
+        status__in=DISPLAY_STATUSES
+    ).order_by('start_datetime').values_list(*EVENT_FIELDS)
+    return [
+        {
+            'id': pk,
+            'title': title,
+            'start': timezone.localtime(event_start).isoformat(),
+            'end': timezone.localtime(event_end).isoformat(),
+            'color': EVENT_COLORS.get(status),
+            'extendedProps': {'room_id': event_room_id, 'room': room_name, 'status': status},
+        }
+        for pk, event_room_id, room_name, title, event_start, event_end, status in rows
+    ]
+
+
+def feed_state(start, end, room_id=None):
+    """
+    Validator HTTP untuk feed: (etag, last_modified)
+
+    Dihitung dari satu agregat COUNT + MAX(updated_at) atas semua booking
+    di rentang tersebut, termasuk yang dibatalkan/ditolak, sehingga
+    perubahan status ikut mengubah validator. Jumlah baris menangkap
+    penghapusan yang tidak meninggalkan updated_at baru.
+    """
+    return queryset_validators(bookings_in_range(start, end, room_id))
+
+
+def queryset_validators(bookings):
+    """
+    (etag, last_modified) dari satu agregat COUNT + MAX(updated_at)
+
+    Nama ruangan ikut tampil di event (judul lokasi), jadi updated_at
+    ruangan juga dihitung: mengganti nama ruangan mengubah validator.
+    """
+    state = bookings.order_by().aggregate(
+        count=Count('pk'), last_modified=Max('updated_at'), room_modified=Max('room__updated_at'),
+    )
+    moments = [moment for moment in (state['last_modified'], state['room_modified']) if moment is not None]
+    last_modified = max(moments) if moments else None
+    stamps = '-'.join(
+        str(int(moment.timestamp() * 1_000_000)) if moment else '0'
+        for moment in (state['last_modified'], state['room_modified'])
+    )
+    return f"{state['count']}-{stamps}", last_modified
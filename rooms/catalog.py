@@ -0,0 +1,143 @@
+"""
+Room Catalog Cache for Room Booking System
+Versioned shared-cache copy of the active rooms with a per-process LRU in front
+"""
+
+import random
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'catalog:rooms:version'
+CATALOG_KEY = 'catalog:rooms:{version}'
+FACILITIES_KEY = 'catalog:facilities:{version}'
+CATALOG_TIMEOUT = 24 * 60 * 60
+
+# Versi katalog yang disimpan per proses (lebih dari satu saat ada penulisan beruntun)
+LOCAL_SIZE = 4
+
+
+class RoomCatalog:
+    """
+    Daftar ruangan aktif (urut nama) dan peta pk -> Room
+
+    Kunci cache bersama memuat nomor versi yang dinaikkan signal Room
+    setelah commit, jadi tidak pernah ada invalidasi eksplisit: versi baru
+    berarti kunci baru. LRU lokal menyimpan beberapa versi terakhir
+    sehingga halaman yang sering dibuka hanya membaca nomor versi.
+    """
+
+    def __init__(self, size=LOCAL_SIZE):
+        self.size = size
+        self._local = OrderedDict()
+
+    def clear(self):
+        self._local.clear()
+
+    def get(self):
+        """(daftar Room aktif, {pk: Room}) untuk versi saat ini"""
+        version = current_version()
+        entry = self._local.get(version)
+        if entry is not None:
+            self._local.move_to_end(version)
+            return entry
+
+        key = CATALOG_KEY.format(version=version)
+        rooms = cache.get(key)
+        if rooms is None:
+            rooms = load_rooms()
+            cache.set(key, rooms, CATALOG_TIMEOUT)
+        entry = (rooms, {room.pk: room for room in rooms})
+        if local_enabled():
+            self._local[version] = entry
+            while len(self._local) > self.size:
+                self._local.popitem(last=False)
+        return entry
+
+
+catalog = RoomCatalog()
+
+
+def catalog_enabled():
+    return getattr(settings, 'ROOM_CATALOG_ENABLED', True)
+
+
+def local_enabled():
+    return getattr(settings, 'ROOM_CATALOG_LOCAL_CACHE', True)
+
+
+def catalog_usable():
+    """
+    Sama seperti indeks ketersediaan: di dalam transaksi database adalah
+    sumber kebenaran, karena perubahan Room yang belum di-commit belum
+    menaikkan versi katalog.
+    """
+    return catalog_enabled() and not transaction.get_connection().in_atomic_block
+
+
+def load_rooms():
+    from .models import Room
+
+    return list(Room.objects.active().order_by('name'))
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Nilai awal acak agar katalog versi lama tidak "cocok" lagi setelah cache dikosongkan
+        cache.add(VERSION_KEY, random.getrandbits(48), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, random.getrandbits(48), None)
+        return cache.get(VERSION_KEY)
+
+
+def room_changed():
+    """Dipanggil dari signal Room: naikkan versi setelah commit"""
+    transaction.on_commit(bump_version)
+
+
+def active_rooms():
+    """Ruangan aktif (urut nama), dari katalog jika bisa"""
+    if not catalog_usable():
+        return load_rooms()
+    return catalog.get()[0]
+
+
+def get_active_room(pk):
+    """Room aktif dengan pk tersebut, atau None"""
+    if not catalog_usable():
+        from .models import Room
+        return Room.objects.active().filter(pk=pk).first()
+    return catalog.get()[1].get(pk)
+
+
+def load_facilities():
+    from .models import Facility
+
+    return list(Facility.objects.filter(rooms__is_active=True).distinct())
+
+
+def facility_options():
+    """
+    Fasilitas milik ruangan aktif (urut nama), untuk filter daftar ruangan
+
+    Disimpan di cache bersama di bawah versi katalog: tag fasilitas hanya
+    berubah lewat penulisan Room atau Facility, dan keduanya menaikkan versi.
+    """
+    if not catalog_usable():
+        return load_facilities()
+    key = FACILITIES_KEY.format(version=current_version())
+    facilities = cache.get(key)
+    if facilities is None:
+        facilities = load_facilities()
+        cache.set(key, facilities, CATALOG_TIMEOUT)
+    return facilities
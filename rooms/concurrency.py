@@ -0,0 +1,69 @@
+"""
+Concurrency Helpers for Room Booking System
+Per-room write serialization and deadlock retries
+"""
+
+import functools
+import logging
+import random
+import time
+
+from django.db import OperationalError, transaction
+
+logger = logging.getLogger(__name__)
+
+# MySQL: 1213 = deadlock terdeteksi, 1205 = lock wait timeout
+RETRYABLE_ERROR_CODES = {1213, 1205}
+
+
+def is_retryable(error):
+    return bool(error.args) and error.args[0] in RETRYABLE_ERROR_CODES
+
+
+def retry_on_deadlock(attempts=4, base_delay=0.05):
+    """
+    Retry decorator for transactional writes
+
+    Retries on MySQL deadlock / lock wait timeout with exponential backoff
+    and jitter. When called inside an outer transaction the error is
+    re-raised immediately, because only the outermost block can retry.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as error:
+                    if (not is_retryable(error)
+                            or attempt == attempts
+                            or transaction.get_connection().in_atomic_block):
+                        raise
+                    delay = base_delay * (2 ** (attempt - 1)) * (1 + random.random())
+                    logger.warning(
+                        f'Deadlock on {func.__qualname__} (attempt {attempt}/{attempts}), '
+                        f'retrying in {delay:.3f}s'
+                    )
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
+
+def lock_room(room_id):
+    """
+    Lock a Room row (SELECT ... FOR UPDATE) and return it
+
+    Must be called inside transaction.atomic(). Writers for the same room
+    queue behind each other; writers for different rooms do not block.
+    """
+    from .models import Room
+    return Room.objects.select_for_update().get(pk=room_id)
+
+
+def lock_rooms(room_ids):
+    """Lock several rooms in primary-key order to avoid lock-order deadlocks"""
+    from .models import Room
+    return {
+        room.pk: room
+        for room in Room.objects.select_for_update().filter(pk__in=set(room_ids)).order_by('pk')
+    }
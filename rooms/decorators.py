@@ -7,12 +7,14 @@ import functools
 import time
 from django.http import HttpResponseForbidden, JsonResponse
 from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
 from django.contrib.auth.decorators import user_passes_test
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib import messages
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
+
+from . import pagecache
 
 
 def rate_limit(requests_per_minute=60, per_ip=True, per_user=False):
@@ -220,23 +222,53 @@ def log_security_event(event_type):
     return decorator
 
 
-def cache_response(timeout=300):
+def cache_response(tags=(), timeout=None):
     """
-    Cache response decorator with security considerations
+    Full-page cache for anonymous visitors
+    
+    Logged-in users, non-GET/HEAD requests and requests with pending flash
+    messages always reach the view. Entries are keyed by path, query string,
+    language and the current versions of `tags` (see rooms.pagecache), so
+    room and booking writes purge them by bumping a tag version instead of
+    deleting keys. Only 200 responses without cookies are stored.
     
     Args:
-        timeout: Cache timeout in seconds
+        tags: Iterable of tags, or a callable (request, *args, **kwargs) returning one
+        timeout: Cache timeout in seconds (default: PAGE_CACHE_TIMEOUT)
     """
     def decorator(view_func):
-        @cache_page(timeout)
-        @vary_on_headers('User-Agent', 'Accept-Language')
         @functools.wraps(view_func)
         def wrapper(request, *args, **kwargs):
-            # Don't cache responses for authenticated users by default
-            if request.user.is_authenticated:
+            if (
+                not pagecache.page_cache_enabled()
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+                or messages.get_messages(request)
+            ):
                 return view_func(request, *args, **kwargs)
             
-            return view_func(request, *args, **kwargs)
+            page_tags = tags(request, *args, **kwargs) if callable(tags) else tags
+            cache_key = pagecache.page_key(request, page_tags)
+            response = cache.get(cache_key)
+            if response is not None:
+                # Answer conditional requests from the stored validators
+                return get_conditional_response(
+                    request,
+                    etag=response.get('ETag'),
+                    last_modified=parse_http_date_safe(response.get('Last-Modified')),
+                    response=response,
+                )
+            
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming or response.cookies:
+                return response
+            
+            page_timeout = pagecache.page_cache_timeout() if timeout is None else timeout
+            if hasattr(response, 'render') and callable(response.render):
+                response.add_post_render_callback(lambda r: cache.set(cache_key, r, page_timeout))
+            else:
+                cache.set(cache_key, response, page_timeout)
+            return response
         
         return wrapper
     return decorator
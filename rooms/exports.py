@@ -0,0 +1,129 @@
+"""
+Booking Export for Room Booking System
+Streamed CSV / JSONL exports with the manage_bookings filters
+"""
+
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+
+from .streaming import keyset_rows
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+# Kolom ekspor -> field values_list (join ke user/room/approved_by dilakukan di SQL)
+EXPORT_COLUMNS = [
+    ('id', 'pk'),
+    ('title', 'title'),
+    ('room', 'room__name'),
+    ('user', 'user__username'),
+    ('user_email', 'user__email'),
+    ('start', 'start_datetime'),
+    ('end', 'end_datetime'),
+    ('participants', 'participants'),
+    ('status', 'status'),
+    ('approved_by', 'approved_by__username'),
+    ('approved_at', 'approved_at'),
+    ('created_at', 'created_at'),
+]
+
+# Baris per potongan yang dikirim ke klien
+FLUSH_ROWS = 500
+
+
+def parse_date(value):
+    return date.fromisoformat(value)
+
+
+def filter_bookings(queryset, params):
+    """
+    Terapkan filter Kelola Booking dari query string / opsi command
+
+    Mendukung status, room (id), serta date_from/date_to (YYYY-MM-DD,
+    inklusif, berdasarkan waktu mulai lokal). Tanggal diubah menjadi
+    batas datetime agar filter tetap memakai indeks.
+    Melempar ValueError jika parameter tidak valid.
+    """
+    status = params.get('status')
+    if status:
+        queryset = queryset.filter(status=status)
+
+    room = params.get('room')
+    if room:
+        queryset = queryset.filter(room_id=int(room))
+
+    tz = timezone.get_current_timezone()
+    date_from = params.get('date_from')
+    if date_from:
+        start = timezone.make_aware(datetime.combine(parse_date(date_from), time.min), tz)
+        queryset = queryset.filter(start_datetime__gte=start)
+    date_to = params.get('date_to')
+    if date_to:
+        end = timezone.make_aware(datetime.combine(parse_date(date_to) + timedelta(days=1), time.min), tz)
+        queryset = queryset.filter(start_datetime__lt=end)
+
+    return queryset
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    return value
+
+
+def export_rows(queryset, chunk_size=None, archived=None):
+    """
+    Baris ekspor (tuple) dalam urutan pk, dibaca per potongan keyset
+
+    Jika `archived` (queryset ArchivedBooking) diberikan, baris arsip
+    dikirim lebih dulu; kolomnya sama sehingga formatnya tidak berubah.
+    """
+    fields = [field for _, field in EXPORT_COLUMNS[1:]]
+    kwargs = {'chunk_size': chunk_size} if chunk_size else {}
+    for tier in ([archived] if archived is not None else []) + [queryset]:
+        for row in keyset_rows(tier, fields, **kwargs):
+            yield [_export_value(value) for value in row]
+
+
+class _Echo:
+    """Buffer semu untuk csv.writer: write() langsung mengembalikan baris"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, chunk_size=None, archived=None):
+    """Generator CSV; header dikirim sebelum query pertama dijalankan"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([column for column, _ in EXPORT_COLUMNS])
+    buffer = []
+    for row in export_rows(queryset, chunk_size, archived):
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= FLUSH_ROWS:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_jsonl(queryset, chunk_size=None, archived=None):
+    """Generator JSON Lines, satu objek booking per baris"""
+    columns = [column for column, _ in EXPORT_COLUMNS]
+    buffer = []
+    for row in export_rows(queryset, chunk_size, archived):
+        buffer.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n')
+        if len(buffer) >= FLUSH_ROWS:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_export(queryset, export_format, chunk_size=None, archived=None):
+    if export_format == 'csv':
+        return stream_csv(queryset, chunk_size, archived)
+    if export_format == 'jsonl':
+        return stream_jsonl(queryset, chunk_size, archived)
+    raise ValueError(f'Format tidak dikenal: {export_format}')
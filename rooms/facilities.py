@@ -0,0 +1,42 @@
+"""
+Room Facilities for Room Booking System
+Parses the free-text facilities field into normalized Facility tags
+"""
+
+import re
+
+from django.utils.text import slugify
+
+FACILITY_SEPARATORS = re.compile(r'[,;\n]')
+
+
+def parse_facilities(text):
+    """{slug: nama} dari teks "Proyektor, AC, WiFi" (urutan dipertahankan, duplikat dibuang)"""
+    parsed = {}
+    for part in FACILITY_SEPARATORS.split(text or ''):
+        name = ' '.join(part.split())
+        slug = slugify(name)[:100]
+        if slug and slug not in parsed:
+            parsed[slug] = name[:100]
+    return parsed
+
+
+def get_or_create_facilities(parsed):
+    """Facility untuk setiap {slug: nama}; yang belum ada dibuat sekaligus"""
+    from .models import Facility
+
+    existing = {facility.slug: facility for facility in Facility.objects.filter(slug__in=parsed)}
+    missing = [Facility(slug=slug, name=name) for slug, name in parsed.items() if slug not in existing]
+    if missing:
+        # ignore_conflicts: request lain mungkin membuat slug yang sama bersamaan
+        Facility.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = {facility.slug: facility for facility in Facility.objects.filter(slug__in=parsed)}
+    return [existing[slug] for slug in parsed]
+
+
+def sync_room(room, created=False):
+    """Samakan tag fasilitas ruangan dengan teks `facilities`-nya"""
+    parsed = parse_facilities(room.facilities)
+    if created and not parsed:
+        return
+    room.facility_tags.set(get_or_create_facilities(parsed) if parsed else [])
@@ -3,8 +3,55 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Row, Column, Div
-from bootstrap_datepicker_plus.widgets import DateTimePickerInput
-from .models import Room, Booking
+from bootstrap_datepicker_plus.widgets import DatePickerInput, DateTimePickerInput
+from django.core.exceptions import ValidationError
+from .catalog import active_rooms, get_active_room
+from .models import Room, Booking, BookingSeries
+
+class CatalogRoomIterator:
+    """Pilihan ruangan dari katalog ruangan aktif, dievaluasi saat dirender"""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for room in active_rooms():
+            yield (room.pk, self.field.label_from_instance(room))
+
+    def __len__(self):
+        return len(active_rooms()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return True
+
+class CatalogRoomField(forms.ModelChoiceField):
+    """
+    Pilihan ruangan aktif yang dibaca dari katalog (rooms.catalog)
+
+    Render dropdown dan validasi pilihan tidak menjalankan query Room
+    selama katalog ada di cache.
+    """
+    iterator = CatalogRoomIterator
+
+    def __init__(self, queryset=None, **kwargs):
+        super().__init__(queryset=Room.objects.active(), **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            room = get_active_room(int(value))
+        except (TypeError, ValueError):
+            room = None
+        if room is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return room
 
 class CustomUserCreationForm(UserCreationForm):
     email = forms.EmailField(required=True)
@@ -119,13 +166,16 @@ class BookingForm(forms.ModelForm):
             ),
             'description': forms.Textarea(attrs={'rows': 3}),
         }
+        # Hanya ruangan aktif, dari katalog ruangan
+        field_classes = {'room': CatalogRoomField}
 
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
-        # Filter hanya ruangan yang aktif
-        self.fields['room'].queryset = Room.objects.filter(is_active=True)
+        # Validasi waktu & kapasitas dijalankan Booking.clean(); cek konflik
+        # dijalankan sekali saat save() di bawah lock ruangan
+        self.instance.defer_conflict_check = True
         
         self.helper = FormHelper()
         self.helper.layout = Layout(
@@ -141,24 +191,65 @@ class BookingForm(forms.ModelForm):
             Submit('submit', 'Buat Booking', css_class='btn btn-primary')
         )
 
-    def clean(self):
-        cleaned_data = super().clean()
-        start_datetime = cleaned_data.get('start_datetime')
-        end_datetime = cleaned_data.get('end_datetime')
-        room = cleaned_data.get('room')
-        participants = cleaned_data.get('participants')
-
-        if start_datetime and end_datetime:
-            if start_datetime >= end_datetime:
-                raise forms.ValidationError("Waktu mulai harus sebelum waktu selesai.")
-
-        if room and participants:
-            if participants > room.capacity:
-                raise forms.ValidationError(
-                    f"Jumlah peserta ({participants}) melebihi kapasitas ruangan ({room.capacity})."
-                )
+class BookingSeriesForm(forms.ModelForm):
+    class Meta:
+        model = BookingSeries
+        fields = [
+            'room', 'title', 'description', 'start_datetime', 'end_datetime', 'participants',
+            'frequency', 'interval', 'until', 'count',
+        ]
+        widgets = {
+            'start_datetime': DateTimePickerInput(
+                options={
+                    "format": "DD/MM/YYYY HH:mm",
+                    "showClose": True,
+                    "showClear": True,
+                    "showTodayButton": True,
+                }
+            ),
+            'end_datetime': DateTimePickerInput(
+                options={
+                    "format": "DD/MM/YYYY HH:mm",
+                    "showClose": True,
+                    "showClear": True,
+                    "showTodayButton": True,
+                }
+            ),
+            'until': DatePickerInput(options={"format": "DD/MM/YYYY"}),
+            'description': forms.Textarea(attrs={'rows': 3}),
+        }
+        # Hanya ruangan aktif, dari katalog ruangan
+        field_classes = {'room': CatalogRoomField}
 
-        return cleaned_data
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        self.fields['interval'].help_text = 'Mis. 2 dengan pengulangan mingguan = setiap dua minggu'
+        self.fields['count'].help_text = f'Isi jumlah kejadian atau tanggal akhir (maks. {BookingSeries.MAX_OCCURRENCES})'
+        
+        self.helper = FormHelper()
+        self.helper.layout = Layout(
+            'room',
+            'title',
+            'description',
+            Row(
+                Column('start_datetime', css_class='form-group col-md-6 mb-0'),
+                Column('end_datetime', css_class='form-group col-md-6 mb-0'),
+                css_class='form-row'
+            ),
+            'participants',
+            Row(
+                Column('frequency', css_class='form-group col-md-6 mb-0'),
+                Column('interval', css_class='form-group col-md-6 mb-0'),
+                css_class='form-row'
+            ),
+            Row(
+                Column('until', css_class='form-group col-md-6 mb-0'),
+                Column('count', css_class='form-group col-md-6 mb-0'),
+                css_class='form-row'
+            ),
+            Submit('submit', 'Buat Booking Berulang', css_class='btn btn-primary')
+        )
 
 class BookingUpdateForm(forms.ModelForm):
     class Meta:
@@ -186,6 +277,7 @@ class BookingUpdateForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.instance.defer_conflict_check = True
         self.helper = FormHelper()
         self.helper.layout = Layout(
             'title',
@@ -199,6 +291,29 @@ class BookingUpdateForm(forms.ModelForm):
             Submit('submit', 'Update Booking', css_class='btn btn-primary')
         )
 
+class BookingImportForm(forms.Form):
+    file = forms.FileField(
+        label='File CSV/JSONL',
+        help_text='Kolom: title, room (nama/id), user (username), start, end, participants, description, status'
+    )
+    status = forms.ChoiceField(
+        choices=[('pending', 'Menunggu'), ('approved', 'Disetujui')],
+        initial='pending',
+        label='Status Default',
+        help_text='Dipakai untuk baris tanpa kolom status'
+    )
+    dry_run = forms.BooleanField(required=False, label='Uji coba saja (tidak menyimpan)')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = FormHelper()
+        self.helper.layout = Layout(
+            'file',
+            'status',
+            'dry_run',
+            Submit('submit', 'Impor Booking', css_class='btn btn-primary')
+        )
+
 class BookingStatusForm(forms.ModelForm):
     class Meta:
         model = Booking
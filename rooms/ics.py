@@ -0,0 +1,127 @@
+"""
+iCalendar Feeds for Room Booking System
+Streamed .ics subscriptions per room and per user
+"""
+
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from .calendar import DISPLAY_STATUSES, queryset_validators
+from .streaming import keyset_rows
+
+# Booking yang selesai lebih lama dari ini tidak lagi dikirim ke klien langganan
+ICS_LOOKBACK = timedelta(days=90)
+ICS_CHUNK_SIZE = 2000
+ICS_TOKEN_SALT = 'rooms.ics'
+
+FEED_FIELDS = ('room__name', 'title', 'description', 'start_datetime', 'end_datetime', 'status', 'updated_at')
+
+ICS_STATUS = {
+    'approved': 'CONFIRMED',
+    'pending': 'TENTATIVE',
+    'completed': 'CONFIRMED',
+}
+
+
+def feed_token(kind, pk):
+    """Token bertanda tangan untuk URL langganan (kind: 'room' atau 'user')"""
+    return signing.Signer(salt=ICS_TOKEN_SALT).signature(f'{kind}:{pk}')
+
+
+def check_token(kind, pk, token):
+    return bool(token) and constant_time_compare(token, feed_token(kind, pk))
+
+
+def feed_horizon():
+    # Dibulatkan ke awal hari agar validator HTTP stabil sepanjang hari
+    return (timezone.now() - ICS_LOOKBACK).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def feed_bookings(room_id=None, user_id=None):
+    """Semua booking (status apa pun) dalam jendela feed"""
+    from .models import Booking
+
+    bookings = Booking.objects.filter(end_datetime__gt=feed_horizon())
+    if room_id is not None:
+        bookings = bookings.filter(room_id=room_id)
+    if user_id is not None:
+        bookings = bookings.filter(user_id=user_id)
+    return bookings
+
+
+def feed_validators(room_id=None, user_id=None):
+    """(etag, last_modified) untuk feed; jendela ikut masuk ke ETag"""
+    etag, last_modified = queryset_validators(feed_bookings(room_id, user_id))
+    return f'{feed_horizon():%Y%m%d}-{etag}', last_modified
+
+
+def escape_text(value):
+    return (
+        value.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Lipat baris lebih dari 75 oktet (RFC 5545 3.1)"""
+    if len(line.encode('utf-8')) <= 75:
+        return line + '\r\n'
+    parts = []
+    current, size = '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        # Baris lanjutan diawali satu spasi yang ikut dihitung
+        limit = 75 if not parts else 74
+        if size + width > limit:
+            parts.append(current)
+            current, size = '', 0
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def stream_calendar(name, bookings, domain):
+    """
+    Generator dokumen VCALENDAR, satu VEVENT per yield
+
+    Booking dibaca dengan keyset_rows sehingga memori tetap kecil
+    berapa pun jumlah event di feed.
+    """
+    yield ''.join([
+        'BEGIN:VCALENDAR\r\n',
+        'VERSION:2.0\r\n',
+        'PRODID:-//Room Booking System//ID\r\n',
+        'CALSCALE:GREGORIAN\r\n',
+        'METHOD:PUBLISH\r\n',
+        fold(f'X-WR-CALNAME:{escape_text(name)}'),
+    ])
+    rows = keyset_rows(
+        bookings.filter(status__in=DISPLAY_STATUSES), FEED_FIELDS, chunk_size=ICS_CHUNK_SIZE
+    )
+    for pk, room_name, title, description, start, end, status, updated_at in rows:
+        lines = [
+            'BEGIN:VEVENT\r\n',
+            f'UID:booking-{pk}@{domain}\r\n',
+            f'DTSTAMP:{format_utc(updated_at)}\r\n',
+            f'DTSTART:{format_utc(start)}\r\n',
+            f'DTEND:{format_utc(end)}\r\n',
+            fold(f'SUMMARY:{escape_text(title)}'),
+            fold(f'LOCATION:{escape_text(room_name)}'),
+            f'STATUS:{ICS_STATUS[status]}\r\n',
+        ]
+        if description:
+            lines.append(fold(f'DESCRIPTION:{escape_text(description)}'))
+        lines.append('END:VEVENT\r\n')
+        yield ''.join(lines)
+    yield 'END:VCALENDAR\r\n'
@@ -0,0 +1,293 @@
+"""
+Booking Import for Room Booking System
+Chunked CSV / JSONL import with batched conflict resolution
+"""
+
+import csv
+import itertools
+import json
+from collections import defaultdict
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import pagecache
+from .availability import ACTIVE_STATUSES, RoomIntervals, invalidate_rooms
+from .concurrency import lock_rooms
+from .rollups import bookings_changed
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_CHUNK_SIZE = 1000
+BULK_BATCH_SIZE = 1000
+
+REQUIRED_COLUMNS = ('title', 'room', 'user', 'start', 'end', 'participants')
+
+
+class ImportReport:
+    """Hasil impor: jumlah baris, booking yang dibuat, dan baris yang ditolak"""
+
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.rejected = []  # (nomor baris, baris asli, alasan)
+
+    def reject(self, line, row, error):
+        self.rejected.append((line, row, error))
+
+
+def detect_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_rows(stream, import_format):
+    """Yield (nomor baris, dict) satu per satu dari file teks CSV/JSONL"""
+    if import_format == 'csv':
+        reader = csv.DictReader(stream)
+        # Baris 1 adalah header
+        for line, row in enumerate(reader, start=2):
+            # Kolom berlebih (tanpa header) dibuang
+            row.pop(None, None)
+            yield line, row
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = {'_raw': text.rstrip('\n')}
+        yield line, row if isinstance(row, dict) else {'_raw': text.rstrip('\n')}
+
+
+def parse_datetime_value(value):
+    parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class _Lookups:
+    """Peta user dan ruangan di memori, diisi per potongan dengan satu query"""
+
+    def __init__(self):
+        from .models import Room
+
+        # Peta terpisah: ruangan bernama "101" tidak boleh menimpa ruangan pk 101
+        self.rooms_by_pk = {}
+        self.rooms_by_name = defaultdict(list)
+        for pk, name, capacity in Room.objects.filter(is_active=True).order_by().values_list('pk', 'name', 'capacity'):
+            self.rooms_by_pk[pk] = (pk, capacity)
+            self.rooms_by_name[name.strip().lower()].append((pk, capacity))
+        self.users = {}
+
+    def load_users(self, usernames):
+        missing = {name for name in usernames if name and name not in self.users}
+        if missing:
+            self.users.update(User.objects.filter(username__in=missing).values_list('username', 'pk'))
+            for name in missing:
+                self.users.setdefault(name, None)
+
+    def room(self, value):
+        """Semua ruangan yang cocok dengan nilai kolom room (pk atau nama)"""
+        key = str(value).strip()
+        matches = set(self.rooms_by_name.get(key.lower(), ()))
+        if key.isdigit() and int(key) in self.rooms_by_pk:
+            matches.add(self.rooms_by_pk[int(key)])
+        return sorted(matches)
+
+    def user(self, value):
+        return self.users.get(value)
+
+
+def _parse_row(row, lookups, default_status, now):
+    """Validasi satu baris; kembalikan (kandidat, None) atau (None, alasan)"""
+    if '_raw' in row:
+        return None, 'Baris bukan objek JSON yang valid.'
+    missing = [column for column in REQUIRED_COLUMNS if not str(row.get(column) or '').strip()]
+    if missing:
+        return None, f"Kolom wajib kosong: {', '.join(missing)}"
+
+    rooms = lookups.room(row['room'])
+    if not rooms:
+        return None, f"Ruangan '{row['room']}' tidak ditemukan atau tidak aktif."
+    if len(rooms) > 1:
+        ids = ', '.join(f'#{pk}' for pk, _ in rooms)
+        return None, f"Ruangan '{row['room']}' ambigu (cocok dengan {ids})."
+    room = rooms[0]
+    user_id = lookups.user(str(row['user']).strip())
+    if user_id is None:
+        return None, f"User '{row['user']}' tidak ditemukan."
+
+    try:
+        start = parse_datetime_value(row['start'])
+        end = parse_datetime_value(row['end'])
+        participants = int(row['participants'])
+    except (TypeError, ValueError) as e:
+        return None, f'Nilai tidak valid: {e}'
+
+    status = str(row.get('status') or default_status).strip()
+    if status not in ACTIVE_STATUSES:
+        return None, f"Status harus salah satu dari: {', '.join(ACTIVE_STATUSES)}"
+    if start >= end:
+        return None, 'Waktu mulai harus sebelum waktu selesai.'
+    if start < now:
+        return None, 'Tidak dapat melakukan booking di masa lalu.'
+    if participants < 1:
+        return None, 'Jumlah peserta minimal 1.'
+    room_id, capacity = room
+    if participants > capacity:
+        return None, f'Jumlah peserta ({participants}) melebihi kapasitas ruangan ({capacity}).'
+
+    title = str(row['title']).strip()[:200]
+    description = str(row.get('description') or '').strip()
+    return (user_id, room_id, title, description, start, end, participants, status), None
+
+
+def import_bookings(stream, import_format, actor=None, default_status='pending',
+                    dry_run=False, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Impor booking dari file CSV/JSONL
+
+    File dibaca per potongan; user dan ruangan diselesaikan lewat peta di
+    memori (satu query user per potongan). Baris yang lolos validasi
+    kemudian dicek konfliknya per ruangan dengan sort-and-sweep, terhadap
+    booking di database (satu range query, di bawah lock ruangan) dan
+    terhadap baris lain di file yang sama, lalu disimpan dengan
+    bulk_create dalam satu transaksi. Mengembalikan ImportReport.
+    """
+    from .models import Booking
+
+    report = ImportReport()
+    lookups = _Lookups()
+    now = timezone.now()
+    candidates = defaultdict(list)  # room_id -> [(start, line, end, row, kandidat)]
+
+    rows = read_rows(stream, import_format)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        report.total += len(chunk)
+        lookups.load_users(str(row.get('user') or '').strip() for _, row in chunk if '_raw' not in row)
+        for line, row in chunk:
+            candidate, error = _parse_row(row, lookups, default_status, now)
+            if error:
+                report.reject(line, row, error)
+            else:
+                candidates[candidate[1]].append((candidate[4], line, candidate[5], row, candidate))
+
+    if not candidates:
+        return report
+
+    with transaction.atomic():
+        # Kunci ruangan agar tidak ada booking baru yang menyelip di antara cek dan INSERT
+        lock_rooms(candidates)
+        range_start = min(item[0] for items in candidates.values() for item in items)
+        range_end = max(item[2] for items in candidates.values() for item in items)
+        existing = defaultdict(list)
+        for room_id, pk, start, end in Booking.objects.filter(
+            room_id__in=list(candidates),
+            status__in=ACTIVE_STATUSES,
+            start_datetime__lt=range_end,
+            end_datetime__gt=range_start,
+        ).order_by().values_list('room_id', 'pk', 'start_datetime', 'end_datetime'):
+            existing[room_id].append((pk, start, end))
+
+        bookings = []
+        for room_id, items in candidates.items():
+            intervals = RoomIntervals(existing.get(room_id, ()))
+            # Sapu urut waktu mulai (lalu nomor baris): baris yang lebih awal menang
+            items.sort(key=lambda item: (item[0], item[1]))
+            accepted_end, accepted_line = None, None
+            for start, line, end, row, candidate in items:
+                if accepted_end is not None and start < accepted_end:
+                    report.reject(line, row, f'Bentrok dengan baris {accepted_line} di file yang sama.')
+                    continue
+                conflict = next(intervals.conflicts(start, end), None)
+                if conflict is not None:
+                    report.reject(line, row, f'Bentrok dengan booking #{conflict} yang sudah ada.')
+                    continue
+                user_id, _, title, description, start, end, participants, status = candidate
+                booking = Booking(
+                    user_id=user_id,
+                    room_id=room_id,
+                    title=title,
+                    description=description,
+                    start_datetime=start,
+                    end_datetime=end,
+                    participants=participants,
+                    status=status,
+                )
+                if status == 'approved' and actor is not None:
+                    booking.approved_by = actor
+                    booking.approved_at = now
+                bookings.append(booking)
+                if accepted_end is None or end > accepted_end:
+                    accepted_end, accepted_line = end, line
+
+        report.created = len(bookings)
+        if not dry_run and bookings:
+            Booking.objects.bulk_create(bookings, batch_size=BULK_BATCH_SIZE)
+            _write_approval_history([booking for booking in bookings if booking.status == 'approved'], actor)
+            # bulk_create tidak mengirim signal
+            invalidate_rooms(candidates)
+            bookings_changed((booking.room_id, booking.start_datetime, booking.end_datetime) for booking in bookings)
+            pagecache.bookings_changed(candidates)
+
+    report.rejected.sort(key=lambda item: item[0])
+    return report
+
+
+def _write_approval_history(bookings, actor):
+    """
+    Riwayat persetujuan untuk booking yang diimpor langsung sebagai approved
+
+    MySQL tidak mengembalikan pk dari bulk_create, jadi pk dicari lewat
+    (ruangan, waktu mulai): unik karena baris yang bentrok sudah ditolak
+    dan ruangan masih terkunci.
+    """
+    from .models import Booking, BookingHistory
+
+    if not bookings:
+        return
+    booking_ids = [booking.pk for booking in bookings]
+    if None in booking_ids:
+        keys = {(booking.room_id, booking.start_datetime) for booking in bookings}
+        booking_ids = [
+            pk for pk, room_id, start in Booking.objects.filter(
+                room_id__in={room_id for room_id, _ in keys},
+                status='approved',
+                start_datetime__in={start for _, start in keys},
+            ).order_by().values_list('pk', 'room_id', 'start_datetime')
+            if (room_id, start) in keys
+        ]
+    BookingHistory.objects.bulk_create([
+        BookingHistory(
+            booking_id=booking_id,
+            old_status='pending',
+            new_status='approved',
+            changed_by=actor,
+            notes='Disetujui saat impor',
+        )
+        for booking_id in booking_ids
+    ], batch_size=BULK_BATCH_SIZE)
+
+
+def write_rejects(rejected, stream, import_format):
+    """Tulis baris yang ditolak (ditambah kolom line dan error) dalam format file asal"""
+    if import_format == 'jsonl':
+        for line, row, error in rejected:
+            stream.write(json.dumps(dict(row, line=line, error=error), ensure_ascii=False, default=str) + '\n')
+        return
+
+    columns = []
+    for _, row, _ in rejected:
+        for column in row:
+            if column not in columns:
+                columns.append(column)
+    writer = csv.DictWriter(stream, fieldnames=['line', 'error'] + columns, extrasaction='ignore')
+    writer.writeheader()
+    for line, row, error in rejected:
+        writer.writerow(dict(row, line=line, error=error))
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from rooms.archive import ARCHIVE_CHUNK_SIZE, archivable, archive_bookings, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Move completed, cancelled and rejected bookings that ended before the cutoff '
+        '(BOOKING_ARCHIVE_AFTER_DAYS, or --days) and their history into the archive '
+        'tables. Each chunk is its own short transaction, so it is safe to run from cron '
+        'and to interrupt.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help='Archive bookings that ended more than N days ago')
+        parser.add_argument('--chunk-size', type=int, default=ARCHIVE_CHUNK_SIZE,
+                            help=f'Bookings per transaction (default: {ARCHIVE_CHUNK_SIZE})')
+        parser.add_argument('--limit', type=int,
+                            help='Stop after archiving this many bookings')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the bookings that would be archived')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None:
+            if options['days'] < 0:
+                raise CommandError('--days must not be negative')
+            cutoff = timezone.now() - timedelta(days=options['days'])
+        else:
+            cutoff = archive_cutoff()
+
+        if options['dry_run']:
+            count = archivable(cutoff).count()
+            self.stdout.write(f'{count} bookings ended before {cutoff:%Y-%m-%d %H:%M} would be archived')
+            return
+
+        archived = archive_bookings(cutoff, options['chunk_size'], options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} bookings ended before {cutoff:%Y-%m-%d %H:%M}'
+        ))
@@ -0,0 +1,86 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rooms.models import Room
+from rooms.templatetags.room_cards import card_key
+
+PHASES = ('uncached', 'cold', 'warm')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark rendering the room list page with and without the room card '
+        'fragment cache (in-memory rooms, nothing is written to the database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, nargs='+', default=[9, 50],
+                            help='Cards per page to benchmark (default: 9 50)')
+        parser.add_argument('--runs', type=int, default=200,
+                            help='Renders per phase (default: 200)')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1 or any(cards < 1 for cards in options['cards']):
+            raise CommandError('--cards and --runs must be positive')
+
+        request = RequestFactory().get(reverse('room_list'))
+        request.user = AnonymousUser()
+        results = {}
+        for cards in options['cards']:
+            rooms = self.build_rooms(cards)
+            self.stdout.write('')
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{cards} cards'))
+            results[cards] = {}
+            for phase in PHASES:
+                results[cards][phase] = self.run_phase(phase, rooms, request, options['runs'])
+                self.stdout.write(f'  {phase:<9} median {results[cards][phase]:8.3f} ms')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.MIGRATE_HEADING('Summary (median ms)'))
+        for cards, timings in results.items():
+            speedup = timings['uncached'] / timings['warm'] if timings['warm'] else float('inf')
+            self.stdout.write(
+                f"  {cards:>3} cards  uncached={timings['uncached']:8.3f}  cold={timings['cold']:8.3f}  "
+                f"warm={timings['warm']:8.3f}  x{speedup:.1f}"
+            )
+
+    def build_rooms(self, count):
+        # Instance tanpa disimpan: pk dan updated_at cukup untuk kunci fragmen
+        now = timezone.now()
+        return [
+            Room(
+                pk=1_000_000 + i,
+                name=f'Ruang Benchmark {i}',
+                location=f'Gedung {i % 5}, Lantai {i % 4 + 1}',
+                capacity=10 + i % 40,
+                description='Ruang rapat dengan meja besar, papan tulis, dan pencahayaan alami. ' * 3,
+                facilities='Proyektor, AC, Wi-Fi, Papan tulis, Sound system',
+                updated_at=now,
+            )
+            for i in range(count)
+        ]
+
+    def run_phase(self, phase, rooms, request, runs):
+        context = {'rooms': rooms, 'is_paginated': False, 'filter_query': ''}
+        # Hanya kunci kartu benchmark yang dihapus, bukan seluruh cache bersama
+        keys = [card_key(room, 'list', False) for room in rooms]
+        timings = []
+        with override_settings(ROOM_CARD_CACHE_ENABLED=phase != 'uncached'):
+            cache.delete_many(keys)
+            render_to_string('rooms/room_list.html', context, request=request)
+            for _ in range(runs):
+                if phase == 'cold':
+                    cache.delete_many(keys)
+                started = time.perf_counter()
+                render_to_string('rooms/room_list.html', context, request=request)
+                timings.append((time.perf_counter() - started) * 1000)
+        cache.delete_many(keys)
+        return statistics.median(timings)
@@ -0,0 +1,184 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from rooms.models import Room, Booking, BookingHistory
+
+BENCH_PREFIX = 'bench-'
+# Indeks yang dibuat migrasi 0002; indeks Booking dari migrasi lain tidak disentuh
+BENCH_INDEXES = (
+    'booking_room_schedule_idx',
+    'booking_created_idx',
+    'booking_user_created_idx',
+    'booking_status_created_idx',
+)
+STATUSES = ['pending', 'approved', 'approved', 'approved', 'rejected', 'cancelled', 'completed']
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the booking scheduling queries with and without the composite '
+        'indexes from migration 0002 (query plans and latencies)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=1_000_000,
+                            help='Number of synthetic bookings to generate (default: 1000000)')
+        parser.add_argument('--rooms', type=int, default=200,
+                            help='Number of synthetic rooms (default: 200)')
+        parser.add_argument('--users', type=int, default=500,
+                            help='Number of synthetic users (default: 500)')
+        parser.add_argument('--runs', type=int, default=50,
+                            help='Executions per query per phase (default: 50)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='bulk_create batch size (default: 5000)')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic data after the benchmark')
+        parser.add_argument('--force', action='store_true',
+                            help='Allow running when DEBUG is off')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError(
+                'This command writes synthetic data and drops/recreates indexes. '
+                'Run it against a development database or pass --force.'
+            )
+
+        rooms, users = self.seed(options)
+        try:
+            queries = self.build_queries(rooms, users)
+            indexes = [
+                index for index in Booking._meta.indexes
+                if index.name in BENCH_INDEXES
+            ]
+
+            removed = []
+            try:
+                for index in indexes:
+                    with connection.schema_editor() as editor:
+                        editor.remove_index(Booking, index)
+                    removed.append(index)
+                before = self.run_phase('WITHOUT composite indexes', queries, options['runs'])
+            finally:
+                # Juga saat gagal atau Ctrl-C: skema harus kembali sesuai state migrasi
+                self.restore_indexes(removed)
+            after = self.run_phase('WITH composite indexes', queries, options['runs'])
+
+            self.stdout.write('')
+            self.stdout.write(self.style.MIGRATE_HEADING('Summary (median ms)'))
+            for name in queries:
+                speedup = before[name] / after[name] if after[name] else float('inf')
+                self.stdout.write(
+                    f'  {name:<28} before={before[name]:9.3f}  after={after[name]:9.3f}  x{speedup:.1f}'
+                )
+        finally:
+            if not options['keep']:
+                self.cleanup(rooms, users)
+
+    def restore_indexes(self, indexes):
+        if indexes:
+            self.stdout.write(f'Recreating {len(indexes)} indexes...')
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Booking, index)
+
+    def seed(self, options):
+        self.stdout.write(
+            f"Seeding {options['bookings']} bookings over {options['rooms']} rooms "
+            f"and {options['users']} users..."
+        )
+        users = [
+            User.objects.get_or_create(username=f'{BENCH_PREFIX}user{i}')[0]
+            for i in range(options['users'])
+        ]
+        rooms = [
+            Room.objects.get_or_create(
+                name=f'{BENCH_PREFIX}room{i}',
+                defaults={'capacity': 50, 'location': 'Benchmark'},
+            )[0]
+            for i in range(options['rooms'])
+        ]
+
+        # Data tersebar di rentang beberapa tahun, seperti tabel produksi
+        origin = timezone.now() - timedelta(days=3 * 365)
+        span_minutes = 4 * 365 * 24 * 60
+        batch = []
+        started = time.perf_counter()
+        for i in range(options['bookings']):
+            start = origin + timedelta(minutes=random.randrange(0, span_minutes, 30))
+            batch.append(Booking(
+                user=random.choice(users),
+                room=random.choice(rooms),
+                title=f'{BENCH_PREFIX}{i}',
+                start_datetime=start,
+                end_datetime=start + timedelta(minutes=random.choice([30, 60, 90, 120])),
+                participants=10,
+                status=random.choice(STATUSES),
+            ))
+            if len(batch) >= options['batch_size']:
+                Booking.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Booking.objects.bulk_create(batch)
+        self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+        return rooms, users
+
+    def build_queries(self, rooms, users):
+        room = random.choice(rooms)
+        user = random.choice(users)
+        start = timezone.now() + timedelta(days=7)
+        end = start + timedelta(hours=2)
+        return {
+            'conflict_check': Booking.objects.filter(
+                room=room,
+                status__in=['approved', 'pending'],
+                start_datetime__lt=end,
+                end_datetime__gt=start,
+            ).order_by(),  # exists() membuang ORDER BY, samakan untuk EXPLAIN
+            'booking_list (user)': Booking.objects.filter(user=user).order_by('-created_at')[:10],
+            'manage_bookings (status)': Booking.objects.filter(status='pending').order_by('-created_at')[:15],
+            'manage_bookings (all)': Booking.objects.order_by('-created_at')[:15],
+        }
+
+    def run_phase(self, label, queries, runs):
+        self.stdout.write('')
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        results = {}
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.SQL_KEYWORD(f'-- {name}'))
+            self.stdout.write(queryset.explain())
+
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                if name == 'conflict_check':
+                    queryset.exists()
+                else:
+                    list(queryset.values_list('pk', flat=True))
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+            self.stdout.write(f'median {results[name]:.3f} ms over {runs} runs')
+        return results
+
+    def cleanup(self, rooms, users):
+        self.stdout.write('Removing synthetic data...')
+        room_ids = [room.pk for room in rooms]
+        while True:
+            chunk = list(
+                Booking.objects.filter(room_id__in=room_ids).values_list('pk', flat=True)[:10000]
+            )
+            if not chunk:
+                break
+            # DELETE langsung tanpa signal: tidak ada refresh rollup, kenaikan
+            # versi ketersediaan atau purge cache halaman per baris
+            BookingHistory.objects.filter(booking_id__in=chunk)._raw_delete(connection.alias)
+            Booking.objects.filter(pk__in=chunk)._raw_delete(connection.alias)
+        Room.objects.filter(pk__in=room_ids).delete()
+        User.objects.filter(pk__in=[user.pk for user in users]).delete()
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from rooms.models import PAST_CHUNK_SIZE, Booking
+
+
+class Command(BaseCommand):
+    help = (
+        'Mark approved bookings that have ended as completed and cancel pending '
+        'bookings whose start time has passed. Runs once, or every --interval '
+        'seconds when used as the periodic runner.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and repeat every N seconds (default: run once)')
+        parser.add_argument('--chunk-size', type=int, default=PAST_CHUNK_SIZE,
+                            help=f'Bookings per UPDATE (default: {PAST_CHUNK_SIZE})')
+        parser.add_argument('--no-expire', action='store_true',
+                            help='Do not cancel pending bookings that have already started')
+
+    def handle(self, *args, **options):
+        while True:
+            self.run_once(options)
+            if options['interval'] <= 0:
+                return
+            time.sleep(options['interval'])
+
+    def run_once(self, options):
+        now = timezone.now()
+        completed = Booking.objects.complete_past(now, options['chunk_size'])
+        expired = 0
+        if not options['no_expire']:
+            expired = Booking.objects.expire_pending(now, options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{now:%Y-%m-%d %H:%M:%S} completed {completed} bookings, expired {expired} pending bookings'
+        ))
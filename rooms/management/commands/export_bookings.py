@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from rooms.exports import EXPORT_FORMATS, filter_bookings, stream_export
+from rooms.models import ArchivedBooking, Booking
+from rooms.streaming import DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Export bookings as CSV or JSONL with the same filters as manage_bookings. '
+        'Rows are streamed in keyset chunks, so memory stays flat for large exports.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv',
+                            help='Output format (default: csv)')
+        parser.add_argument('--status', help='Only bookings with this status')
+        parser.add_argument('--room', type=int, help='Only bookings for this room id')
+        parser.add_argument('--date-from', help='Start date (YYYY-MM-DD, inclusive)')
+        parser.add_argument('--date-to', help='End date (YYYY-MM-DD, inclusive)')
+        parser.add_argument('--include-archive', action='store_true',
+                            help='Also export archived bookings (written first)')
+        parser.add_argument('--output', '-o',
+                            help='Write to this file instead of stdout')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f'Rows per query (default: {DEFAULT_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        params = {
+            'status': options['status'],
+            'room': options['room'],
+            'date_from': options['date_from'],
+            'date_to': options['date_to'],
+        }
+        try:
+            bookings = filter_bookings(Booking.objects.all(), params)
+            archived = None
+            if options['include_archive']:
+                archived = filter_bookings(ArchivedBooking.objects.all(), params)
+        except ValueError as e:
+            raise CommandError(f'Invalid filter: {e}')
+
+        chunks = stream_export(bookings, options['format'], options['chunk_size'], archived)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}"))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
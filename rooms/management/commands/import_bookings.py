@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from rooms.imports import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, detect_format, import_bookings, write_rejects
+
+
+class Command(BaseCommand):
+    help = (
+        'Import bookings from a CSV or JSONL file. Rows are validated in chunks, '
+        'conflicts are resolved per room against the database and the file itself, '
+        'and valid rows are inserted with bulk_create in one transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file to import')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--status', choices=['pending', 'approved'], default='pending',
+                            help='Status for rows without a status column (default: pending)')
+        parser.add_argument('--actor',
+                            help='Username recorded as approver for approved rows')
+        parser.add_argument('--rejects',
+                            help='Write rejected rows (with line and error) to this file')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                            help=f'Rows validated per chunk (default: {IMPORT_CHUNK_SIZE})')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate and report without saving')
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or detect_format(options['path'])
+        actor = None
+        if options['actor']:
+            try:
+                actor = User.objects.get(username=options['actor'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['actor']}' does not exist")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = import_bookings(
+                    stream, import_format,
+                    actor=actor,
+                    default_status=options['status'],
+                    dry_run=options['dry_run'],
+                    chunk_size=options['chunk_size'],
+                )
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["path"]}: {e}')
+
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(f'{report.created} of {report.total} bookings {verb}'))
+        if report.rejected:
+            self.stdout.write(self.style.WARNING(f'{len(report.rejected)} rows rejected'))
+            if options['rejects']:
+                with open(options['rejects'], 'w', encoding='utf-8', newline='') as output:
+                    write_rejects(report.rejected, output, import_format)
+                self.stdout.write(f"Rejected rows written to {options['rejects']}")
+            else:
+                for line, _, error in report.rejected[:20]:
+                    self.stdout.write(f'  line {line}: {error}')
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0002_booking_schedule_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                fields=["is_active", "capacity"], name="room_active_capacity_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("rooms", "0003_room_active_capacity_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingSeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=200, verbose_name="Judul Acara")),
+                (
+                    "description",
+                    models.TextField(blank=True, verbose_name="Deskripsi Acara"),
+                ),
+                (
+                    "participants",
+                    models.PositiveIntegerField(verbose_name="Jumlah Peserta"),
+                ),
+                (
+                    "start_datetime",
+                    models.DateTimeField(verbose_name="Waktu Mulai (Pertama)"),
+                ),
+                (
+                    "end_datetime",
+                    models.DateTimeField(verbose_name="Waktu Selesai (Pertama)"),
+                ),
+                (
+                    "frequency",
+                    models.CharField(
+                        choices=[
+                            ("daily", "Harian"),
+                            ("weekly", "Mingguan"),
+                            ("monthly", "Bulanan"),
+                        ],
+                        default="weekly",
+                        max_length=10,
+                        verbose_name="Pengulangan",
+                    ),
+                ),
+                (
+                    "interval",
+                    models.PositiveSmallIntegerField(default=1, verbose_name="Setiap"),
+                ),
+                (
+                    "until",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="Berulang Sampai"
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveSmallIntegerField(
+                        blank=True, null=True, verbose_name="Jumlah Kejadian"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="rooms.room",
+                        verbose_name="Ruangan",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booking_series",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Pengguna",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Seri Booking",
+                "verbose_name_plural": "Seri Booking",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="booking",
+            name="series",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="bookings",
+                to="rooms.bookingseries",
+                verbose_name="Seri",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0004_booking_series"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["end_datetime", "start_datetime"], name="booking_end_start_idx"
+            ),
+        ),
+    ]
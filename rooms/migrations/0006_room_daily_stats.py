@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0005_booking_calendar_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RoomDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Tanggal")),
+                (
+                    "booked_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Menit Terpakai"
+                    ),
+                ),
+                (
+                    "pending_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Menunggu"),
+                ),
+                (
+                    "approved_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Disetujui"),
+                ),
+                (
+                    "rejected_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Ditolak"),
+                ),
+                (
+                    "cancelled_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Dibatalkan"),
+                ),
+                (
+                    "completed_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Selesai"),
+                ),
+                (
+                    "peak_participants",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Puncak Peserta"
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="rooms.room",
+                        verbose_name="Ruangan",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Statistik Harian Ruangan",
+                "verbose_name_plural": "Statistik Harian Ruangan",
+                "ordering": ["-date", "room"],
+                "indexes": [
+                    models.Index(fields=["date"], name="room_daily_stats_date_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="roomdailystats",
+            constraint=models.UniqueConstraint(
+                fields=("room", "date"), name="room_daily_stats_room_date_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("rooms", "0006_room_daily_stats"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="bookinghistory",
+            name="changed_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Diubah Oleh",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["status", "end_datetime"], name="booking_status_end_idx"
+            ),
+        ),
+    ]
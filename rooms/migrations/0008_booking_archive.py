@@ -0,0 +1,157 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("rooms", "0007_booking_completion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedBooking",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("title", models.CharField(max_length=200, verbose_name="Judul Acara")),
+                (
+                    "description",
+                    models.TextField(blank=True, verbose_name="Deskripsi Acara"),
+                ),
+                ("start_datetime", models.DateTimeField(verbose_name="Waktu Mulai")),
+                ("end_datetime", models.DateTimeField(verbose_name="Waktu Selesai")),
+                (
+                    "participants",
+                    models.PositiveIntegerField(verbose_name="Jumlah Peserta"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Menunggu"),
+                            ("approved", "Disetujui"),
+                            ("rejected", "Ditolak"),
+                            ("cancelled", "Dibatalkan"),
+                            ("completed", "Selesai"),
+                        ],
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("notes", models.TextField(blank=True, verbose_name="Catatan")),
+                (
+                    "approved_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Waktu Persetujuan"
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Waktu Arsip"),
+                ),
+                (
+                    "approved_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Disetujui Oleh",
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_bookings",
+                        to="rooms.room",
+                        verbose_name="Ruangan",
+                    ),
+                ),
+                (
+                    "series",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_bookings",
+                        to="rooms.bookingseries",
+                        verbose_name="Seri",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_bookings",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Pengguna",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Arsip Pemesanan",
+                "verbose_name_plural": "Arsip Pemesanan",
+                "ordering": ["-start_datetime"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedBookingHistory",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "old_status",
+                    models.CharField(max_length=20, verbose_name="Status Lama"),
+                ),
+                (
+                    "new_status",
+                    models.CharField(max_length=20, verbose_name="Status Baru"),
+                ),
+                ("notes", models.TextField(blank=True, verbose_name="Catatan")),
+                ("created_at", models.DateTimeField()),
+                (
+                    "booking",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="history",
+                        to="rooms.archivedbooking",
+                    ),
+                ),
+                (
+                    "changed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Diubah Oleh",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Arsip Riwayat Booking",
+                "verbose_name_plural": "Arsip Riwayat Booking",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archivedbooking",
+            index=models.Index(
+                fields=["room", "start_datetime"], name="archived_room_start_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedbooking",
+            index=models.Index(
+                fields=["start_datetime", "end_datetime"], name="archived_start_end_idx"
+            ),
+        ),
+    ]
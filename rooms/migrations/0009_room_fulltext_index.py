@@ -0,0 +1,29 @@
+from django.db import migrations
+
+INDEX_NAME = "room_search_ft"
+
+
+def create_fulltext_index(apps, schema_editor):
+    # FULLTEXT hanya di MySQL; database lain memakai indeks trigram in-process (rooms/search.py)
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(
+        f"CREATE FULLTEXT INDEX {INDEX_NAME} ON rooms_room (name, location, description)"
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(f"DROP INDEX {INDEX_NAME} ON rooms_room")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0008_booking_archive"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
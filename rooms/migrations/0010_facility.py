@@ -0,0 +1,98 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0009_room_fulltext_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Facility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=100, verbose_name="Nama Fasilitas"),
+                ),
+                (
+                    "slug",
+                    models.SlugField(max_length=100, unique=True, verbose_name="Slug"),
+                ),
+            ],
+            options={
+                "verbose_name": "Fasilitas",
+                "verbose_name_plural": "Fasilitas",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RoomFacility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="rooms.facility",
+                        verbose_name="Fasilitas",
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="rooms.room",
+                        verbose_name="Ruangan",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fasilitas Ruangan",
+                "verbose_name_plural": "Fasilitas Ruangan",
+            },
+        ),
+        migrations.AddField(
+            model_name="room",
+            name="facility_tags",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="rooms",
+                through="rooms.RoomFacility",
+                to="rooms.facility",
+                verbose_name="Tag Fasilitas",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="roomfacility",
+            index=models.Index(
+                fields=["facility", "room"], name="room_facility_lookup_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="roomfacility",
+            constraint=models.UniqueConstraint(
+                fields=("room", "facility"), name="room_facility_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+import re
+
+from django.db import migrations
+from django.utils.text import slugify
+
+# Salinan parser rooms.facilities.parse_facilities pada saat migrasi ini ditulis
+FACILITY_SEPARATORS = re.compile(r"[,;\n]")
+
+
+def parse_facilities(text):
+    parsed = {}
+    for part in FACILITY_SEPARATORS.split(text or ""):
+        name = " ".join(part.split())
+        slug = slugify(name)[:100]
+        if slug and slug not in parsed:
+            parsed[slug] = name[:100]
+    return parsed
+
+
+def parse_room_facilities(apps, schema_editor):
+    Room = apps.get_model("rooms", "Room")
+    Facility = apps.get_model("rooms", "Facility")
+    RoomFacility = apps.get_model("rooms", "RoomFacility")
+
+    rooms = {
+        pk: parse_facilities(text)
+        for pk, text in Room.objects.exclude(facilities="")
+        .values_list("pk", "facilities")
+        .iterator()
+    }
+    names = {}
+    for parsed in rooms.values():
+        for slug, name in parsed.items():
+            names.setdefault(slug, name)
+    Facility.objects.bulk_create(
+        [Facility(slug=slug, name=name) for slug, name in names.items()],
+        ignore_conflicts=True,
+    )
+    facility_ids = dict(Facility.objects.values_list("slug", "pk"))
+    RoomFacility.objects.bulk_create(
+        [
+            RoomFacility(room_id=room_id, facility_id=facility_ids[slug])
+            for room_id, parsed in rooms.items()
+            for slug in parsed
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def clear_room_facilities(apps, schema_editor):
+    apps.get_model("rooms", "RoomFacility").objects.all().delete()
+    apps.get_model("rooms", "Facility").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0010_facility"),
+    ]
+
+    operations = [
+        migrations.RunPython(parse_room_facilities, clear_room_facilities),
+    ]
@@ -1,8 +1,206 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from datetime import timedelta
+from .availability import has_conflict, invalidate_rooms, overlapping_pairs, RoomIntervals, ACTIVE_STATUSES
+from .concurrency import retry_on_deadlock, lock_room
+from . import pagecache, rollups
+
+class RoomQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_active=True)
+
+    def with_min_capacity(self, capacity):
+        return self.filter(capacity__gte=capacity)
+
+    def with_facilities(self, slugs):
+        """
+        Ruangan yang memiliki SEMUA fasilitas `slugs`
+
+        Satu subquery GROUP BY room_id ... HAVING COUNT = jumlah fasilitas
+        atas tabel RoomFacility, lewat indeks (facility, room).
+        """
+        slugs = set(slugs)
+        if not slugs:
+            return self
+        matching = (
+            RoomFacility.objects.filter(facility__slug__in=slugs)
+            .values('room_id')
+            .annotate(matched=models.Count('facility_id', distinct=True))
+            .filter(matched=len(slugs))
+            .values('room_id')
+        )
+        return self.filter(pk__in=matching)
+
+    def available_between(self, start, end):
+        """Ruangan tanpa booking aktif yang bertumpukan dengan [start, end) (anti-join)"""
+        overlapping = Booking.objects.filter(
+            room=models.OuterRef('pk'),
+            status__in=ACTIVE_STATUSES,
+            start_datetime__lt=end,
+            end_datetime__gt=start,
+        )
+        return self.filter(~models.Exists(overlapping))
+
+
+# Baris per UPDATE saat menutup booking yang sudah lewat
+PAST_CHUNK_SIZE = 500
+
+
+class BookingQuerySet(models.QuerySet):
+    @retry_on_deadlock()
+    def transition(self, booking, from_states, to_state, actor, notes='', fields=None):
+        """
+        Ubah status booking dengan satu UPDATE bersyarat
+
+        Menjalankan ``UPDATE ... WHERE pk = X AND status = <from>`` yang hanya
+        menulis kolom yang berubah (status plus `fields`), lalu mencatat
+        BookingHistory dengan `notes` di transaksi yang sama. `booking` boleh
+        instance atau pk. Mengembalikan True jika transisi ini yang menang,
+        False jika status sudah diubah pihak lain.
+        """
+        instance = booking if isinstance(booking, Booking) else None
+        pk = instance.pk if instance is not None else booking
+        from_states = list(from_states)
+        if instance is not None and instance.status in from_states:
+            # Status yang sudah dimuat hampir selalu masih benar: coba duluan
+            from_states.remove(instance.status)
+            from_states.insert(0, instance.status)
+
+        now = timezone.now()
+        values = dict(fields or {}, status=to_state, updated_at=now)
+        with transaction.atomic():
+            for old_status in from_states:
+                if self.filter(pk=pk, status=old_status).update(**values):
+                    break
+            else:
+                return False
+            BookingHistory.objects.create(
+                booking_id=pk,
+                old_status=old_status,
+                new_status=to_state,
+                changed_by=actor,
+                notes=notes,
+            )
+
+            # update() tidak mengirim signal: sinkronkan indeks ketersediaan dan rollup sendiri
+            if instance is not None:
+                schedule = (instance.room_id, instance.start_datetime, instance.end_datetime)
+            else:
+                schedule = self.filter(pk=pk).values_list('room_id', 'start_datetime', 'end_datetime').get()
+            if (old_status in ACTIVE_STATUSES) != (to_state in ACTIVE_STATUSES):
+                invalidate_rooms([schedule[0]])
+            rollups.bookings_changed([schedule])
+            pagecache.bookings_changed([schedule[0]])
+
+        if instance is not None:
+            for name, value in values.items():
+                setattr(instance, name, value)
+            if hasattr(instance, '_loaded_values'):
+                instance._loaded_values.update(
+                    (instance._meta.get_field(name).attname, getattr(instance, name))
+                    for name in values
+                )
+        return True
+
+    def _apply_bulk_transition(self, rows, from_state, to_state, actor, notes, fields):
+        """UPDATE berbasis himpunan + bulk_create riwayat untuk baris yang sudah dikunci"""
+        booking_ids = [row[0] for row in rows]
+        if not booking_ids:
+            return []
+        values = dict(fields or {}, status=to_state, updated_at=timezone.now())
+        self.filter(pk__in=booking_ids, status=from_state).update(**values)
+        BookingHistory.objects.bulk_create([
+            BookingHistory(
+                booking_id=booking_id,
+                old_status=from_state,
+                new_status=to_state,
+                changed_by=actor,
+                notes=notes,
+            )
+            for booking_id in booking_ids
+        ])
+        if (from_state in ACTIVE_STATUSES) != (to_state in ACTIVE_STATUSES):
+            invalidate_rooms(row[1] for row in rows)
+        rollups.bookings_changed(row[1:4] for row in rows)
+        pagecache.bookings_changed({row[1] for row in rows})
+        return booking_ids
+
+    @retry_on_deadlock()
+    def bulk_transition(self, pks, from_state, to_state, actor, notes='', fields=None):
+        """
+        Ubah status banyak booking sekaligus
+
+        Baris yang masih berstatus `from_state` dikunci (urut pk), lalu diubah
+        dengan satu UPDATE dan riwayatnya ditulis dengan bulk_create.
+        Mengembalikan daftar pk yang benar-benar berubah.
+        """
+        with transaction.atomic():
+            rows = list(
+                self.select_for_update()
+                .filter(pk__in=pks, status=from_state)
+                .order_by('pk')
+                .values_list('pk', 'room_id', 'start_datetime', 'end_datetime')
+            )
+            return self._apply_bulk_transition(rows, from_state, to_state, actor, notes, fields)
+
+    def _transition_past(self, from_state, to_state, cutoff_field, now, notes, chunk_size):
+        """Pindahkan booking `from_state` yang `cutoff_field`-nya sudah lewat, per potongan pk"""
+        now = now or timezone.now()
+        changed = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                self.filter(status=from_state, pk__gt=last_pk, **{f'{cutoff_field}__lte': now})
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if pks:
+                changed += len(self.bulk_transition(pks, from_state, to_state, None, notes))
+            if len(pks) < chunk_size:
+                return changed
+            last_pk = pks[-1]
+
+    def complete_past(self, now=None, chunk_size=PAST_CHUNK_SIZE):
+        """Tandai booking approved yang sudah berakhir sebagai completed; mengembalikan jumlahnya"""
+        return self._transition_past(
+            'approved', 'completed', 'end_datetime', now,
+            'Selesai otomatis: waktu booking sudah lewat.', chunk_size,
+        )
+
+    def expire_pending(self, now=None, chunk_size=PAST_CHUNK_SIZE):
+        """Batalkan booking pending yang waktu mulainya sudah lewat; mengembalikan jumlahnya"""
+        return self._transition_past(
+            'pending', 'cancelled', 'start_datetime', now,
+            'Kedaluwarsa otomatis: belum disetujui sampai waktu mulai.', chunk_size,
+        )
+
+    @retry_on_deadlock()
+    def bulk_approve(self, pks, actor, notes=''):
+        """
+        Setujui banyak booking pending sekaligus
+
+        Booking pending di dalam pilihan yang jadwalnya saling bertumpukan
+        tidak disetujui. Mengembalikan (pk yang disetujui, pasangan konflik).
+        """
+        with transaction.atomic():
+            rows = list(
+                self.select_for_update()
+                .filter(pk__in=pks, status='pending')
+                .order_by('pk')
+                .values_list('pk', 'room_id', 'start_datetime', 'end_datetime')
+            )
+            conflicts = overlapping_pairs(rows)
+            blocked = {pk for pair in conflicts for pk in pair}
+            approved = self._apply_bulk_transition(
+                [row for row in rows if row[0] not in blocked],
+                'pending', 'approved', actor, notes,
+                fields={'approved_by': actor, 'approved_at': timezone.now()},
+            )
+        return approved, conflicts
+
 
 class Room(models.Model):
     """Model untuk ruangan"""
@@ -11,15 +209,29 @@ class Room(models.Model):
     capacity = models.PositiveIntegerField(verbose_name="Kapasitas")
     location = models.CharField(max_length=200, verbose_name="Lokasi")
     facilities = models.TextField(blank=True, verbose_name="Fasilitas")
+    # Diturunkan dari teks `facilities` saat Room disimpan (rooms/facilities.py)
+    facility_tags = models.ManyToManyField(
+        'Facility',
+        through='RoomFacility',
+        blank=True,
+        related_name='rooms',
+        verbose_name="Tag Fasilitas",
+    )
     image = models.ImageField(upload_to='rooms/', blank=True, null=True, verbose_name="Gambar")
     is_active = models.BooleanField(default=True, verbose_name="Aktif")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RoomQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Ruangan"
         verbose_name_plural = "Ruangan"
         ordering = ['name']
+        indexes = [
+            # Daftar ruangan aktif dengan filter kapasitas minimum
+            models.Index(fields=['is_active', 'capacity'], name='room_active_capacity_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -28,6 +240,203 @@ class Room(models.Model):
         return reverse('room_detail', kwargs={'pk': self.pk})
 
 
+class Facility(models.Model):
+    """Fasilitas ruangan yang ternormalisasi (Proyektor, AC, WiFi, ...)"""
+    name = models.CharField(max_length=100, verbose_name="Nama Fasilitas")
+    slug = models.SlugField(max_length=100, unique=True, verbose_name="Slug")
+
+    class Meta:
+        verbose_name = "Fasilitas"
+        verbose_name_plural = "Fasilitas"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class RoomFacility(models.Model):
+    """Relasi ruangan-fasilitas"""
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, verbose_name="Ruangan")
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, verbose_name="Fasilitas")
+
+    class Meta:
+        verbose_name = "Fasilitas Ruangan"
+        verbose_name_plural = "Fasilitas Ruangan"
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'facility'], name='room_facility_uniq'),
+        ]
+        indexes = [
+            # Filter AND fasilitas: facility IN (...) GROUP BY room tanpa membaca baris tabel
+            models.Index(fields=['facility', 'room'], name='room_facility_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.room} - {self.facility}"
+
+
+class BookingSeries(models.Model):
+    """Model untuk booking berulang (harian, mingguan, bulanan)"""
+    FREQUENCY_CHOICES = [
+        ('daily', 'Harian'),
+        ('weekly', 'Mingguan'),
+        ('monthly', 'Bulanan'),
+    ]
+    MAX_OCCURRENCES = 100
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_series', verbose_name="Pengguna")
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, verbose_name="Ruangan")
+    title = models.CharField(max_length=200, verbose_name="Judul Acara")
+    description = models.TextField(blank=True, verbose_name="Deskripsi Acara")
+    participants = models.PositiveIntegerField(verbose_name="Jumlah Peserta")
+    start_datetime = models.DateTimeField(verbose_name="Waktu Mulai (Pertama)")
+    end_datetime = models.DateTimeField(verbose_name="Waktu Selesai (Pertama)")
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='weekly', verbose_name="Pengulangan")
+    interval = models.PositiveSmallIntegerField(default=1, verbose_name="Setiap")
+    until = models.DateField(null=True, blank=True, verbose_name="Berulang Sampai")
+    count = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Jumlah Kejadian")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Seri Booking"
+        verbose_name_plural = "Seri Booking"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} - {self.room.name} ({self.get_frequency_display()})"
+
+    def clean(self):
+        """Validasi aturan pengulangan"""
+        if self.start_datetime and self.end_datetime and self.start_datetime >= self.end_datetime:
+            raise ValidationError("Waktu mulai harus sebelum waktu selesai.")
+        if (self.until is None) == (self.count is None):
+            raise ValidationError("Isi salah satu: tanggal akhir atau jumlah kejadian.")
+        if self.count is not None and self.count > self.MAX_OCCURRENCES:
+            raise ValidationError(f"Maksimal {self.MAX_OCCURRENCES} kejadian per seri.")
+        if self.room_id and self.participants and self.participants > self.room.capacity:
+            raise ValidationError(f"Jumlah peserta ({self.participants}) melebihi kapasitas ruangan ({self.room.capacity}).")
+        if self.start_datetime and self.end_datetime and self.interval:
+            if len(self.occurrences(limit=self.MAX_OCCURRENCES + 1)) > self.MAX_OCCURRENCES:
+                raise ValidationError(f"Maksimal {self.MAX_OCCURRENCES} kejadian per seri.")
+
+    def occurrences(self, limit=None):
+        """
+        Jabarkan seri menjadi daftar (mulai, selesai)
+
+        Dihitung pada waktu lokal agar jam acara tetap sama di setiap
+        kejadian. Untuk pengulangan bulanan, bulan yang tidak memiliki
+        tanggal tersebut (mis. tanggal 31) dilewati.
+        """
+        limit = limit or self.MAX_OCCURRENCES
+        tz = timezone.get_current_timezone()
+        first = timezone.make_naive(self.start_datetime, tz)
+        duration = self.end_datetime - self.start_datetime
+        step = max(self.interval or 1, 1)
+
+        result = []
+        n = 0
+        # Batas atas iterasi: bulan yang dilewati tidak dihitung sebagai kejadian
+        while len(result) < limit and n <= limit * 12:
+            if self.frequency == 'monthly':
+                year, month = divmod(first.month - 1 + n * step, 12)
+                try:
+                    start = first.replace(year=first.year + year, month=month + 1)
+                except ValueError:
+                    n += 1
+                    continue
+            else:
+                days = step if self.frequency == 'daily' else 7 * step
+                start = first + timedelta(days=days * n)
+            n += 1
+
+            if self.until is not None and start.date() > self.until:
+                break
+            if self.count is not None and len(result) >= self.count:
+                break
+            start = timezone.make_aware(start, tz)
+            result.append((start, start + duration))
+        return result
+
+    @retry_on_deadlock()
+    def create_bookings(self):
+        """
+        Buat semua kejadian seri dalam satu transaksi
+
+        Konflik diperiksa terhadap satu range query yang mencakup seluruh
+        rentang seri, di bawah lock ruangan, lalu kejadian yang lolos
+        disimpan dengan bulk_create. Kejadian yang bentrok tidak
+        menggagalkan seri; hasilnya dilaporkan per kejadian sebagai daftar
+        dict {start, end, booking, error}.
+        """
+        occurrences = self.occurrences()
+        report = []
+        if not occurrences:
+            return report
+
+        inserted = self.pk is None
+        try:
+            return self._create_bookings(occurrences, report)
+        except Exception:
+            # Rollback membatalkan INSERT seri: percobaan ulang harus menyimpannya lagi
+            if inserted:
+                self.pk = None
+                self._state.adding = True
+            raise
+
+    def _create_bookings(self, occurrences, report):
+        with transaction.atomic():
+            room = lock_room(self.room_id)
+            existing = RoomIntervals(
+                Booking.objects.filter(
+                    room_id=self.room_id,
+                    status__in=ACTIVE_STATUSES,
+                    start_datetime__lt=occurrences[-1][1],
+                    end_datetime__gt=occurrences[0][0],
+                ).order_by().values_list('pk', 'start_datetime', 'end_datetime')
+            )
+
+            now = timezone.now()
+            bookings = []
+            previous_end = None
+            for start, end in occurrences:
+                if start < now:
+                    error = "Waktu sudah lewat."
+                elif previous_end is not None and start < previous_end:
+                    error = "Bertumpukan dengan kejadian sebelumnya dalam seri ini."
+                elif existing.overlaps(start, end):
+                    error = "Bentrok dengan booking yang sudah ada."
+                else:
+                    error = None
+
+                booking = None
+                if error is None:
+                    booking = Booking(
+                        user_id=self.user_id,
+                        room=room,
+                        title=self.title,
+                        description=self.description,
+                        start_datetime=start,
+                        end_datetime=end,
+                        participants=self.participants,
+                    )
+                    bookings.append(booking)
+                    previous_end = end
+                report.append({'start': start, 'end': end, 'booking': booking, 'error': error})
+
+            if bookings:
+                if self.pk is None:
+                    self.save()
+                for booking in bookings:
+                    booking.series = self
+                Booking.objects.bulk_create(bookings)
+                # bulk_create tidak mengirim signal
+                invalidate_rooms([self.room_id])
+                rollups.bookings_changed(
+                    (self.room_id, booking.start_datetime, booking.end_datetime) for booking in bookings
+                )
+                pagecache.bookings_changed([self.room_id])
+        return report
+
+
 class Booking(models.Model):
     """Model untuk pemesanan ruangan"""
     STATUS_CHOICES = [
@@ -56,19 +465,71 @@ class Booking(models.Model):
         verbose_name="Disetujui Oleh"
     )
     approved_at = models.DateTimeField(null=True, blank=True, verbose_name="Waktu Persetujuan")
+    series = models.ForeignKey(
+        BookingSeries,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bookings',
+        verbose_name="Seri"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Pemesanan"
         verbose_name_plural = "Pemesanan"
         ordering = ['-created_at']
+        indexes = [
+            # Query konflik jadwal: room = X, status IN (...), start < Y, end > Z
+            models.Index(
+                fields=['room', 'status', 'start_datetime', 'end_datetime'],
+                name='booking_room_schedule_idx',
+            ),
+            # Urutan default dan daftar booking (BookingListView, manage_bookings)
+            models.Index(fields=['-created_at'], name='booking_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='booking_user_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='booking_status_created_idx'),
+            # Feed kalender lintas ruangan: end > awal rentang membatasi scan ke
+            # booking yang belum lewat, bukan seluruh riwayat sebelum akhir rentang
+            models.Index(fields=['end_datetime', 'start_datetime'], name='booking_end_start_idx'),
+            # complete_past_bookings: hanya booking approved yang baru saja berakhir
+            models.Index(fields=['status', 'end_datetime'], name='booking_status_end_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.room.name} ({self.start_datetime.strftime('%d/%m/%Y %H:%M')})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Simpan nilai asli agar signal tahu ruangan/jadwal sebelum diubah
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    # Diset oleh form booking: cek konflik ditunda ke save(), yang
+    # menjalankannya sekali di bawah row lock ruangan.
+    defer_conflict_check = False
+
+    def clean_fields(self, exclude=None):
+        exclude = set(exclude or ())
+        # Foreign key yang objeknya sudah dimuat (mis. dari ModelChoiceField
+        # atau lock_room) tidak perlu dicek keberadaannya lagi ke database
+        for field in self._meta.concrete_fields:
+            if field.is_relation and field.is_cached(self):
+                exclude.add(field.name)
+        super().clean_fields(exclude=exclude)
+
     def clean(self):
         """Validasi data booking"""
+        self.validate_schedule()
+        if not self.defer_conflict_check:
+            self.validate_no_conflict()
+
+    def validate_schedule(self):
+        """Validasi waktu dan kapasitas (tanpa query jika ruangan sudah dimuat)"""
         if self.start_datetime and self.end_datetime:
             # Pastikan waktu mulai sebelum waktu selesai
             if self.start_datetime >= self.end_datetime:
@@ -78,28 +539,37 @@ class Booking(models.Model):
             if self.start_datetime < timezone.now():
                 raise ValidationError("Tidak dapat melakukan booking di masa lalu.")
             
-            # Pastikan jumlah peserta tidak melebihi kapasitas ruangan
-            if self.participants > self.room.capacity:
-                raise ValidationError(f"Jumlah peserta ({self.participants}) melebihi kapasitas ruangan ({self.room.capacity}).")
-            
-            # Cek konflik jadwal
-            conflicting_bookings = Booking.objects.filter(
-                room=self.room,
-                status__in=['approved', 'pending'],
-                start_datetime__lt=self.end_datetime,
-                end_datetime__gt=self.start_datetime
-            )
-            
-            # Exclude booking yang sedang diedit
-            if self.pk:
-                conflicting_bookings = conflicting_bookings.exclude(pk=self.pk)
-            
-            if conflicting_bookings.exists():
+        # Pastikan jumlah peserta tidak melebihi kapasitas ruangan
+        if self.room_id and self.participants and self.participants > self.room.capacity:
+            raise ValidationError(f"Jumlah peserta ({self.participants}) melebihi kapasitas ruangan ({self.room.capacity}).")
+
+    def validate_no_conflict(self):
+        """Cek konflik jadwal"""
+        if self.room_id and self.start_datetime and self.end_datetime:
+            if has_conflict(self.room_id, self.start_datetime, self.end_datetime, exclude_id=self.pk):
                 raise ValidationError("Terdapat konflik jadwal dengan booking yang sudah ada.")
 
+    @retry_on_deadlock()
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            # Serialisasi penulisan per ruangan: cek konflik dan INSERT/UPDATE
+            # berjalan di bawah row lock Room, jadi dua request bersamaan
+            # untuk ruangan yang sama tidak bisa sama-sama lolos.
+            if self.room_id is None:
+                # Tidak ada ruangan untuk dikunci: validasi model yang melaporkan kesalahannya
+                self.full_clean(exclude=['user', 'approved_by'])
+            try:
+                self.room = lock_room(self.room_id)
+            except Room.DoesNotExist:
+                raise ValidationError({'room': f'Ruangan #{self.room_id} tidak ditemukan.'})
+            self.defer_conflict_check = False
+            # Integritas foreign key dijamin constraint database saat menulis
+            self.full_clean(exclude=['user', 'approved_by'])
+            super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+        }
 
     @property
     def duration(self):
@@ -129,7 +599,8 @@ class BookingHistory(models.Model):
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='history')
     old_status = models.CharField(max_length=20, verbose_name="Status Lama")
     new_status = models.CharField(max_length=20, verbose_name="Status Baru")
-    changed_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Diubah Oleh")
+    # Kosong untuk perubahan otomatis oleh sistem (mis. complete_past_bookings)
+    changed_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Diubah Oleh")
     notes = models.TextField(blank=True, verbose_name="Catatan")
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -140,3 +611,117 @@ class BookingHistory(models.Model):
 
     def __str__(self):
         return f"{self.booking.title} - {self.old_status} → {self.new_status}"
+
+
+class ArchivedBooking(models.Model):
+    """
+    Booking lama yang sudah dipindahkan dari tabel Booking (lihat rooms.archive)
+
+    Kolomnya sama dengan Booking dan id aslinya dipertahankan, sehingga
+    ekspor dan analitik bisa menggabungkan kedua tabel dengan query yang sama.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_bookings', verbose_name="Pengguna")
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='archived_bookings', verbose_name="Ruangan")
+    title = models.CharField(max_length=200, verbose_name="Judul Acara")
+    description = models.TextField(blank=True, verbose_name="Deskripsi Acara")
+    start_datetime = models.DateTimeField(verbose_name="Waktu Mulai")
+    end_datetime = models.DateTimeField(verbose_name="Waktu Selesai")
+    participants = models.PositiveIntegerField(verbose_name="Jumlah Peserta")
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES, verbose_name="Status")
+    notes = models.TextField(blank=True, verbose_name="Catatan")
+    approved_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Disetujui Oleh"
+    )
+    approved_at = models.DateTimeField(null=True, blank=True, verbose_name="Waktu Persetujuan")
+    series = models.ForeignKey(
+        BookingSeries,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_bookings',
+        verbose_name="Seri"
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Waktu Arsip")
+
+    class Meta:
+        verbose_name = "Arsip Pemesanan"
+        verbose_name_plural = "Arsip Pemesanan"
+        ordering = ['-start_datetime']
+        indexes = [
+            # Ekspor dan analitik: rentang waktu, per ruangan atau lintas ruangan
+            models.Index(fields=['room', 'start_datetime'], name='archived_room_start_idx'),
+            models.Index(fields=['start_datetime', 'end_datetime'], name='archived_start_end_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.room.name} ({self.start_datetime.strftime('%d/%m/%Y %H:%M')})"
+
+    @property
+    def duration(self):
+        return (self.end_datetime - self.start_datetime).total_seconds() / 3600
+
+
+class ArchivedBookingHistory(models.Model):
+    """Riwayat status dari booking yang sudah diarsipkan"""
+    id = models.BigIntegerField(primary_key=True)
+    booking = models.ForeignKey(ArchivedBooking, on_delete=models.CASCADE, related_name='history')
+    old_status = models.CharField(max_length=20, verbose_name="Status Lama")
+    new_status = models.CharField(max_length=20, verbose_name="Status Baru")
+    changed_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name='+', verbose_name="Diubah Oleh"
+    )
+    notes = models.TextField(blank=True, verbose_name="Catatan")
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Arsip Riwayat Booking"
+        verbose_name_plural = "Arsip Riwayat Booking"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.booking.title} - {self.old_status} → {self.new_status}"
+
+
+class RoomDailyStats(models.Model):
+    """
+    Rollup harian per ruangan
+
+    Dijaga tetap terkini oleh setiap penulisan booking (lihat rooms.rollups)
+    dan bisa dibangun ulang dengan command rebuild_rollups.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='daily_stats', verbose_name="Ruangan")
+    date = models.DateField(verbose_name="Tanggal")
+    booked_minutes = models.PositiveIntegerField(default=0, verbose_name="Menit Terpakai")
+    pending_count = models.PositiveIntegerField(default=0, verbose_name="Menunggu")
+    approved_count = models.PositiveIntegerField(default=0, verbose_name="Disetujui")
+    rejected_count = models.PositiveIntegerField(default=0, verbose_name="Ditolak")
+    cancelled_count = models.PositiveIntegerField(default=0, verbose_name="Dibatalkan")
+    completed_count = models.PositiveIntegerField(default=0, verbose_name="Selesai")
+    peak_participants = models.PositiveIntegerField(default=0, verbose_name="Puncak Peserta")
+
+    class Meta:
+        verbose_name = "Statistik Harian Ruangan"
+        verbose_name_plural = "Statistik Harian Ruangan"
+        ordering = ['-date', 'room']
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'date'], name='room_daily_stats_room_date_uniq'),
+        ]
+        indexes = [
+            # Ringkasan lintas ruangan untuk rentang tanggal
+            models.Index(fields=['date'], name='room_daily_stats_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.room} - {self.date}"
+
+    @property
+    def booking_count(self):
+        return sum(getattr(self, field) for field in rollups.STATUS_FIELDS.values())
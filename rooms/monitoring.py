@@ -196,16 +196,20 @@ def metrics(request):
     Returns application metrics in text format
     """
     try:
-        from .models import Room, Booking
+        from .models import Room
+        from .rollups import status_totals
         
         # Application metrics
         room_total = Room.objects.count()
-        room_available = Room.objects.filter(is_available=True).count()
+        room_available = Room.objects.filter(is_active=True).count()
         
-        booking_total = Booking.objects.count()
-        booking_pending = Booking.objects.filter(status='pending').count()
-        booking_approved = Booking.objects.filter(status='approved').count()
-        booking_rejected = Booking.objects.filter(status='rejected').count()
+        # Jumlah booking dari rollup harian (satu SUM), bukan COUNT atas tabel Booking
+        bookings_by_status = status_totals()
+        booking_total = sum(bookings_by_status.values())
+        status_lines = '\n'.join(
+            f'room_booking_bookings_by_status{{status="{status}"}} {count}'
+            for status, count in bookings_by_status.items()
+        )
         
         # System metrics
         if PSUTIL_AVAILABLE:
@@ -247,9 +251,7 @@ room_booking_bookings_total {booking_total}
 
 # HELP room_booking_bookings_by_status Number of bookings by status
 # TYPE room_booking_bookings_by_status gauge
-room_booking_bookings_by_status{{status="pending"}} {booking_pending}
-room_booking_bookings_by_status{{status="approved"}} {booking_approved}
-room_booking_bookings_by_status{{status="rejected"}} {booking_rejected}
+{status_lines}
 {system_metrics}
 """
         
@@ -0,0 +1,96 @@
+"""
+Anonymous Page Cache for Room Booking System
+Tag-versioned cache keys for public pages, purged by room and booking writes
+"""
+
+import hashlib
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import translation
+
+TAG_KEY = 'page_cache:tag:{tag}'
+PAGE_KEY = 'page_cache:page:{language}:{path}:{stamp}'
+
+# Semua halaman yang menampilkan data ruangan (home, daftar, detail)
+ROOMS_TAG = 'rooms'
+# Halaman yang bergantung pada booking ruangan mana pun (daftar ruangan dengan filter waktu)
+BOOKINGS_TAG = 'bookings'
+
+
+def room_tag(room_id):
+    """Halaman yang menampilkan booking satu ruangan (detail ruangan)"""
+    return f'room:{room_id}'
+
+
+def page_cache_enabled():
+    return getattr(settings, 'PAGE_CACHE_ENABLED', True)
+
+
+def page_cache_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 300)
+
+
+def tag_versions(tags):
+    """
+    Versi setiap tag dari cache bersama (satu get_many)
+
+    Tag yang belum punya versi diberi nilai awal acak, sama seperti versi
+    ruangan di indeks ketersediaan, agar halaman lama tidak cocok lagi
+    setelah cache dikosongkan.
+    """
+    keys = {TAG_KEY.format(tag=tag): tag for tag in tags}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, tag in keys.items():
+        if key not in found:
+            cache.add(key, random.getrandbits(48), None)
+            found[key] = cache.get(key)
+        versions[tag] = found[key]
+    return versions
+
+
+def page_key(request, tags):
+    """
+    Kunci halaman: path + query string + bahasa + versi tag
+
+    Purge tidak menghapus entri: menaikkan versi tag membuat semua kunci
+    yang memuat tag tersebut tidak pernah dibaca lagi, dan entri lama
+    kedaluwarsa sendiri.
+    """
+    tags = sorted(set(tags))
+    versions = tag_versions(tags)
+    stamp = hashlib.md5(
+        ';'.join(f'{tag}={versions[tag]}' for tag in tags).encode()
+    ).hexdigest()
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(language=translation.get_language() or '', path=path, stamp=stamp)
+
+
+def purge(tags):
+    """Naikkan versi tag setelah transaksi di-commit"""
+    tags = set(tags)
+
+    def bump():
+        for tag in tags:
+            key = TAG_KEY.format(tag=tag)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Belum pernah dibaca: belum ada halaman dengan tag ini
+                pass
+
+    if tags:
+        transaction.on_commit(bump)
+
+
+def room_changed(room_id):
+    """Dipanggil dari signal Room: semua halaman ruangan ikut berubah"""
+    purge([ROOMS_TAG, room_tag(room_id)])
+
+
+def bookings_changed(room_ids):
+    """Dipanggil dari signal Booking dan penulisan massal booking"""
+    purge([BOOKINGS_TAG, *(room_tag(room_id) for room_id in room_ids)])
@@ -0,0 +1,301 @@
+"""
+Daily Occupancy Rollups for Room Booking System
+Per-room, per-day booking statistics maintained on every booking write
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from functools import reduce
+from itertools import chain
+from operator import or_
+from weakref import WeakKeyDictionary
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .concurrency import lock_rooms
+from .streaming import DEFAULT_CHUNK_SIZE, keyset_rows
+
+logger = logging.getLogger(__name__)
+
+# Booking yang benar-benar memakai ruangan (dihitung ke menit terpakai dan puncak peserta)
+USED_STATUSES = ('approved', 'completed')
+
+# Status booking -> kolom jumlah di RoomDailyStats
+STATUS_FIELDS = {
+    'pending': 'pending_count',
+    'approved': 'approved_count',
+    'rejected': 'rejected_count',
+    'cancelled': 'cancelled_count',
+    'completed': 'completed_count',
+}
+
+STAT_FIELDS = ('booked_minutes', *STATUS_FIELDS.values(), 'peak_participants')
+
+BOOKING_FIELDS = ('room_id', 'start_datetime', 'end_datetime', 'status', 'participants')
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def local_days(start, end):
+    """Yield (tanggal lokal, menit) untuk setiap hari yang disentuh [start, end)"""
+    day = timezone.localtime(start).date()
+    while True:
+        lower = day_start(day)
+        if lower >= end:
+            return
+        upper = day_start(day + timedelta(days=1))
+        yield day, int((min(end, upper) - max(start, lower)).total_seconds() // 60)
+        day += timedelta(days=1)
+
+
+def booking_keys(room_id, start, end):
+    """Kunci rollup (room_id, tanggal) yang dipengaruhi satu booking"""
+    if room_id is None or start is None or end is None or start >= end:
+        return set()
+    return {(room_id, day) for day, _ in local_days(start, end)}
+
+
+def compute(rows, keys=None):
+    """
+    Hitung statistik harian dari baris (room_id, start, end, status, participants)
+
+    Jumlah per status dicatat di hari mulai booking, sehingga setiap booking
+    terhitung tepat sekali; menit terpakai dan puncak peserta dibagi ke
+    setiap hari yang disentuh booking. Jika `keys` diberikan, hanya kunci
+    tersebut yang disimpan.
+    """
+    stats = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+    for room_id, start, end, status, participants in rows:
+        if start >= end:
+            continue
+        used = status in USED_STATUSES
+        for i, (day, minutes) in enumerate(local_days(start, end)):
+            key = (room_id, day)
+            if keys is not None and key not in keys:
+                continue
+            day_stats = stats[key]
+            if i == 0 and status in STATUS_FIELDS:
+                day_stats[STATUS_FIELDS[status]] += 1
+            if used:
+                day_stats['booked_minutes'] += minutes
+                day_stats['peak_participants'] = max(day_stats['peak_participants'], participants)
+    return stats
+
+
+def _stats_rows(stats):
+    from .models import RoomDailyStats
+
+    return [
+        RoomDailyStats(room_id=room_id, date=day, **values)
+        for (room_id, day), values in stats.items()
+    ]
+
+
+def _keys_filter(keys):
+    """Q yang cocok dengan kunci (room_id, tanggal), digabung per ruangan"""
+    dates = defaultdict(set)
+    for room_id, day in keys:
+        dates[room_id].add(day)
+    return reduce(or_, (
+        Q(room_id=room_id, date__in=sorted(days))
+        for room_id, days in dates.items()
+    ))
+
+
+def refresh(keys):
+    """
+    Hitung ulang rollup untuk kunci (room_id, tanggal) tertentu
+
+    Satu range query per pemanggilan (semua ruangan sekaligus), lalu baris
+    rollup kunci tersebut diganti. Berjalan di bawah lock ruangan yang sama
+    dengan penulisan booking, jadi dua refresh untuk ruangan yang sama
+    berjalan berurutan dan yang terakhir selalu melihat data terbaru.
+    """
+    from .models import ArchivedBooking, Booking, RoomDailyStats
+
+    keys = set(keys)
+    if not keys:
+        return
+    ranges = {}
+    for room_id, day in keys:
+        low, high = ranges.get(room_id, (day, day))
+        ranges[room_id] = (min(low, day), max(high, day))
+
+    with transaction.atomic():
+        lock_rooms(ranges)
+        overlapping = reduce(or_, (
+            Q(room_id=room_id,
+              start_datetime__lt=day_start(high + timedelta(days=1)),
+              end_datetime__gt=day_start(low))
+            for room_id, (low, high) in ranges.items()
+        ))
+        # Booking yang sudah diarsipkan tetap dihitung
+        rows = chain.from_iterable(
+            model.objects.filter(overlapping).order_by().values_list(*BOOKING_FIELDS)
+            for model in (Booking, ArchivedBooking)
+        )
+        stats = compute(rows, keys)
+        RoomDailyStats.objects.filter(_keys_filter(keys)).delete()
+        RoomDailyStats.objects.bulk_create(_stats_rows(stats))
+
+
+# Kunci yang menunggu refresh, per koneksi database
+_pending = WeakKeyDictionary()
+
+
+def safe_refresh(keys):
+    # Berjalan setelah commit: kegagalan rollup tidak boleh menggagalkan
+    # penulisan booking yang sudah tersimpan (perbaiki dengan rebuild_rollups)
+    try:
+        refresh(keys)
+    except Exception:
+        logger.exception(f'Rollup refresh failed for {len(keys)} room-day keys')
+
+
+def flush_pending(connection):
+    """Refresh semua kunci yang terkumpul di koneksi ini dalam satu pemanggilan"""
+    keys = _pending.pop(connection, None)
+    if keys:
+        safe_refresh(keys)
+
+
+def schedule_refresh(keys):
+    """
+    Refresh rollup setelah transaksi penulisan booking di-commit
+
+    Kunci dikumpulkan per koneksi; callback on_commit pertama yang berjalan
+    me-refresh semuanya sekaligus dan sisanya tidak melakukan apa-apa,
+    sehingga cascade delete atau aksi massal tetap satu refresh berkunci.
+    Kunci dari blok yang di-rollback ikut di-refresh pada commit berikutnya,
+    yang aman karena refresh selalu menghitung ulang dari database.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    connection = transaction.get_connection()
+    _pending.setdefault(connection, set()).update(keys)
+    transaction.on_commit(lambda: flush_pending(connection))
+
+
+def booking_changed(booking):
+    """Dipanggil dari signal Booking: refresh hari lama dan hari baru booking"""
+    keys = booking_keys(booking.room_id, booking.start_datetime, booking.end_datetime)
+    loaded = getattr(booking, '_loaded_values', None)
+    if loaded:
+        keys |= booking_keys(
+            loaded.get('room_id', booking.room_id),
+            loaded.get('start_datetime', booking.start_datetime),
+            loaded.get('end_datetime', booking.end_datetime),
+        )
+    schedule_refresh(keys)
+
+
+def bookings_changed(rows):
+    """Refresh rollup untuk banyak booking sekaligus, dari (room_id, start, end)"""
+    keys = set()
+    for room_id, start, end in rows:
+        keys |= booking_keys(room_id, start, end)
+    schedule_refresh(keys)
+
+
+def rebuild(room_ids=None, date_from=None, date_to=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Bangun ulang rollup dari tabel Booking dan arsipnya (backfill dan perbaikan)
+
+    Diproses per ruangan dengan keyset iteration, sehingga memori hanya
+    sebesar jumlah hari satu ruangan. Mengembalikan jumlah baris rollup
+    yang ditulis.
+    """
+    from .models import ArchivedBooking, Booking, Room, RoomDailyStats
+
+    rooms = Room.objects.order_by('pk')
+    if room_ids is not None:
+        rooms = rooms.filter(pk__in=room_ids)
+
+    written = 0
+    for room_id in rooms.values_list('pk', flat=True):
+        bookings = Q(room_id=room_id)
+        existing = RoomDailyStats.objects.filter(room_id=room_id)
+        if date_from is not None:
+            bookings &= Q(end_datetime__gt=day_start(date_from))
+            existing = existing.filter(date__gte=date_from)
+        if date_to is not None:
+            bookings &= Q(start_datetime__lt=day_start(date_to + timedelta(days=1)))
+            existing = existing.filter(date__lte=date_to)
+
+        with transaction.atomic():
+            lock_rooms([room_id])
+            rows = chain.from_iterable(
+                keyset_rows(model.objects.filter(bookings), BOOKING_FIELDS, chunk_size)
+                for model in (Booking, ArchivedBooking)
+            )
+            stats = compute(row[1:] for row in rows)
+            stats = {
+                key: values for key, values in stats.items()
+                if (date_from is None or key[1] >= date_from) and (date_to is None or key[1] <= date_to)
+            }
+            existing.delete()
+            RoomDailyStats.objects.bulk_create(_stats_rows(stats), batch_size=chunk_size)
+        written += len(stats)
+    return written
+
+
+def status_totals(stats=None):
+    """Jumlah booking per status dari rollup (satu agregat SUM)"""
+    from .models import RoomDailyStats
+
+    stats = RoomDailyStats.objects.all() if stats is None else stats
+    totals = stats.order_by().aggregate(**{
+        status: Sum(field) for status, field in STATUS_FIELDS.items()
+    })
+    return {status: totals[status] or 0 for status in STATUS_FIELDS}
+
+
+def daily_summary(start_date, end_date, room_ids=None):
+    """
+    Ringkasan harian dan per ruangan untuk start_date..end_date dari rollup
+
+    Dua agregat GROUP BY atas RoomDailyStats (per tanggal dan per ruangan),
+    tanpa menyentuh tabel Booking.
+    """
+    from .models import Room, RoomDailyStats
+
+    rooms = Room.objects.filter(is_active=True)
+    if room_ids is not None:
+        rooms = rooms.filter(pk__in=room_ids)
+    rooms = list(rooms.order_by('name').values_list('pk', 'name'))
+    stats = RoomDailyStats.objects.filter(
+        date__gte=start_date, date__lte=end_date, room_id__in=[pk for pk, _ in rooms]
+    ).order_by()
+    sums = {field: Sum(field) for field in STAT_FIELDS if field != 'peak_participants'}
+    available_minutes = ((end_date - start_date).days + 1) * 24 * 60
+
+    def summarize(values):
+        bookings = sum(values[field] or 0 for field in STATUS_FIELDS.values())
+        return {
+            'bookings': bookings,
+            'by_status': {status: values[field] or 0 for status, field in STATUS_FIELDS.items()},
+            'booked_minutes': values['booked_minutes'] or 0,
+        }
+
+    days = []
+    for values in stats.values('date').annotate(**sums).order_by('date'):
+        day = summarize(values)
+        day['date'] = values['date'].isoformat()
+        day['occupancy'] = round(day['booked_minutes'] / (24 * 60 * len(rooms)), 4) if rooms else None
+        days.append(day)
+
+    per_room = {values['room_id']: values for values in stats.values('room_id').annotate(**sums)}
+    room_rows = []
+    for pk, name in rooms:
+        values = per_room.get(pk, dict.fromkeys(sums))
+        room = summarize(values)
+        room.update(room_id=pk, name=name, occupancy=round(room['booked_minutes'] / available_minutes, 4))
+        room_rows.append(room)
+
+    return {'start': start_date.isoformat(), 'end': end_date.isoformat(), 'days': days, 'rooms': room_rows}
@@ -0,0 +1,190 @@
+"""
+Room Search for Room Booking System
+MySQL FULLTEXT ranking with an in-process trigram index for typos, autocomplete and SQLite
+"""
+
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, IntegerField, Value, When
+
+from .catalog import active_rooms, catalog_usable, current_version, load_rooms
+
+# Kolom indeks FULLTEXT (migrasi 0009) beserta bobotnya di indeks trigram
+FIELD_WEIGHTS = {'name': 3, 'location': 2, 'description': 1}
+
+# Kemiripan trigram minimum (Jaccard) agar sebuah kata dianggap cocok
+MIN_SIMILARITY = 0.3
+PREFIX_SIMILARITY = 0.9
+
+SEARCH_LIMIT = 200
+AUTOCOMPLETE_LIMIT = 8
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def trigrams(word):
+    """Trigram kata dengan padding, seperti pg_trgm: 'rapat' -> '  r', ' ra', 'rap', ..."""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchMatch(Func):
+    """MATCH (name, location, description) AGAINST (...) -- skor relevansi FULLTEXT MySQL"""
+    output_field = FloatField()
+
+    def __init__(self, query, **extra):
+        super().__init__(*(F(field) for field in FIELD_WEIGHTS), Value(query), **extra)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        *columns, query = self.get_source_expressions()
+        column_sql = ', '.join(compiler.compile(column)[0] for column in columns)
+        query_sql, params = compiler.compile(query)
+        return f'MATCH ({column_sql}) AGAINST ({query_sql} IN NATURAL LANGUAGE MODE)', params
+
+
+class TrigramIndex:
+    """
+    Indeks terbalik trigram -> kata atas ruangan aktif
+
+    Setiap kata di name/location/description dicatat bersama (ruangan,
+    kolom). Token query dicocokkan ke kata dengan kemiripan trigram
+    (toleran salah ketik) atau awalan kata (autocomplete); skor ruangan
+    adalah jumlah kecocokan terbaik per token dikali bobot kolom.
+    """
+
+    def __init__(self, rooms):
+        self.rooms = {room.pk: room for room in rooms}
+        self.entries = defaultdict(set)  # kata -> {(room_id, kolom)}
+        self.postings = defaultdict(set)  # trigram -> {kata}
+        for room in rooms:
+            for field in FIELD_WEIGHTS:
+                for word in tokenize(getattr(room, field)):
+                    self.entries[word].add((room.pk, field))
+        for word in self.entries:
+            for gram in trigrams(word):
+                self.postings[gram].add(word)
+
+    def similar_words(self, token, prefix=False):
+        """{kata: kemiripan} untuk satu token query"""
+        grams = trigrams(token)
+        candidates = set()
+        for gram in grams:
+            candidates |= self.postings.get(gram, set())
+        matches = {}
+        for word in candidates:
+            if word == token:
+                matches[word] = 1.0
+            elif word.startswith(token) and (prefix or len(token) >= 3):
+                matches[word] = PREFIX_SIMILARITY
+            else:
+                word_grams = trigrams(word)
+                shared = len(grams & word_grams)
+                similarity = shared / (len(grams) + len(word_grams) - shared)
+                if similarity >= MIN_SIMILARITY:
+                    matches[word] = similarity
+        return matches
+
+    def search(self, tokens, fields=FIELD_WEIGHTS, prefix_last=False, limit=SEARCH_LIMIT):
+        """Room id terurut skor; setiap token harus cocok dengan salah satu kolom"""
+        scores = None
+        for i, token in enumerate(tokens):
+            best = {}
+            prefix = prefix_last and i == len(tokens) - 1
+            for word, similarity in self.similar_words(token, prefix).items():
+                for room_id, field in self.entries[word]:
+                    if field in fields:
+                        score = similarity * FIELD_WEIGHTS[field]
+                        if score > best.get(room_id, 0):
+                            best[room_id] = score
+            if scores is None:
+                scores = best
+            else:
+                scores = {room_id: scores[room_id] + score for room_id, score in best.items() if room_id in scores}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda room_id: (-scores[room_id], self.rooms[room_id].name))
+        return ranked[:limit]
+
+
+class SearchIndexCache:
+    """Indeks trigram per proses, dibangun ulang saat versi katalog ruangan berubah (signal Room)"""
+
+    def __init__(self):
+        self._version = None
+        self._index = None
+
+    def clear(self):
+        self._version = None
+        self._index = None
+
+    def get(self):
+        if not catalog_usable():
+            return TrigramIndex(load_rooms())
+        version = current_version()
+        if self._index is None or self._version != version:
+            self._index = TrigramIndex(active_rooms())
+            self._version = version
+        return self._index
+
+
+index = SearchIndexCache()
+
+
+def fulltext_enabled():
+    return connection.vendor == 'mysql' and getattr(settings, 'ROOM_SEARCH_FULLTEXT', True)
+
+
+def fulltext_room_ids(query, limit=SEARCH_LIMIT):
+    from .models import Room
+
+    return list(
+        Room.objects.active()
+        .annotate(relevance=SearchMatch(query))
+        .filter(relevance__gt=0)
+        .order_by('-relevance', 'name')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def ranked_room_ids(query, limit=SEARCH_LIMIT):
+    """
+    Room id aktif yang cocok dengan `query`, paling relevan dulu
+
+    Di MySQL dipakai indeks FULLTEXT; jika tidak ada hasil (salah ketik,
+    kata lebih pendek dari innodb_ft_min_token_size, stopword) dan di
+    database lain dipakai indeks trigram.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    if fulltext_enabled():
+        room_ids = fulltext_room_ids(' '.join(tokens), limit)
+        if room_ids:
+            return room_ids
+    return index.get().search(tokens, limit=limit)
+
+
+def search_rooms(queryset, query):
+    """Batasi `queryset` ke hasil pencarian dengan urutan relevansi"""
+    room_ids = ranked_room_ids(query)
+    if not room_ids:
+        return queryset.none()
+    rank = Case(*(When(pk=pk, then=Value(i)) for i, pk in enumerate(room_ids)), output_field=IntegerField())
+    return queryset.filter(pk__in=room_ids).order_by(rank)
+
+
+def autocomplete(query, limit=AUTOCOMPLETE_LIMIT):
+    """Ruangan aktif yang namanya cocok; token terakhir dicocokkan sebagai awalan"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    search_index = index.get()
+    room_ids = search_index.search(tokens, fields=('name',), prefix_last=True, limit=limit)
+    return [search_index.rooms[room_id] for room_id in room_ids]
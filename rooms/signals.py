@@ -0,0 +1,53 @@
+"""
+Signal handlers for Room Booking System
+Keeps derived data (availability index, daily rollups, room catalog, page cache, facility tags) in sync with writes
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import availability, catalog, facilities, pagecache, rollups
+from .models import Booking, Facility, Room
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, **kwargs):
+    availability.booking_changed(instance)
+    rollups.booking_changed(instance)
+    pagecache.bookings_changed(booking_rooms(instance))
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    availability.booking_changed(instance, deleted=True)
+    rollups.booking_changed(instance)
+    pagecache.bookings_changed(booking_rooms(instance))
+
+
+@receiver(post_save, sender=Room)
+def room_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'facilities' not in update_fields):
+        return
+    facilities.sync_room(instance, created)
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def room_changed(sender, instance, **kwargs):
+    catalog.room_changed()
+    pagecache.room_changed(instance.pk)
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def facility_changed(sender, instance, **kwargs):
+    # Nama fasilitas ikut di opsi filter yang di-cache per versi katalog
+    # dan di halaman daftar ruangan anonim
+    catalog.room_changed()
+    pagecache.purge([pagecache.ROOMS_TAG])
+
+
+def booking_rooms(booking):
+    """Ruangan booking sekarang dan sebelum diedit"""
+    loaded = getattr(booking, '_loaded_values', None) or {}
+    return {booking.room_id, loaded.get('room_id', booking.room_id)}
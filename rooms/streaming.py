@@ -0,0 +1,26 @@
+"""
+Streaming Helpers for Room Booking System
+Bounded-memory iteration over large querysets
+"""
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def keyset_rows(queryset, fields, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield ``(pk, *fields)`` tuples in pk order, one bounded query per chunk
+
+    ``QuerySet.iterator(chunk_size=...)`` only streams on backends with
+    server-side cursors; the MySQL drivers fetch the whole result set into
+    memory. Paging on ``pk > last_pk`` keeps every query small and uses the
+    primary key, no matter how far into the table the iteration is.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list('pk', *fields)[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
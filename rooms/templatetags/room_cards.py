@@ -0,0 +1,77 @@
+"""
+Room Card Fragments for Room Booking System
+Cached HTML of room cards, fetched for a whole page with one get_many
+"""
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CARD_TEMPLATES = {
+    'list': 'rooms/_room_card.html',
+    'compact': 'rooms/_room_card_compact.html',
+}
+
+# Naikkan CARD_REVISION jika markup partial berubah, agar fragmen lama tidak dipakai
+CARD_REVISION = 1
+CARD_KEY = 'room_card:{revision}:{style}:{audience}:{room_id}:{stamp}'
+CARD_TIMEOUT = 24 * 60 * 60
+
+
+def card_cache_enabled():
+    return getattr(settings, 'ROOM_CARD_CACHE_ENABLED', True)
+
+
+def card_key(room, style, authenticated):
+    """
+    Kunci fragmen satu kartu: id ruangan + updated_at
+
+    updated_at (auto_now) berubah setiap Room.save(), jadi kartu yang
+    diedit otomatis mendapat kunci baru. Tombol booking hanya tampil untuk
+    user yang login, sehingga ada satu varian per audiens.
+    """
+    return CARD_KEY.format(
+        revision=CARD_REVISION,
+        style=style,
+        audience='auth' if authenticated else 'anon',
+        room_id=room.pk,
+        stamp=int(room.updated_at.timestamp() * 1_000_000),
+    )
+
+
+def render_card(room, style, authenticated):
+    return render_to_string(CARD_TEMPLATES[style], {'room': room, 'authenticated': authenticated})
+
+
+def render_cards(rooms, style='list', authenticated=False):
+    """HTML kartu untuk `rooms` (urutan dipertahankan), satu get_many + satu set_many"""
+    rooms = list(rooms)
+    if not card_cache_enabled():
+        return ''.join(render_card(room, style, authenticated) for room in rooms)
+
+    keys = [card_key(room, style, authenticated) for room in rooms]
+    cached = cache.get_many(keys)
+    missing = {}
+    fragments = []
+    for room, key in zip(rooms, keys):
+        html = cached.get(key)
+        if html is None:
+            html = missing[key] = render_card(room, style, authenticated)
+        fragments.append(html)
+    if missing:
+        cache.set_many(missing, CARD_TIMEOUT)
+    return ''.join(fragments)
+
+
+@register.simple_tag(takes_context=True)
+def room_cards(context, rooms, style='list'):
+    """{% room_cards rooms %} atau {% room_cards rooms 'compact' %}"""
+    if style not in CARD_TEMPLATES:
+        raise template.TemplateSyntaxError(f'Gaya kartu ruangan tidak dikenal: {style}')
+    user = context.get('user')
+    authenticated = bool(user is not None and user.is_authenticated)
+    return mark_safe(render_cards(rooms, style, authenticated))
@@ -3,13 +3,32 @@ Comprehensive Test Suite for Room Booking System
 Tests models, views, forms, and business logic
 """
 
-from django.test import TestCase, Client
+import csv
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, SimpleTestCase, Client, override_settings, skipUnlessDBFeature
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Room, Booking
-from .forms import RoomForm, BookingForm
+from .models import ArchivedBooking, Facility, Room, Booking, BookingHistory, BookingSeries, RoomDailyStats
+from django.core.exceptions import ValidationError
+from .forms import RoomForm, BookingForm, BookingUpdateForm
+from . import availability, bitmaps, calendar, catalog, ics, rollups, search
+from .facilities import parse_facilities
+from .streaming import keyset_rows
+from .exports import stream_csv
+from .imports import import_bookings, write_rejects
+from .availability import RoomIntervals, AvailabilityIndex, has_conflict, overlapping_pairs
 
 
 class RoomModelTest(TestCase):
@@ -316,3 +335,1861 @@ class IntegrationTest(TestCase):
         # But can view it
         response = self.client.get(reverse('rooms:room_detail', args=[room.id]))
         self.assertEqual(response.status_code, 200)
+
+
+class RoomIntervalsTest(SimpleTestCase):
+    """Test sorted interval overlap queries"""
+    
+    def setUp(self):
+        self.base = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        h = lambda n: self.base + timedelta(hours=n)
+        self.intervals = RoomIntervals([
+            (1, h(8), h(10)),
+            (2, h(10), h(11)),
+            (3, h(6), h(20)),   # interval panjang yang menaungi yang lain
+            (4, h(21), h(22)),
+        ])
+        self.h = h
+    
+    def test_overlap_detection(self):
+        h = self.h
+        self.assertEqual(sorted(self.intervals.conflicts(h(9), h(10))), [1, 3])
+        self.assertEqual(list(self.intervals.conflicts(h(20), h(21))), [])
+        self.assertTrue(self.intervals.overlaps(h(21), h(23)))
+        self.assertFalse(self.intervals.overlaps(h(0), h(6)))
+    
+    def test_exclude_and_replace(self):
+        h = self.h
+        self.assertFalse(self.intervals.overlaps(h(21), h(22), exclude_id=4))
+        moved = self.intervals.replace(4, h(23), h(24))
+        self.assertFalse(moved.overlaps(h(21), h(22)))
+        self.assertTrue(moved.overlaps(h(23), h(24)))
+        self.assertEqual(len(self.intervals.replace(3)), 3)
+
+
+class AvailabilityIndexTest(TransactionTestCase):
+    """Test the per-room availability index and its version checks"""
+    
+    def setUp(self):
+        cache.clear()
+        availability.index.clear()
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room = Room.objects.create(name="Index Room", location="Test", capacity=10)
+        self.start = timezone.now() + timedelta(days=1)
+        self.end = self.start + timedelta(hours=2)
+    
+    def create_booking(self, **kwargs):
+        data = {
+            'user': self.user,
+            'room': self.room,
+            'title': 'Meeting',
+            'start_datetime': self.start,
+            'end_datetime': self.end,
+            'participants': 5,
+        }
+        data.update(kwargs)
+        return Booking.objects.create(**data)
+    
+    def test_signals_keep_index_current(self):
+        self.assertFalse(has_conflict(self.room.pk, self.start, self.end))
+        booking = self.create_booking()
+        self.assertTrue(has_conflict(self.room.pk, self.start, self.end))
+        self.assertFalse(has_conflict(self.room.pk, self.start, self.end, exclude_id=booking.pk))
+        
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertFalse(has_conflict(self.room.pk, self.start, self.end))
+    
+    def test_other_worker_sees_new_version(self):
+        other_worker = AvailabilityIndex()
+        self.assertFalse(other_worker.get(self.room.pk).overlaps(self.start, self.end))
+        
+        self.create_booking()
+        
+        self.assertTrue(other_worker.get(self.room.pk).overlaps(self.start, self.end))
+    
+    def test_conflicting_booking_rejected(self):
+        self.create_booking()
+        with self.assertRaises(Exception):
+            self.create_booking(start_datetime=self.start + timedelta(hours=1))
+
+
+class BatchAvailabilityTest(TestCase):
+    """Test the batch availability matrix endpoint"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room_a = Room.objects.create(name="Room A", location="Test", capacity=10)
+        self.room_b = Room.objects.create(name="Room B", location="Test", capacity=10)
+        self.base = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        Booking.objects.create(
+            user=self.user, room=self.room_a, title='Busy',
+            start_datetime=self.base, end_datetime=self.base + timedelta(hours=1),
+            participants=5, status='approved'
+        )
+    
+    def window(self, start_hour, end_hour):
+        start = self.base + timedelta(hours=start_hour)
+        end = self.base + timedelta(hours=end_hour)
+        return f'{start.isoformat()}/{end.isoformat()}'
+    
+    def test_matrix_from_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('check_availability_batch'), {
+                'rooms': f'{self.room_a.pk},{self.room_b.pk}',
+                'window': [self.window(0, 1), self.window(1, 2), self.window(-1, 0)],
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['available'], ['011', '111'])
+    
+    def test_invalid_parameters(self):
+        response = self.client.get(reverse('check_availability_batch'), {'rooms': 'x'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('check_availability_batch'), {'rooms': str(self.room_a.pk)})
+        self.assertEqual(response.status_code, 400)
+
+
+class FreeSlotFinderTest(TestCase):
+    """Test the next-free-slots sweep"""
+    
+    def setUp(self):
+        from datetime import time
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room = Room.objects.create(name="Slot Room", location="Test", capacity=10)
+        tomorrow = timezone.localtime() + timedelta(days=1)
+        self.day = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.hours = (time(8, 0), time(18, 0))
+        for start, end in [(10, 11), (11, 12), (17, 33)]:
+            Booking.objects.create(
+                user=self.user, room=self.room, title='Busy',
+                start_datetime=self.at(start), end_datetime=self.at(end),
+                participants=5, status='approved'
+            )
+    
+    def at(self, hour):
+        return self.day + timedelta(hours=hour)
+    
+    def test_sweep_respects_bookings_and_business_hours(self):
+        from .availability import find_free_slots
+        slots = find_free_slots(
+            self.room.pk, timedelta(minutes=60), self.at(9), self.at(72),
+            limit=3, hours=self.hours
+        )
+        self.assertEqual(slots, [
+            (self.at(9), self.at(10)),
+            (self.at(12), self.at(17)),
+            # booking 17:00 sampai 09:00 esok hari memakan pagi hari berikutnya
+            (self.at(33), self.at(42)),
+        ])
+    
+    def test_duration_longer_than_gap_is_skipped(self):
+        from .availability import find_free_slots
+        slots = find_free_slots(self.room.pk, timedelta(hours=2), self.at(9), self.at(24), limit=5)
+        self.assertEqual(slots, [(self.at(12), self.at(17))])
+    
+    def test_free_slots_endpoint(self):
+        response = self.client.get(reverse('free_slots'), {
+            'room_id': self.room.pk, 'duration': 90, 'days': 2, 'limit': 2,
+            'start': self.at(9).isoformat(), 'business_hours': '1',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['slots']), 2)
+        self.assertEqual(self.client.get(reverse('free_slots')).status_code, 400)
+        # Nilai ekstrem tidak boleh menjadi 500
+        for params in ({'duration': 10 ** 15}, {'start': '9999-12-31T00:00:00', 'days': 30}):
+            response = self.client.get(reverse('free_slots'), {'room_id': self.room.pk, **params})
+            self.assertEqual(response.status_code, 400)
+
+
+class RoomSearchTest(TestCase):
+    """Test room search by free window and capacity"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.small = Room.objects.create(name="Small Room", location="A", capacity=10)
+        self.busy = Room.objects.create(name="Busy Hall", location="B", capacity=50)
+        self.free = Room.objects.create(name="Free Hall", location="C", capacity=40)
+        self.start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.end = self.start + timedelta(hours=2)
+        Booking.objects.create(
+            user=self.user, room=self.busy, title='Busy',
+            start_datetime=self.start + timedelta(hours=1), end_datetime=self.end + timedelta(hours=1),
+            participants=5
+        )
+    
+    def test_api_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('room_search_api'), {
+                'min_capacity': 25,
+                'start': self.start.isoformat(),
+                'end': self.end.isoformat(),
+            })
+        self.assertEqual([room['name'] for room in response.json()['rooms']], ['Free Hall'])
+    
+    def test_room_list_filters(self):
+        response = self.client.get(reverse('room_list'), {'min_capacity': 25})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['rooms']), [self.busy, self.free])
+        
+        response = self.client.get(reverse('room_list'), {'start': self.start.isoformat()})
+        self.assertEqual(response.status_code, 200)
+    
+    def test_api_rejects_invalid_window(self):
+        response = self.client.get(reverse('room_search_api'), {
+            'start': self.end.isoformat(), 'end': self.start.isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentBookingStressTest(TransactionTestCase):
+    """Stress test: concurrent booking writes must never produce overlaps"""
+    
+    THREADS = 8
+    ATTEMPTS_PER_THREAD = 15
+    
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(f'stress{i}', f'stress{i}@test.com', 'pass123')
+            for i in range(self.THREADS)
+        ]
+        self.rooms = [
+            Room.objects.create(name=f"Stress Room {i}", location="Test", capacity=10)
+            for i in range(3)
+        ]
+        self.base = (timezone.now() + timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+    
+    def worker(self, user, barrier, results):
+        import random
+        from django.db import connection
+        
+        barrier.wait()
+        try:
+            for _ in range(self.ATTEMPTS_PER_THREAD):
+                # Slot 30 menit yang saling tumpang tindih di sedikit ruangan
+                start = self.base + timedelta(minutes=30 * random.randrange(12))
+                try:
+                    Booking.objects.create(
+                        user=user, room=random.choice(self.rooms), title='Stress',
+                        start_datetime=start, end_datetime=start + timedelta(hours=1),
+                        participants=5
+                    )
+                    results.append('ok')
+                except ValidationError:
+                    results.append('conflict')
+        finally:
+            connection.close()
+    
+    def test_no_overlapping_bookings(self):
+        import threading
+        
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        threads = [
+            threading.Thread(target=self.worker, args=(user, barrier, results))
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(results), self.THREADS * self.ATTEMPTS_PER_THREAD)
+        self.assertGreater(results.count('ok'), 0)
+        for room in self.rooms:
+            bookings = list(Booking.objects.filter(room=room).order_by('start_datetime'))
+            for previous, current in zip(bookings, bookings[1:]):
+                self.assertLessEqual(previous.end_datetime, current.start_datetime)
+
+
+class BookingWriteQueryCountTest(TestCase):
+    """Pin the number of queries for booking create/update validation"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room = Room.objects.create(name="Query Room", location="Test", capacity=10)
+        self.start = (timezone.localtime() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+    
+    def form_data(self, **kwargs):
+        data = {
+            'room': self.room.pk,
+            'title': 'Rapat',
+            'description': '',
+            'start_datetime': self.start.strftime('%Y-%m-%d %H:%M'),
+            'end_datetime': (self.start + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M'),
+            'participants': 5,
+        }
+        data.update(kwargs)
+        return data
+    
+    def test_create_path(self):
+        # room (ModelChoiceField) + savepoint + lock room + cek konflik + INSERT + release
+        with self.assertNumQueries(6):
+            form = BookingForm(data=self.form_data(), user=self.user)
+            self.assertTrue(form.is_valid(), form.errors)
+            booking = form.save(commit=False)
+            booking.user = self.user
+            booking.save()
+    
+    def test_update_path(self):
+        booking = Booking.objects.create(
+            user=self.user, room=self.room, title='Rapat',
+            start_datetime=self.start, end_datetime=self.start + timedelta(hours=1),
+            participants=5
+        )
+        data = self.form_data(title='Rapat Baru')
+        # booking+room (select_related) + savepoint + lock room + cek konflik + UPDATE + release
+        with self.assertNumQueries(6):
+            booking = Booking.objects.select_related('room').get(pk=booking.pk)
+            form = BookingUpdateForm(data=data, instance=booking)
+            self.assertTrue(form.is_valid(), form.errors)
+            form.save()
+    
+    def test_conflict_reported_once_on_save(self):
+        Booking.objects.create(
+            user=self.user, room=self.room, title='Rapat',
+            start_datetime=self.start, end_datetime=self.start + timedelta(hours=1),
+            participants=5
+        )
+        form = BookingForm(data=self.form_data(), user=self.user)
+        self.assertTrue(form.is_valid())
+        booking = form.save(commit=False)
+        booking.user = self.user
+        with self.assertRaises(ValidationError):
+            booking.save()
+    
+    def test_capacity_error_not_duplicated(self):
+        form = BookingForm(data=self.form_data(participants=50), user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(len(form.non_field_errors()), 1)
+    
+    def test_missing_room_raises_validation_error(self):
+        end = self.start + timedelta(hours=1)
+        booking = Booking(user=self.user, title='Rapat', start_datetime=self.start, end_datetime=end, participants=5)
+        with self.assertRaises(ValidationError) as raised:
+            booking.save()
+        self.assertIn('room', raised.exception.message_dict)
+        booking.room_id = self.room.pk + 1000
+        with self.assertRaises(ValidationError) as raised:
+            booking.save()
+        self.assertIn('room', raised.exception.message_dict)
+        self.assertFalse(Booking.objects.exists())
+
+
+class BookingTransitionTest(TestCase):
+    """Test conditional status transitions"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.staff = User.objects.create_user('staff', 'staff@test.com', 'pass123', is_staff=True)
+        self.room = Room.objects.create(name="Transition Room", location="Test", capacity=10)
+        start = timezone.now() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            user=self.user, room=self.room, title='Rapat',
+            start_datetime=start, end_datetime=start + timedelta(hours=1),
+            participants=5
+        )
+    
+    def test_transition_updates_status_and_history(self):
+        # UPDATE + INSERT history di dalam savepoint
+        with self.assertNumQueries(4):
+            won = Booking.objects.transition(
+                self.booking, ['pending'], 'approved', self.staff,
+                notes='OK', fields={'approved_by': self.staff}
+            )
+        self.assertTrue(won)
+        self.assertEqual(self.booking.status, 'approved')
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'approved')
+        self.assertEqual(self.booking.approved_by, self.staff)
+        history = BookingHistory.objects.get(booking=self.booking)
+        self.assertEqual((history.old_status, history.new_status), ('pending', 'approved'))
+        self.assertEqual(history.changed_by, self.staff)
+    
+    def test_losing_transition_changes_nothing(self):
+        stale = Booking.objects.get(pk=self.booking.pk)
+        self.assertTrue(Booking.objects.transition(self.booking.pk, ['pending'], 'rejected', self.staff))
+        self.assertFalse(Booking.objects.transition(stale, ['pending'], 'approved', self.staff))
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, 'rejected')
+        self.assertEqual(BookingHistory.objects.filter(booking=self.booking).count(), 1)
+    
+    def test_multiple_from_states(self):
+        Booking.objects.filter(pk=self.booking.pk).update(status='approved')
+        self.assertTrue(Booking.objects.transition(self.booking.pk, ['pending', 'approved'], 'cancelled', self.user))
+        history = BookingHistory.objects.get(booking=self.booking)
+        self.assertEqual(history.old_status, 'approved')
+    
+    def test_views_use_transition(self):
+        client = Client()
+        client.login(username='staff', password='pass123')
+        client.get(reverse('approve_booking', args=[self.booking.pk]))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'approved')
+        
+        # Persetujuan kedua kalah dan tidak menambah riwayat
+        client.get(reverse('approve_booking', args=[self.booking.pk]))
+        self.assertEqual(BookingHistory.objects.filter(booking=self.booking).count(), 1)
+        
+        client.login(username='testuser', password='pass123')
+        client.post(reverse('cancel_booking', args=[self.booking.pk]))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'cancelled')
+        self.assertFalse(has_conflict(self.room.pk, self.booking.start_datetime, self.booking.end_datetime))
+
+
+class BulkBookingActionTest(TestCase):
+    """Test bulk approve/reject from manage_bookings and the admin"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.staff = User.objects.create_user('staff', 'staff@test.com', 'pass123', is_staff=True, is_superuser=True)
+        self.rooms = [
+            Room.objects.create(name=f"Bulk Room {i}", location="Test", capacity=10)
+            for i in range(3)
+        ]
+        self.base = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.bookings = [
+            Booking.objects.create(
+                user=self.user, room=room, title=f'Rapat {room.pk}',
+                start_datetime=self.base, end_datetime=self.base + timedelta(hours=1),
+                participants=5
+            )
+            for room in self.rooms
+        ]
+        self.client = Client()
+        self.client.login(username='staff', password='pass123')
+    
+    def add_overlapping(self, room):
+        # Tumpukan pending hanya bisa muncul dari data lama/impor: lewati validasi model
+        Booking.objects.bulk_create([Booking(
+            user=self.user, room=room, title='Tumpang',
+            start_datetime=self.base + timedelta(minutes=30),
+            end_datetime=self.base + timedelta(hours=2),
+            participants=5
+        )])
+        return Booking.objects.get(title='Tumpang')
+    
+    def test_overlapping_pairs(self):
+        rows = [
+            (1, 1, self.base, self.base + timedelta(hours=1)),
+            (2, 1, self.base + timedelta(hours=1), self.base + timedelta(hours=2)),
+            (3, 1, self.base + timedelta(minutes=30), self.base + timedelta(hours=3)),
+            (4, 2, self.base, self.base + timedelta(hours=1)),
+        ]
+        self.assertEqual(sorted(overlapping_pairs(rows)), [(1, 3), (3, 2)])
+    
+    def test_bulk_approve_is_set_based(self):
+        ids = [booking.pk for booking in self.bookings]
+        # SELECT ... FOR UPDATE + UPDATE + INSERT riwayat (+ savepoint)
+        with self.assertNumQueries(5):
+            approved, conflicts = Booking.objects.bulk_approve(ids, self.staff)
+        self.assertEqual(sorted(approved), sorted(ids))
+        self.assertEqual(conflicts, [])
+        self.assertEqual(Booking.objects.filter(pk__in=ids, status='approved', approved_by=self.staff).count(), 3)
+        self.assertEqual(BookingHistory.objects.filter(booking__in=ids, new_status='approved').count(), 3)
+    
+    def test_overlapping_selection_is_reported(self):
+        overlapping = self.add_overlapping(self.rooms[0])
+        ids = [booking.pk for booking in self.bookings] + [overlapping.pk]
+        response = self.client.post(reverse('bulk_booking_action'), {
+            'action': 'approve', 'booking_ids': ids, 'return_query': 'status=pending'
+        })
+        self.assertRedirects(response, reverse('manage_bookings') + '?status=pending', fetch_redirect_response=False)
+        statuses = dict(Booking.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[self.bookings[0].pk], 'pending')
+        self.assertEqual(statuses[overlapping.pk], 'pending')
+        self.assertEqual(statuses[self.bookings[1].pk], 'approved')
+        self.assertEqual(statuses[self.bookings[2].pk], 'approved')
+        
+        response = self.client.get(reverse('manage_bookings'))
+        text = ' '.join(str(message) for message in response.context['messages'])
+        self.assertIn('bertumpukan', text)
+        self.assertIn('Tumpang', text)
+    
+    def test_bulk_reject_skips_processed(self):
+        Booking.objects.transition(self.bookings[0], ['pending'], 'approved', self.staff)
+        ids = [booking.pk for booking in self.bookings]
+        self.client.post(reverse('bulk_booking_action'), {
+            'action': 'reject', 'booking_ids': ids, 'rejection_reason': 'Penuh'
+        })
+        self.assertEqual(Booking.objects.filter(status='rejected', notes='Penuh').count(), 2)
+        self.assertEqual(Booking.objects.get(pk=self.bookings[0].pk).status, 'approved')
+    
+    def test_requires_staff(self):
+        self.client.login(username='testuser', password='pass123')
+        self.client.post(reverse('bulk_booking_action'), {
+            'action': 'approve', 'booking_ids': [self.bookings[0].pk]
+        })
+        self.assertEqual(Booking.objects.get(pk=self.bookings[0].pk).status, 'pending')
+    
+    def test_admin_action(self):
+        response = self.client.post(reverse('admin:rooms_booking_changelist'), {
+            'action': 'approve_selected',
+            '_selected_action': [booking.pk for booking in self.bookings],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.filter(status='approved').count(), 3)
+
+
+class BookingSeriesTest(TestCase):
+    """Test recurring booking series"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room = Room.objects.create(name="Series Room", location="Test", capacity=10)
+        self.start = timezone.localtime(timezone.now() + timedelta(days=1)).replace(
+            hour=9, minute=0, second=0, microsecond=0
+        )
+    
+    def make_series(self, **kwargs):
+        values = {
+            'user': self.user, 'room': self.room, 'title': 'Rapat Mingguan', 'participants': 5,
+            'start_datetime': self.start, 'end_datetime': self.start + timedelta(hours=1),
+            'frequency': 'weekly', 'count': 4,
+        }
+        values.update(kwargs)
+        return BookingSeries(**values)
+    
+    def test_weekly_occurrences(self):
+        occurrences = self.make_series().occurrences()
+        self.assertEqual(len(occurrences), 4)
+        self.assertEqual(occurrences[3][0] - occurrences[0][0], timedelta(weeks=3))
+        self.assertTrue(all(end - start == timedelta(hours=1) for start, end in occurrences))
+    
+    def test_until_and_interval(self):
+        series = self.make_series(frequency='daily', interval=2, count=None,
+                                  until=(self.start + timedelta(days=6)).date())
+        self.assertEqual(len(series.occurrences()), 4)
+    
+    def test_monthly_skips_missing_days(self):
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(datetime(2031, 1, 31, 9, 0), tz)
+        series = self.make_series(frequency='monthly', start_datetime=start,
+                                  end_datetime=start + timedelta(hours=1), count=3)
+        months = [timezone.localtime(start).month for start, _ in series.occurrences()]
+        self.assertEqual(months, [1, 3, 5])
+    
+    def test_clean_requires_single_end_rule(self):
+        with self.assertRaises(ValidationError):
+            self.make_series(until=self.start.date()).full_clean()
+        with self.assertRaises(ValidationError):
+            self.make_series(count=None).full_clean()
+    
+    def test_create_reports_conflicts_per_occurrence(self):
+        clash = self.start + timedelta(weeks=2)
+        Booking.objects.create(
+            user=self.user, room=self.room, title='Sudah Ada',
+            start_datetime=clash, end_datetime=clash + timedelta(minutes=30),
+            participants=3
+        )
+        series = self.make_series()
+        # savepoint + lock ruangan + range query + INSERT seri + bulk INSERT + release
+        with self.assertNumQueries(6):
+            report = series.create_bookings()
+        self.assertEqual([item['error'] is None for item in report], [True, True, False, True])
+        self.assertEqual(series.bookings.count(), 3)
+        self.assertTrue(has_conflict(self.room.pk, clash, clash + timedelta(hours=1)))
+        self.assertTrue(has_conflict(self.room.pk, self.start, self.start + timedelta(hours=1)))
+    
+    def test_view(self):
+        client = Client()
+        client.login(username='testuser', password='pass123')
+        response = client.post(reverse('create_booking_series'), {
+            'room': self.room.pk,
+            'title': 'Rapat Mingguan',
+            'description': '',
+            'start_datetime': self.start.strftime('%Y-%m-%d %H:%M'),
+            'end_datetime': (self.start + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M'),
+            'participants': 5,
+            'frequency': 'weekly',
+            'interval': 1,
+            'count': 3,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['report']), 3)
+        self.assertEqual(Booking.objects.filter(series__isnull=False, user=self.user).count(), 3)
+
+
+class BookingSeriesRetryTest(TransactionTestCase):
+    """Test that a retried series write re-inserts the rolled-back series row"""
+    
+    def test_deadlock_after_series_insert(self):
+        user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        room = Room.objects.create(name="Series Room", location="Test", capacity=10)
+        start = timezone.localtime(timezone.now() + timedelta(days=1)).replace(
+            hour=9, minute=0, second=0, microsecond=0
+        )
+        series = BookingSeries(
+            user=user, room=room, title='Rapat Mingguan', participants=5,
+            start_datetime=start, end_datetime=start + timedelta(hours=1), frequency='weekly', count=3,
+        )
+        bulk_create = Booking.objects.bulk_create
+        calls = []
+        
+        def deadlock_once(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError(1213, 'Deadlock found when trying to get lock')
+            return bulk_create(*args, **kwargs)
+        
+        with mock.patch.object(Booking.objects, 'bulk_create', side_effect=deadlock_once), \
+                mock.patch('rooms.concurrency.time.sleep'):
+            report = series.create_bookings()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(report), 3)
+        self.assertTrue(BookingSeries.objects.filter(pk=series.pk).exists())
+        self.assertEqual(Booking.objects.filter(series=series).count(), 3)
+        self.assertEqual(BookingSeries.objects.count(), 1)
+
+
+class CalendarFeedTest(TestCase):
+    """Test calendar page and JSON event feed"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room = Room.objects.create(name="Calendar Room", location="Test", capacity=10)
+        self.other_room = Room.objects.create(name="Other Room", location="Test", capacity=10)
+        self.start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.booking = Booking.objects.create(
+            user=self.user, room=self.room, title='Rapat',
+            start_datetime=self.start, end_datetime=self.start + timedelta(hours=1),
+            participants=5
+        )
+        Booking.objects.create(
+            user=self.user, room=self.other_room, title='Lain',
+            start_datetime=self.start, end_datetime=self.start + timedelta(hours=1),
+            participants=5
+        )
+        self.client = Client()
+        self.client.login(username='testuser', password='pass123')
+        self.params = {
+            'start': (self.start - timedelta(days=2)).isoformat(),
+            'end': (self.start + timedelta(days=2)).isoformat(),
+        }
+    
+    def test_room_feed(self):
+        url = reverse('room_calendar_events', args=[self.room.pk])
+        # session + user + agregat validator + query event
+        with self.assertNumQueries(4):
+            response = self.client.get(url, self.params)
+        self.assertEqual(response.status_code, 200)
+        events = response.json()
+        self.assertEqual([event['title'] for event in events], ['Rapat'])
+        self.assertEqual(events[0]['extendedProps']['room'], 'Calendar Room')
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+    
+    def test_all_rooms_feed(self):
+        response = self.client.get(reverse('calendar_events'), self.params)
+        self.assertEqual(len(response.json()), 2)
+    
+    def test_conditional_get(self):
+        url = reverse('room_calendar_events', args=[self.room.pk])
+        etag = self.client.get(url, self.params)['ETag']
+        
+        # Tanpa perubahan: 304 tanpa query event
+        with self.assertNumQueries(3):
+            response = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        # Pembatalan mengubah validator meskipun booking keluar dari feed
+        Booking.objects.transition(self.booking, ['pending'], 'cancelled', self.user)
+        response = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+    
+    def test_invalid_range(self):
+        url = reverse('calendar_events')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        response = self.client.get(url, {
+            'start': self.start.isoformat(),
+            'end': (self.start + timedelta(days=365)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+    
+    def test_calendar_pages(self):
+        response = self.client.get(reverse('room_calendar', args=[self.room.pk]))
+        self.assertContains(response, reverse('room_calendar_events', args=[self.room.pk]))
+        response = self.client.get(reverse('calendar'))
+        self.assertContains(response, reverse('calendar_events'))
+
+
+class IcsFeedTest(TestCase):
+    """Test streamed iCalendar subscription feeds"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room = Room.objects.create(name="Ruang Rapat, Lt. 2", location="Test", capacity=10)
+        start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        self.bookings = [
+            Booking.objects.create(
+                user=self.user, room=self.room, title=f'Rapat {i}; tim',
+                start_datetime=start + timedelta(hours=2 * i),
+                end_datetime=start + timedelta(hours=2 * i + 1),
+                participants=5
+            )
+            for i in range(5)
+        ]
+        self.url = reverse('room_ics', args=[self.room.pk])
+        self.token = ics.feed_token('room', self.room.pk)
+    
+    def test_token_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, {'token': 'salah'}).status_code, 403)
+        other = reverse('room_ics', args=[self.room.pk + 1])
+        self.assertEqual(self.client.get(other, {'token': self.token}).status_code, 403)
+    
+    def test_streamed_calendar(self):
+        response = self.client.get(self.url, {'token': self.token})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 5)
+        self.assertIn('SUMMARY:Rapat 0\; tim', body)
+        self.assertIn('LOCATION:Ruang Rapat\\, Lt. 2', body)
+        self.assertIn(f'UID:booking-{self.bookings[0].pk}@', body)
+    
+    def test_chunked_iteration(self):
+        queryset = Booking.objects.filter(room=self.room)
+        # 5 baris dalam potongan 2: 3 query
+        with self.assertNumQueries(3):
+            rows = list(keyset_rows(queryset, ('title',), chunk_size=2))
+        self.assertEqual([row[0] for row in rows], sorted(booking.pk for booking in self.bookings))
+    
+    def test_conditional_get(self):
+        response = self.client.get(self.url, {'token': self.token})
+        etag = response['ETag']
+        response = self.client.get(self.url, {'token': self.token}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        Booking.objects.transition(self.bookings[0], ['pending'], 'cancelled', self.user)
+        response = self.client.get(self.url, {'token': self.token}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 4)
+    
+    def test_room_rename_revalidates(self):
+        etag = self.client.get(self.url, {'token': self.token})['ETag']
+        self.room.name = 'Aula Utama'
+        self.room.save()
+        response = self.client.get(self.url, {'token': self.token}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('LOCATION:Aula Utama', b''.join(response.streaming_content).decode())
+    
+    def test_user_feed(self):
+        url = reverse('user_ics', args=[self.user.pk])
+        response = self.client.get(url, {'token': ics.feed_token('user', self.user.pk)})
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 5)
+        # Token ruangan tidak berlaku untuk feed user
+        self.assertEqual(self.client.get(url, {'token': self.token}).status_code, 403)
+    
+    def test_line_folding(self):
+        line = 'SUMMARY:' + 'é' * 60
+        folded = ics.fold(line)
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded.split('\r\n')))
+        self.assertEqual(folded.replace('\r\n ', '').rstrip('\r\n'), line)
+
+
+class BookingExportTest(TestCase):
+    """Test streamed CSV/JSONL exports"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.staff = User.objects.create_user('staff', 'staff@test.com', 'pass123', is_staff=True)
+        self.room = Room.objects.create(name="Export Room", location="Test", capacity=10)
+        self.other_room = Room.objects.create(name="Other Room", location="Test", capacity=10)
+        self.start = timezone.localtime(timezone.now() + timedelta(days=3)).replace(
+            hour=9, minute=0, second=0, microsecond=0
+        )
+        for day in range(3):
+            for room in (self.room, self.other_room):
+                start = self.start + timedelta(days=day)
+                Booking.objects.create(
+                    user=self.user, room=room, title=f'Rapat, "{room.name}" {day}',
+                    start_datetime=start, end_datetime=start + timedelta(hours=1),
+                    participants=5
+                )
+        self.client = Client()
+        self.client.login(username='staff', password='pass123')
+    
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+    
+    def test_csv_export_with_filters(self):
+        response = self.client.get(reverse('export_bookings'), {
+            'format': 'csv',
+            'room': self.room.pk,
+            'date_from': (self.start + timedelta(days=1)).date().isoformat(),
+            'date_to': (self.start + timedelta(days=2)).date().isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['room'], 'Export Room')
+        self.assertEqual(rows[0]['title'], 'Rapat, "Export Room" 1')
+        self.assertEqual(rows[0]['user'], 'testuser')
+    
+    def test_jsonl_export(self):
+        response = self.client.get(reverse('export_bookings'), {'format': 'jsonl', 'status': 'pending'})
+        lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 6)
+        record = json.loads(lines[0])
+        self.assertEqual(record['status'], 'pending')
+        self.assertIsNone(record['approved_by'])
+    
+    def test_chunked_queries(self):
+        # 6 baris dalam potongan 4: 2 query, header dikirim sebelum query pertama
+        chunks = stream_csv(Booking.objects.all(), chunk_size=4)
+        with self.assertNumQueries(0):
+            self.assertTrue(next(chunks).startswith('id,title,room'))
+        with self.assertNumQueries(2):
+            list(chunks)
+    
+    def test_invalid_params(self):
+        url = reverse('export_bookings')
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'date_from': 'kemarin'}).status_code, 400)
+    
+    def test_requires_staff(self):
+        self.client.login(username='testuser', password='pass123')
+        response = self.client.get(reverse('export_bookings'))
+        self.assertRedirects(response, reverse('home'))
+    
+    def test_manage_bookings_date_filter(self):
+        response = self.client.get(reverse('manage_bookings'), {
+            'date_from': self.start.date().isoformat(),
+            'date_to': self.start.date().isoformat(),
+        })
+        self.assertEqual(len(response.context['bookings']), 2)
+        self.assertIn('date_from=', response.context['filter_query'])
+    
+    def test_management_command(self):
+        out = io.StringIO()
+        call_command('export_bookings', '--format', 'jsonl', '--room', str(self.other_room.pk), stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+
+class BookingImportTest(TestCase):
+    """Test bulk booking import"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('dosen1', 'd1@test.com', 'pass123')
+        User.objects.create_user('dosen2', 'd2@test.com', 'pass123')
+        self.staff = User.objects.create_user('staff', 'staff@test.com', 'pass123', is_staff=True)
+        self.room = Room.objects.create(name="Kelas A", location="Test", capacity=40)
+        self.other_room = Room.objects.create(name="Kelas B", location="Test", capacity=20)
+        self.day = timezone.localtime(timezone.now() + timedelta(days=7)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ).replace(tzinfo=None)
+        # Booking yang sudah ada di database
+        self.existing = Booking.objects.create(
+            user=self.user, room=self.other_room, title='Sudah Ada',
+            start_datetime=timezone.make_aware(self.day.replace(hour=13)),
+            end_datetime=timezone.make_aware(self.day.replace(hour=15)),
+            participants=10
+        )
+    
+    def at(self, hour):
+        return self.day.replace(hour=hour).isoformat(sep=' ')
+    
+    def csv_file(self):
+        rows = [
+            ['title', 'room', 'user', 'start', 'end', 'participants'],
+            ['Kalkulus', 'Kelas A', 'dosen1', self.at(8), self.at(10), '30'],        # baris 2: ok
+            ['Fisika', 'kelas a', 'dosen2', self.at(9), self.at(11), '30'],          # baris 3: bentrok baris 2
+            ['Kimia', str(self.room.pk), 'dosen2', self.at(10), self.at(12), '30'],  # baris 4: ok
+            ['Biologi', 'Kelas B', 'dosen1', self.at(14), self.at(16), '10'],        # baris 5: bentrok DB
+            ['Statistik', 'Kelas B', 'tidakada', self.at(8), self.at(9), '10'],      # baris 6: user tidak ada
+            ['Seminar', 'Kelas B', 'dosen1', self.at(8), self.at(9), '50'],          # baris 7: kapasitas
+            ['Agama', 'Kelas C', 'dosen1', self.at(8), self.at(9), '10'],            # baris 8: ruangan
+        ]
+        content = io.StringIO()
+        csv.writer(content).writerows(rows)
+        content.seek(0)
+        return content
+    
+    def test_import_resolves_conflicts(self):
+        report = import_bookings(self.csv_file(), 'csv', chunk_size=3)
+        self.assertEqual(report.total, 7)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([line for line, _, _ in report.rejected], [3, 5, 6, 7, 8])
+        errors = dict((line, error) for line, _, error in report.rejected)
+        self.assertIn('baris 2', errors[3])
+        self.assertIn(f'#{self.existing.pk}', errors[5])
+        self.assertEqual(
+            sorted(Booking.objects.filter(room=self.room).values_list('title', flat=True)),
+            ['Kalkulus', 'Kimia']
+        )
+        # Indeks ketersediaan ikut diperbarui setelah bulk_create
+        self.assertTrue(has_conflict(self.room.pk, timezone.make_aware(self.day.replace(hour=9)),
+                                     timezone.make_aware(self.day.replace(hour=10))))
+    
+    def test_query_count_is_batched(self):
+        # rooms + user baru per potongan (2 dari 3 potongan) + savepoint + lock
+        # + range query + bulk INSERT + release
+        with self.assertNumQueries(8):
+            import_bookings(self.csv_file(), 'csv', chunk_size=3)
+    
+    def test_dry_run_and_reject_file(self):
+        report = import_bookings(self.csv_file(), 'csv', dry_run=True)
+        self.assertEqual(report.created, 2)
+        self.assertEqual(Booking.objects.count(), 1)
+        
+        output = io.StringIO()
+        write_rejects(report.rejected, output, 'csv')
+        output.seek(0)
+        rows = list(csv.DictReader(output))
+        self.assertEqual([row['line'] for row in rows], ['3', '5', '6', '7', '8'])
+        self.assertEqual(rows[0]['title'], 'Fisika')
+    
+    def test_room_pk_and_name_do_not_collide(self):
+        numbered = Room.objects.create(name=str(self.room.pk), location="Test", capacity=5)
+        unique = Room.objects.create(name="Lab 7", location="Test", capacity=5)
+        lines = [
+            json.dumps({'title': 'Ambigu', 'room': str(self.room.pk), 'user': 'dosen1',
+                        'start': self.at(8), 'end': self.at(9), 'participants': 3}),
+            json.dumps({'title': 'Nama', 'room': 'lab 7', 'user': 'dosen1',
+                        'start': self.at(8), 'end': self.at(9), 'participants': 3}),
+            json.dumps({'title': 'Pk', 'room': unique.pk, 'user': 'dosen1',
+                        'start': self.at(10), 'end': self.at(11), 'participants': 3}),
+        ]
+        report = import_bookings(io.StringIO('\n'.join(lines) + '\n'), 'jsonl')
+        self.assertEqual(report.created, 2)
+        (line, _, error), = report.rejected
+        self.assertEqual(line, 1)
+        self.assertIn(f'#{self.room.pk}', error)
+        self.assertIn(f'#{numbered.pk}', error)
+        self.assertEqual(Booking.objects.filter(room=unique).count(), 2)
+
+    def test_jsonl_import(self):
+        lines = [
+            json.dumps({'title': 'Kalkulus', 'room': 'Kelas A', 'user': 'dosen1',
+                        'start': self.at(8), 'end': self.at(10), 'participants': 30, 'status': 'approved'}),
+            'bukan json',
+        ]
+        report = import_bookings(io.StringIO('\n'.join(lines) + '\n'), 'jsonl', actor=self.staff)
+        self.assertEqual(report.created, 1)
+        self.assertEqual([line for line, _, _ in report.rejected], [2])
+        booking = Booking.objects.get(title='Kalkulus')
+        self.assertEqual((booking.status, booking.approved_by), ('approved', self.staff))
+        history = booking.history.get()
+        self.assertEqual((history.old_status, history.new_status, history.changed_by), ('pending', 'approved', self.staff))
+    
+    def test_upload_page(self):
+        client = Client()
+        client.login(username='staff', password='pass123')
+        upload = SimpleUploadedFile('jadwal.csv', self.csv_file().getvalue().encode('utf-8'))
+        response = client.post(reverse('import_bookings'), {'file': upload, 'status': 'pending'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report'].created, 2)
+        
+        rejects = client.get(response.context['rejects_url'])
+        self.assertEqual(rejects.status_code, 200)
+        self.assertIn('Fisika', rejects.content.decode())
+    
+    def test_management_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'jadwal.csv')
+            rejects = os.path.join(directory, 'rejects.csv')
+            with open(path, 'w', newline='') as output:
+                output.write(self.csv_file().getvalue())
+            out = io.StringIO()
+            call_command('import_bookings', path, '--rejects', rejects, stdout=out)
+            self.assertIn('2 of 7 bookings created', out.getvalue())
+            with open(rejects) as stream:
+                self.assertEqual(len(list(csv.DictReader(stream))), 5)
+
+
+class RoomAnalyticsTest(TestCase):
+    """Test room utilization analytics"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.staff = User.objects.create_user('staff', 'staff@test.com', 'pass123', is_staff=True)
+        self.room = Room.objects.create(name="Analytics Room", location="Test", capacity=20)
+        self.empty_room = Room.objects.create(name="Empty Room", location="Test", capacity=10)
+        tz = timezone.get_current_timezone()
+        # Senin 2030-01-07, 09:30-11:00 waktu lokal, 10 dari 20 kursi
+        self.monday = datetime(2030, 1, 7)
+        start = timezone.make_aware(self.monday.replace(hour=9, minute=30), tz)
+        Booking.objects.bulk_create([
+            Booking(user=self.user, room=self.room, title='Dipakai', status='approved',
+                    start_datetime=start, end_datetime=start + timedelta(minutes=90), participants=10),
+            Booking(user=self.user, room=self.room, title='Pending', status='pending',
+                    start_datetime=start + timedelta(hours=3), end_datetime=start + timedelta(hours=4),
+                    participants=10),
+        ])
+        Booking.objects.filter(title='Dipakai').update(created_at=start - timedelta(hours=48))
+    
+    def test_epoch_projection(self):
+        from .analytics import Epoch
+        booking = Booking.objects.get(title='Dipakai')
+        value = Booking.objects.filter(pk=booking.pk).values_list(Epoch('start_datetime'), flat=True).get()
+        self.assertEqual(value, int(booking.start_datetime.timestamp()))
+    
+    def test_utilization(self):
+        from . import analytics
+        with self.assertNumQueries(2):
+            report = analytics.room_utilization(self.monday.date(), self.monday.date() + timedelta(days=6))
+        self.assertEqual(report['bookings'], 1)
+        rooms = {room['name']: room for room in report['rooms']}
+        room = rooms['Analytics Room']
+        # Senin = jam-minggu 0..23: 30 menit di jam 9, 60 menit di jam 10
+        self.assertEqual(room['hour_of_week'][9], 0.5)
+        self.assertEqual(room['hour_of_week'][10], 1.0)
+        self.assertEqual(sum(room['hour_of_week']), 1.5)
+        self.assertEqual(room['avg_lead_time_hours'], 48.0)
+        self.assertEqual(room['capacity_utilization'], 0.5)
+        self.assertEqual(room['wasted_seat_hours'], 15.0)
+        self.assertAlmostEqual(room['occupancy'], 1.5 / (7 * 24), places=4)
+        self.assertEqual(rooms['Empty Room']['bookings'], 0)
+        self.assertIsNone(rooms['Empty Room']['avg_lead_time_hours'])
+        self.assertEqual(report['peak_hours'][0], {'weekday': 0, 'hour': 10, 'occupancy': 0.5})
+    
+    def test_api_and_page(self):
+        client = Client()
+        client.login(username='staff', password='pass123')
+        params = {'start': '2030-01-07', 'end': '2030-01-13', 'rooms': str(self.room.pk)}
+        response = client.get(reverse('analytics_api'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room['name'] for room in response.json()['rooms']], ['Analytics Room'])
+        self.assertEqual(client.get(reverse('analytics_api'), {'start': '2030-01-07', 'end': '2031-06-01'}).status_code, 400)
+        
+        response = client.get(reverse('analytics'), params)
+        self.assertContains(response, 'Senin 10:00')
+        
+        client.login(username='testuser', password='pass123')
+        self.assertEqual(client.get(reverse('analytics_api')).status_code, 403)
+
+
+class RoomDailyStatsTest(TestCase):
+    """Test daily occupancy rollups"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.staff = User.objects.create_user('staff', 'staff@test.com', 'pass123', is_staff=True)
+        self.room = Room.objects.create(name="Rollup Room", location="Test", capacity=20)
+        self.tz = timezone.get_current_timezone()
+        self.day = datetime(2030, 1, 7).date()
+    
+    def at(self, day_offset, hour, minute=0):
+        naive = datetime.combine(self.day + timedelta(days=day_offset), datetime.min.time())
+        return timezone.make_aware(naive.replace(hour=hour, minute=minute), self.tz)
+    
+    def create(self, start, end, participants=5, status='pending'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                user=self.user, room=self.room, title='Rapat', status=status,
+                start_datetime=start, end_datetime=end, participants=participants,
+            )
+    
+    def stats(self):
+        return {
+            row.date: row
+            for row in RoomDailyStats.objects.filter(room=self.room)
+        }
+    
+    def test_create_transition_and_delete(self):
+        booking = self.create(self.at(0, 9), self.at(0, 10, 30))
+        day = self.stats()[self.day]
+        self.assertEqual((day.pending_count, day.booked_minutes, day.peak_participants), (1, 0, 0))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.transition(booking, ['pending'], 'approved', self.staff)
+        day = self.stats()[self.day]
+        self.assertEqual((day.pending_count, day.approved_count), (0, 1))
+        self.assertEqual((day.booked_minutes, day.peak_participants), (90, 5))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertEqual(self.stats(), {})
+    
+    def test_overnight_booking_and_move(self):
+        booking = self.create(self.at(0, 22), self.at(1, 2), participants=8, status='approved')
+        stats = self.stats()
+        self.assertEqual(stats[self.day].booked_minutes, 120)
+        self.assertEqual(stats[self.day].approved_count, 1)
+        self.assertEqual(stats[self.day + timedelta(days=1)].booked_minutes, 120)
+        # Jumlah booking hanya dicatat di hari mulai
+        self.assertEqual(stats[self.day + timedelta(days=1)].booking_count, 0)
+        
+        # Pindah jadwal: hari lama ikut dihitung ulang
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.start_datetime, booking.end_datetime = self.at(3, 9), self.at(3, 10)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(list(self.stats()), [self.day + timedelta(days=3)])
+    
+    def test_bulk_approve_and_rebuild(self):
+        first = self.create(self.at(0, 9), self.at(0, 10), participants=3)
+        second = self.create(self.at(0, 11), self.at(0, 12), participants=7)
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.bulk_approve([first.pk, second.pk], self.staff)
+        day = self.stats()[self.day]
+        self.assertEqual((day.approved_count, day.booked_minutes, day.peak_participants), (2, 120, 7))
+        
+        # Rebuild menghasilkan angka yang sama dan memperbaiki rollup yang menyimpang
+        RoomDailyStats.objects.filter(room=self.room).update(booked_minutes=1, approved_count=0)
+        RoomDailyStats.objects.create(room=self.room, date=self.day + timedelta(days=5), pending_count=4)
+        call_command('rebuild_rollups', stdout=io.StringIO())
+        stats = self.stats()
+        self.assertEqual(list(stats), [self.day])
+        self.assertEqual((stats[self.day].approved_count, stats[self.day].booked_minutes), (2, 120))
+
+    def test_refreshes_coalesce_per_transaction(self):
+        for offset in range(3):
+            self.create(self.at(offset, 9), self.at(offset, 10), status='approved')
+        self.assertEqual(len(self.stats()), 3)
+
+        # Cascade delete: satu refresh untuk semua booking ruangan
+        with mock.patch('rooms.rollups.refresh', wraps=rollups.refresh) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                Booking.objects.filter(room=self.room).delete()
+        self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(len(refresh.call_args.args[0]), 3)
+        self.assertEqual(self.stats(), {})
+
+    def test_refresh_failure_is_logged(self):
+        with self.assertLogs('rooms.rollups', level='ERROR'):
+            with mock.patch('rooms.rollups.refresh', side_effect=RuntimeError('boom')):
+                booking = self.create(self.at(0, 9), self.at(0, 10))
+        self.assertTrue(Booking.objects.filter(pk=booking.pk).exists())
+
+    def test_metrics_and_summary_read_rollups(self):
+        self.create(self.at(0, 9), self.at(0, 10), status='approved')
+        self.create(self.at(1, 9), self.at(1, 10))
+        
+        with self.assertNumQueries(3):
+            response = Client().get(reverse('metrics'))
+        self.assertIn('room_booking_bookings_total 2', response.json()['metrics'])
+        self.assertIn('room_booking_bookings_by_status{status="pending"} 1', response.json()['metrics'])
+        
+        summary = rollups.daily_summary(self.day, self.day + timedelta(days=1))
+        self.assertEqual([day['bookings'] for day in summary['days']], [1, 1])
+        self.assertEqual(summary['days'][0]['booked_minutes'], 60)
+        self.assertEqual(summary['rooms'][0]['by_status']['approved'], 1)
+        self.assertEqual(summary['rooms'][0]['occupancy'], round(60 / (2 * 24 * 60), 4))
+        
+        client = Client()
+        client.login(username='staff', password='pass123')
+        response = client.get(reverse('analytics_api'), {'start': '2030-01-07', 'end': '2030-01-08', 'summary': '1'})
+        self.assertEqual(response.json()['days'][1]['by_status']['pending'], 1)
+        self.assertContains(client.get(reverse('analytics'), {'start': '2030-01-07', 'end': '2030-01-08'}),
+                            'Ringkasan Harian')
+
+
+class SlotBitmapTest(SimpleTestCase):
+    """Test slot bitmap construction and bit operations"""
+    
+    def at(self, day, hour, minute=0):
+        naive = datetime(2030, 1, day, hour, minute)
+        return timezone.make_aware(naive, timezone.get_current_timezone())
+    
+    def test_day_masks(self):
+        masks = list(bitmaps.day_masks(self.at(7, 9), self.at(7, 10)))
+        self.assertEqual(masks, [(datetime(2030, 1, 7).date(), 0b1111 << 36, 0b1111 << 36)])
+        
+        # Ujung yang tidak sejajar menyentuh slot tetapi tidak menutupinya
+        _, mask, covered = next(bitmaps.day_masks(self.at(7, 9, 5), self.at(7, 10, 10)))
+        self.assertEqual(mask, 0b11111 << 36)
+        self.assertEqual(covered, 0b111 << 37)
+        
+        # Melewati tengah malam: dipecah per hari
+        days = list(bitmaps.day_masks(self.at(7, 23, 30), self.at(8, 0, 30)))
+        self.assertEqual([mask for _, mask, _ in days], [0b11 << 94, 0b11])
+    
+    def test_build_and_free_runs(self):
+        grid = bitmaps.build([
+            (1, self.at(7, 0), self.at(7, 1)),
+            (1, self.at(7, 2, 10), self.at(7, 3)),
+        ])
+        bits = grid[1, datetime(2030, 1, 7).date()]
+        self.assertEqual(bits, 0b1111 | (0b1111 << 8))
+        self.assertEqual(bitmaps.decode(bitmaps.encode(bits)), bits)
+        self.assertEqual(list(bitmaps.free_runs(bits)), [(4, 8), (12, 96)])
+        self.assertEqual(list(bitmaps.free_runs(bits, min_slots=5)), [(12, 96)])
+
+
+class SlotBitmapStoreTest(TransactionTestCase):
+    """Test the bitmap store and the availability fast paths"""
+    
+    def setUp(self):
+        cache.clear()
+        availability.index.clear()
+        bitmaps.store.clear()
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room_a = Room.objects.create(name="Room A", location="Test", capacity=10)
+        self.room_b = Room.objects.create(name="Room B", location="Test", capacity=10)
+        self.day = (timezone.localtime() + timedelta(days=2)).date()
+        self.base = timezone.make_aware(
+            datetime.combine(self.day, datetime.min.time()).replace(hour=9),
+            timezone.get_current_timezone(),
+        )
+        self.booking = Booking.objects.create(
+            user=self.user, room=self.room_a, title='Busy', status='approved',
+            start_datetime=self.base, end_datetime=self.base + timedelta(minutes=50),
+            participants=5,
+        )
+    
+    def test_fast_path_and_invalidation(self):
+        rooms = [self.room_a.pk, self.room_b.pk]
+        end = self.base + timedelta(hours=1)
+        self.assertEqual(bitmaps.window_states(rooms, self.base, end), {self.room_a.pk: False, self.room_b.pk: True})
+        # Bitmap sudah dimuat: hanya membaca versi ruangan dari cache
+        with self.assertNumQueries(0):
+            self.assertIs(bitmaps.is_free(self.room_b.pk, self.base, end), True)
+            # 09:50-10:00 ada di slot yang sebagian terisi: harus cek database
+            self.assertIsNone(bitmaps.is_free(self.room_a.pk, self.base + timedelta(minutes=50), end))
+        
+        # Salinan di cache bersama dipakai worker lain
+        bitmaps.store.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(bitmaps.window_states(rooms, self.base, end), {self.room_a.pk: False, self.room_b.pk: True})
+        
+        # Penulisan booking menaikkan versi ruangan setelah commit
+        Booking.objects.transition(self.booking, ['approved'], 'cancelled', self.user)
+        self.assertIs(bitmaps.is_free(self.room_a.pk, self.base, end), True)
+    
+    def test_views_use_bitmaps(self):
+        end = self.base + timedelta(hours=1)
+        response = self.client.get(reverse('check_availability'), {
+            'room_id': self.room_a.pk, 'start_datetime': self.base.isoformat(), 'end_datetime': end.isoformat(),
+        })
+        self.assertFalse(response.json()['available'])
+        
+        # Jendela tidak sejajar jatuh ke pengecekan tepat
+        windows = [
+            f'{self.base.isoformat()}/{end.isoformat()}',
+            f'{(self.base + timedelta(minutes=50)).isoformat()}/{end.isoformat()}',
+        ]
+        response = self.client.get(reverse('check_availability_batch'), {
+            'rooms': f'{self.room_a.pk},{self.room_b.pk}', 'window': windows,
+        })
+        self.assertEqual(response.json()['available'], ['01', '11'])
+        
+        response = self.client.get(reverse('availability_grid'), {
+            'rooms': str(self.room_a.pk), 'start': self.day.isoformat(), 'days': 2,
+        })
+        days = response.json()['rooms'][str(self.room_a.pk)]
+        self.assertEqual(int(days[self.day.isoformat()], 16), 0b1111 << 36)
+        self.assertEqual(int(days[(self.day + timedelta(days=1)).isoformat()], 16), 0)
+        self.assertEqual(self.client.get(reverse('availability_grid'), {'rooms': 'x'}).status_code, 400)
+    
+    def test_free_slots_fast_path(self):
+        from datetime import time
+        Booking.objects.create(
+            user=self.user, room=self.room_a, title='Malam', status='pending',
+            start_datetime=self.base + timedelta(hours=8), end_datetime=self.base + timedelta(hours=24),
+            participants=5,
+        )
+        # Mulai di tengah slot 11:00-11:15: celah 10:00-11:05 tetap muat 65 menit
+        Booking.objects.create(
+            user=self.user, room=self.room_a, title='Tengah Slot', status='approved',
+            start_datetime=self.base + timedelta(hours=2, minutes=5), end_datetime=self.base + timedelta(hours=2, minutes=30),
+            participants=5,
+        )
+        duration = timedelta(minutes=65)
+        search_start = self.base - timedelta(hours=1, minutes=50)
+        search_end = self.base + timedelta(days=2)
+        for hours in (None, (time(8, 0), time(18, 0))):
+            exact = availability.find_free_slots(self.room_a.pk, duration, search_start, search_end,
+                                                 limit=4, hours=hours)
+            fast = bitmaps.find_free_slots(self.room_a.pk, duration, search_start, search_end,
+                                           limit=4, hours=hours)
+            # Booking 09:00-09:50 mengisi slot 09:45 sampai habis, jadi hasilnya sama
+            self.assertEqual(fast, exact)
+        
+        # Bitmap dan indeks sudah dimuat: endpoint tidak menyentuh database
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('free_slots'), {
+                'room_id': self.room_a.pk, 'duration': 65, 'days': 2, 'limit': 4,
+                'start': search_start.isoformat(),
+            })
+        slots = response.json()['slots']
+        self.assertEqual(len(slots), 4)
+        self.assertEqual(
+            (slots[1]['start'], slots[1]['end']),
+            (timezone.localtime(self.base + timedelta(hours=1)).isoformat(),
+             timezone.localtime(self.base + timedelta(hours=2, minutes=5)).isoformat()),
+        )
+
+
+class CompletePastBookingsTest(TestCase):
+    """Test the scheduled completion of past bookings"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room = Room.objects.create(name="Past Room", location="Test", capacity=10)
+        now = timezone.now()
+        specs = {
+            'ended': ('approved', now - timedelta(hours=3), now - timedelta(hours=1)),
+            'ended_too': ('approved', now - timedelta(days=2), now - timedelta(days=2) + timedelta(hours=1)),
+            'ongoing': ('approved', now - timedelta(minutes=30), now + timedelta(minutes=30)),
+            'future': ('approved', now + timedelta(days=1), now + timedelta(days=1, hours=1)),
+            'stale_pending': ('pending', now - timedelta(minutes=10), now + timedelta(minutes=50)),
+            'pending': ('pending', now + timedelta(days=2), now + timedelta(days=2, hours=1)),
+        }
+        # bulk_create: validasi model menolak booking di masa lalu
+        Booking.objects.bulk_create([
+            Booking(user=self.user, room=self.room, title=title, status=status,
+                    start_datetime=start, end_datetime=end, participants=5)
+            for title, (status, start, end) in specs.items()
+        ])
+    
+    def statuses(self):
+        return dict(Booking.objects.values_list('title', 'status'))
+    
+    def test_command_completes_and_expires(self):
+        out = io.StringIO()
+        call_command('complete_past_bookings', '--chunk-size', '1', stdout=out)
+        self.assertIn('completed 2 bookings, expired 1 pending bookings', out.getvalue())
+        self.assertEqual(self.statuses(), {
+            'ended': 'completed',
+            'ended_too': 'completed',
+            'ongoing': 'approved',
+            'future': 'approved',
+            'stale_pending': 'cancelled',
+            'pending': 'pending',
+        })
+        history = BookingHistory.objects.filter(booking__title='ended').get()
+        self.assertIsNone(history.changed_by)
+        self.assertEqual((history.old_status, history.new_status), ('approved', 'completed'))
+        
+        # Run berikutnya tidak menemukan apa-apa lagi
+        call_command('complete_past_bookings', stdout=out)
+        self.assertEqual(BookingHistory.objects.count(), 3)
+    
+    def test_set_based_chunks(self):
+        # Satu potongan: SELECT pk, SELECT ... FOR UPDATE, UPDATE, INSERT riwayat (+ savepoint)
+        with self.assertNumQueries(6):
+            self.assertEqual(Booking.objects.complete_past(), 2)
+        self.assertEqual(Booking.objects.expire_pending(), 1)
+    
+    def test_system_history_rendered(self):
+        Booking.objects.complete_past()
+        booking = Booking.objects.get(title='ended')
+        self.client.login(username='testuser', password='pass123')
+        response = self.client.get(reverse('booking_detail', args=[booking.pk]))
+        self.assertContains(response, 'oleh Sistem')
+
+    def test_completed_bookings_stay_in_feeds(self):
+        Booking.objects.complete_past()
+        booking = Booking.objects.get(title='ended')
+        self.assertEqual(booking.status, 'completed')
+
+        events = calendar.events(booking.start_datetime - timedelta(days=1), booking.end_datetime + timedelta(days=1))
+        self.assertIn(booking.pk, [event['id'] for event in events])
+
+        url = reverse('room_ics', args=[self.room.pk])
+        response = self.client.get(url, {'token': ics.feed_token('room', self.room.pk)})
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'UID:booking-{booking.pk}@', body)
+        self.assertIn('SUMMARY:ended', body)
+
+
+class BookingArchiveTest(TestCase):
+    """Test archiving finished bookings and reading both tiers"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.staff = User.objects.create_user('staff', 'staff@test.com', 'pass123', is_staff=True)
+        self.room = Room.objects.create(name="Archive Room", location="Test", capacity=10)
+        old = timezone.now() - timedelta(days=400)
+        recent = timezone.now() - timedelta(days=10)
+        specs = [
+            ('Lama Selesai', 'completed', old),
+            ('Lama Batal', 'cancelled', old + timedelta(hours=3)),
+            ('Lama Disetujui', 'approved', old + timedelta(hours=6)),
+            ('Baru Selesai', 'completed', recent),
+        ]
+        Booking.objects.bulk_create([
+            Booking(user=self.user, room=self.room, title=title, status=status,
+                    start_datetime=start, end_datetime=start + timedelta(hours=1), participants=4)
+            for title, status, start in specs
+        ])
+        self.old_completed = Booking.objects.get(title='Lama Selesai')
+        BookingHistory.objects.create(booking=self.old_completed, old_status='approved',
+                                      new_status='completed', changed_by=None, notes='Selesai otomatis')
+    
+    def test_archive_moves_bookings_and_history(self):
+        rollups.rebuild()
+        before = sorted(RoomDailyStats.objects.values_list('date', 'completed_count', 'booked_minutes'))
+        
+        out = io.StringIO()
+        call_command('archive_bookings', '--dry-run', stdout=out)
+        self.assertIn('2 bookings', out.getvalue())
+        call_command('archive_bookings', '--chunk-size', '1', stdout=out)
+        self.assertIn('Archived 2 bookings', out.getvalue())
+        
+        self.assertEqual(
+            sorted(Booking.objects.values_list('title', flat=True)), ['Baru Selesai', 'Lama Disetujui']
+        )
+        archived = ArchivedBooking.objects.get(pk=self.old_completed.pk)
+        self.assertEqual((archived.title, archived.status), ('Lama Selesai', 'completed'))
+        self.assertEqual(archived.history.get().notes, 'Selesai otomatis')
+        self.assertFalse(BookingHistory.objects.exists())
+        
+        # Rollup tetap menghitung booking yang sudah diarsipkan
+        rollups.refresh(
+            (self.room.pk, day) for day in RoomDailyStats.objects.values_list('date', flat=True)
+        )
+        self.assertEqual(
+            sorted(RoomDailyStats.objects.values_list('date', 'completed_count', 'booked_minutes')), before
+        )
+    
+    def test_exports_and_analytics_union_tiers(self):
+        from . import analytics
+        call_command('archive_bookings', stdout=io.StringIO())
+        client = Client()
+        client.login(username='staff', password='pass123')
+        
+        response = client.get(reverse('export_bookings'), {'format': 'csv'})
+        content = b''.join(response.streaming_content).decode()
+        self.assertNotIn('Lama Selesai', content)
+        response = client.get(reverse('export_bookings'), {'format': 'csv', 'include_archive': '1'})
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['title'] for row in rows][:2], ['Lama Selesai', 'Lama Batal'])
+        self.assertEqual(len(rows), 4)
+        
+        if analytics.NUMPY_AVAILABLE:
+            day = timezone.localtime(self.old_completed.start_datetime).date()
+            report = analytics.room_utilization(day, day + timedelta(days=1), include_archive=True)
+            # Booking terarsip yang selesai + booking approved yang masih di tabel utama
+            self.assertEqual(report['bookings'], 2)
+            self.assertEqual(analytics.room_utilization(day, day + timedelta(days=1))['bookings'], 1)
+    
+    def test_staff_views_are_read_only(self):
+        call_command('archive_bookings', stdout=io.StringIO())
+        client = Client()
+        client.login(username='testuser', password='pass123')
+        self.assertRedirects(client.get(reverse('archived_bookings')), reverse('home'))
+        
+        client.login(username='staff', password='pass123')
+        response = client.get(reverse('archived_bookings'), {'status': 'completed'})
+        self.assertContains(response, 'Lama Selesai')
+        self.assertNotContains(response, 'Lama Batal')
+        response = client.get(reverse('archived_booking_detail', args=[self.old_completed.pk]))
+        self.assertContains(response, 'oleh Sistem')
+        self.assertNotContains(response, '<form method="post"')
+
+
+class RoomCatalogTest(TransactionTestCase):
+    """Test the versioned room catalog cache used by room dropdowns and lists"""
+    
+    def setUp(self):
+        cache.clear()
+        catalog.catalog.clear()
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room_b = Room.objects.create(name="Ruang B", location="Lantai 1", capacity=10)
+        self.room_a = Room.objects.create(name="Ruang A", location="Lantai 2", capacity=20)
+        self.inactive = Room.objects.create(name="Ruang Tutup", location="Lantai 3", capacity=5, is_active=False)
+    
+    def room_queries(self, queries):
+        return [query for query in queries if 'rooms_room' in query['sql']]
+    
+    def test_warm_catalog_renders_without_room_queries(self):
+        self.assertEqual(catalog.active_rooms(), [self.room_a, self.room_b])
+        
+        with CaptureQueriesContext(connection) as queries:
+            form = BookingForm(user=self.user)
+            choices = list(form.fields['room'].choices)
+            html = str(form['room'])
+        self.assertEqual(self.room_queries(queries.captured_queries), [])
+        self.assertEqual([value for value, _ in choices], ['', self.room_a.pk, self.room_b.pk])
+        self.assertNotIn('Ruang Tutup', html)
+        
+        client = Client()
+        client.get(reverse('home'))
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('home'))
+        self.assertContains(response, 'Ruang A')
+        self.assertEqual(self.room_queries(queries.captured_queries), [])
+    
+    def test_room_list_facility_options_from_catalog(self):
+        self.room_a.facilities = 'Proyektor, AC'
+        self.room_a.save()
+        client = Client()
+        client.get(reverse('room_list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('room_list'))
+        self.assertEqual(self.room_queries(queries.captured_queries), [])
+        self.assertEqual([facility.slug for facility in response.context['facility_options']], ['ac', 'proyektor'])
+        
+        # Ganti nama fasilitas juga menaikkan versi katalog
+        facility = Facility.objects.get(slug='proyektor')
+        facility.name = 'LCD Proyektor'
+        facility.save()
+        response = client.get(reverse('room_list'))
+        self.assertContains(response, 'LCD Proyektor')
+    
+    def test_room_writes_bump_version(self):
+        version = catalog.current_version()
+        self.assertEqual(len(catalog.active_rooms()), 2)
+        
+        self.inactive.is_active = True
+        self.inactive.save()
+        self.assertNotEqual(catalog.current_version(), version)
+        self.assertIn(self.inactive, catalog.active_rooms())
+        
+        self.room_b.delete()
+        self.assertEqual(catalog.active_rooms(), [self.room_a, self.inactive])
+    
+    def test_form_validates_against_catalog(self):
+        data = {
+            'room': self.inactive.pk,
+            'title': 'Rapat',
+            'start_datetime': timezone.now() + timedelta(days=1),
+            'end_datetime': timezone.now() + timedelta(days=1, hours=1),
+            'participants': 5,
+        }
+        form = BookingForm(data=data, user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn('room', form.errors)
+        
+        data['room'] = self.room_a.pk
+        form = BookingForm(data=data, user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['room'], self.room_a)
+    
+    def test_catalog_bypassed_inside_transaction(self):
+        catalog.active_rooms()
+        with transaction.atomic():
+            Room.objects.filter(pk=self.room_b.pk).update(is_active=False)
+            self.assertEqual(catalog.active_rooms(), [self.room_a])
+            self.assertIsNone(catalog.get_active_room(self.room_b.pk))
+
+
+class RoomCardCacheTest(TestCase):
+    """Test the cached room card fragments on the room list and home page"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.rooms = [
+            Room.objects.create(name=f"Ruang {i}", location="Gedung A", capacity=10 + i, facilities="Proyektor")
+            for i in range(3)
+        ]
+    
+    def test_warm_page_reuses_cached_cards(self):
+        response = self.client.get(reverse('room_list'))
+        self.assertTemplateUsed(response, 'rooms/_room_card.html')
+        self.assertContains(response, 'Ruang 2')
+        
+        response = self.client.get(reverse('room_list'))
+        self.assertTemplateNotUsed(response, 'rooms/_room_card.html')
+        self.assertContains(response, 'Ruang 2')
+        self.assertContains(response, reverse('room_detail', args=[self.rooms[0].pk]))
+    
+    def test_room_save_invalidates_card(self):
+        self.client.get(reverse('home'))
+        room = self.rooms[1]
+        room.name = 'Ruang Baru'
+        room.save()
+        response = self.client.get(reverse('home'))
+        self.assertTemplateUsed(response, 'rooms/_room_card_compact.html')
+        self.assertContains(response, 'Ruang Baru')
+        self.assertNotContains(response, 'Ruang 1<')
+    
+    def test_cards_vary_by_authentication(self):
+        booking_url = reverse('create_booking_room', args=[self.rooms[0].pk])
+        self.assertNotContains(self.client.get(reverse('room_list')), booking_url)
+        self.client.login(username='testuser', password='pass123')
+        self.assertContains(self.client.get(reverse('room_list')), booking_url)
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTest(TransactionTestCase):
+    """Test the anonymous full-page cache and its tag-based purging"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.room = Room.objects.create(name="Ruang Lobby", location="Gedung A", capacity=10)
+    
+    def test_anonymous_hit_skips_view(self):
+        url = reverse('room_list')
+        self.assertTemplateUsed(self.client.get(url), 'rooms/room_list.html')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, 'Ruang Lobby')
+        # Query string lain berarti halaman lain
+        response = self.client.get(url, {'search': 'tidak ada'})
+        self.assertNotContains(response, 'Ruang Lobby')
+    
+    def test_cached_page_answers_conditional_requests(self):
+        url = reverse('room_detail', args=[self.room.pk])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_logged_in_users_bypass_cache(self):
+        self.client.get(reverse('home'))
+        self.client.login(username='testuser', password='pass123')
+        response = self.client.get(reverse('home'))
+        self.assertTemplateUsed(response, 'rooms/home.html')
+        self.assertContains(response, reverse('create_booking_room', args=[self.room.pk]))
+    
+    def test_room_write_purges_pages(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('room_detail', args=[self.room.pk]))
+        self.room.name = 'Ruang Aula'
+        self.room.save()
+        self.assertContains(self.client.get(reverse('home')), 'Ruang Aula')
+        self.assertContains(self.client.get(reverse('room_detail', args=[self.room.pk])), 'Ruang Aula')
+
+    def test_facility_write_purges_room_list(self):
+        self.room.facilities = 'Proyektor'
+        self.room.save()
+        self.assertContains(self.client.get(reverse('room_list')), 'Proyektor')
+        facility = Facility.objects.get(slug='proyektor')
+        facility.name = 'LCD Proyektor'
+        facility.save()
+        self.assertContains(self.client.get(reverse('room_list')), 'LCD Proyektor')
+
+    def test_booking_write_purges_room_detail(self):
+        other = Room.objects.create(name="Ruang Lain", location="Gedung B", capacity=10)
+        detail_url = reverse('room_detail', args=[self.room.pk])
+        other_url = reverse('room_detail', args=[other.pk])
+        self.client.get(detail_url)
+        self.client.get(other_url)
+        
+        start = timezone.now() + timedelta(days=1)
+        booking = Booking.objects.create(
+            user=self.user, room=self.room, title='Rapat Direksi',
+            start_datetime=start, end_datetime=start + timedelta(hours=1), participants=5,
+        )
+        Booking.objects.transition(booking, ['pending'], 'approved', actor=self.user)
+        self.assertContains(self.client.get(detail_url), 'Rapat Direksi')
+        # Ruangan lain tidak terpengaruh
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+
+
+class ConditionalGetTest(TestCase):
+    """Test ETag/Last-Modified support on the read views"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', 'test@test.com', 'pass123')
+        self.staff = User.objects.create_user('staff', 'staff@test.com', 'pass123', is_staff=True)
+        self.room = Room.objects.create(name="Ruang Validator", location="Gedung A", capacity=10)
+        self.start = timezone.now() + timedelta(days=1)
+        self.booking = Booking.objects.create(
+            user=self.user, room=self.room, title='Rapat Mingguan',
+            start_datetime=self.start, end_datetime=self.start + timedelta(hours=1), participants=5,
+        )
+        self.client.login(username='testuser', password='pass123')
+    
+    def revalidate(self, url, data=None):
+        response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        return self.client.get(url, data, HTTP_IF_NONE_MATCH=response['ETag'])
+    
+    def test_not_modified_skips_rendering(self):
+        url = reverse('booking_list')
+        etag = self.client.get(url)['ETag']
+        # Sesi + user + satu agregat validator, tanpa query daftar booking
+        with self.assertNumQueries(3):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertTemplateNotUsed(response, 'rooms/booking_list.html')
+        self.assertEqual(response.content, b'')
+    
+    def test_booking_changes_revalidate(self):
+        list_url = reverse('booking_list')
+        detail_url = reverse('booking_detail', args=[self.booking.pk])
+        self.assertEqual(self.revalidate(list_url).status_code, 304)
+        self.assertEqual(self.revalidate(detail_url).status_code, 304)
+        
+        list_etag = self.client.get(list_url)['ETag']
+        detail_etag = self.client.get(detail_url)['ETag']
+        Booking.objects.transition(self.booking, ['pending'], 'approved', actor=self.staff, notes='OK')
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'rooms/booking_detail.html')
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+    
+    def test_room_detail_validators(self):
+        url = reverse('room_detail', args=[self.room.pk])
+        self.assertEqual(self.revalidate(url).status_code, 304)
+        etag = self.client.get(url)['ETag']
+        self.room.description = 'Baru direnovasi'
+        self.room.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        # Halaman berbeda per user: ETag pengunjung anonim tidak sama
+        self.client.logout()
+        self.assertNotEqual(self.client.get(url)['ETag'], response['ETag'])
+        self.assertEqual(self.client.get(reverse('room_detail', args=[9999])).status_code, 404)
+    
+    def test_phase_change_revalidates(self):
+        list_url = reverse('booking_list')
+        detail_url = reverse('booking_detail', args=[self.booking.pk])
+        list_etag = self.client.get(list_url)['ETag']
+        detail_etag = self.client.get(detail_url)['ETag']
+        
+        # Booking mulai berlangsung tanpa updated_at baru (update() tidak menyentuh auto_now)
+        now = timezone.now()
+        Booking.objects.filter(pk=self.booking.pk).update(
+            start_datetime=now - timedelta(minutes=30), end_datetime=now + timedelta(minutes=30),
+        )
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Sedang Berlangsung')
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+        
+        # ...lalu lewat
+        detail_etag = response['ETag']
+        Booking.objects.filter(pk=self.booking.pk).update(
+            start_datetime=now - timedelta(hours=2), end_datetime=now - timedelta(hours=1),
+        )
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Sudah Lewat')
+    
+    def test_check_availability_validators(self):
+        params = {
+            'room_id': self.room.pk,
+            'start_datetime': (self.start + timedelta(hours=2)).isoformat(),
+            'end_datetime': (self.start + timedelta(hours=3)).isoformat(),
+        }
+        url = reverse('check_availability')
+        etag = self.client.get(url, params)['ETag']
+        # Validator dari versi ruangan di cache: 304 tanpa query database
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(
+                user=self.user, room=self.room, title='Rapat Susulan',
+                start_datetime=self.start + timedelta(hours=2), end_datetime=self.start + timedelta(hours=3),
+                participants=5,
+            )
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['available'])
+
+
+class TrigramSearchIndexTest(SimpleTestCase):
+    """Test the in-process trigram index behind room search and autocomplete"""
+    
+    def setUp(self):
+        rooms = [
+            Room(pk=1, name='Ruang Rapat Utama', location='Gedung A', description='Meja besar dan proyektor'),
+            Room(pk=2, name='Aula Serbaguna', location='Gedung B', description='Cocok untuk rapat akbar'),
+            Room(pk=3, name='Laboratorium Komputer', location='Gedung C', description='Empat puluh komputer'),
+        ]
+        self.index = search.TrigramIndex(rooms)
+    
+    def test_ranks_name_matches_first(self):
+        # "rapat" ada di nama ruangan 1 dan di deskripsi ruangan 2
+        self.assertEqual(self.index.search(['rapat']), [1, 2])
+    
+    def test_tolerates_typos(self):
+        self.assertEqual(self.index.search(['laboratorim']), [3])
+        self.assertEqual(self.index.search(['rapt', 'utma']), [1])
+        self.assertEqual(self.index.search(['kantin']), [])
+    
+    def test_prefix_autocomplete_on_names(self):
+        self.assertEqual(self.index.search(['au'], fields=('name',), prefix_last=True), [2])
+        self.assertEqual(self.index.search(['ruang', 'ra'], fields=('name',), prefix_last=True), [1])
+        # Lokasi tidak ikut autocomplete nama
+        self.assertEqual(self.index.search(['gedung'], fields=('name',), prefix_last=True), [])
+
+
+class RankedRoomSearchTest(TransactionTestCase):
+    """Test ranked room search and autocomplete through the views"""
+    
+    def setUp(self):
+        cache.clear()
+        catalog.catalog.clear()
+        search.index.clear()
+        self.meeting = Room.objects.create(
+            name='Ruang Rapat Utama', location='Gedung A', capacity=20, description='Proyektor'
+        )
+        self.hall = Room.objects.create(
+            name='Aula Serbaguna', location='Gedung B', capacity=200, description='Untuk rapat akbar'
+        )
+    
+    def test_room_list_search_is_ranked(self):
+        response = self.client.get(reverse('room_search_api'), {'search': 'rapat'})
+        self.assertEqual([room['id'] for room in response.json()['rooms']], [self.meeting.pk, self.hall.pk])
+        response = self.client.get(reverse('room_search_api'), {'search': 'serbagna', 'min_capacity': 100})
+        self.assertEqual([room['id'] for room in response.json()['rooms']], [self.hall.pk])
+        response = self.client.get(reverse('room_list'), {'search': 'ruang rapt'})
+        self.assertContains(response, 'Ruang Rapat Utama')
+        self.assertNotContains(response, 'Aula Serbaguna')
+    
+    def test_autocomplete_follows_room_saves(self):
+        url = reverse('room_autocomplete')
+        self.assertEqual([room['name'] for room in self.client.get(url, {'q': 'aul'}).json()['results']],
+                         ['Aula Serbaguna'])
+        
+        self.hall.name = 'Auditorium'
+        self.hall.save()
+        results = self.client.get(url, {'q': 'aud'}).json()['results']
+        self.assertEqual(results, [{
+            'id': self.hall.pk, 'name': 'Auditorium', 'location': 'Gedung B',
+            'url': reverse('room_detail', args=[self.hall.pk]),
+        }])
+        self.assertEqual(self.client.get(url, {'q': 'aula'}).json()['results'], [])
+        self.assertEqual(self.client.get(url, {'q': 'a', 'limit': 'x'}).status_code, 400)
+
+
+class FacilityTagTest(TestCase):
+    """Test normalized facility tags and the AND facility filter"""
+    
+    def setUp(self):
+        self.meeting = Room.objects.create(
+            name="Ruang Rapat", location="Gedung A", capacity=20, facilities="Proyektor, AC, WiFi"
+        )
+        self.hall = Room.objects.create(
+            name="Aula", location="Gedung B", capacity=200, facilities="proyektor; Sound System\nAC"
+        )
+        self.lab = Room.objects.create(name="Lab", location="Gedung C", capacity=30, facilities="AC")
+    
+    def tags(self, room):
+        return sorted(room.facility_tags.values_list('slug', flat=True))
+    
+    def test_parse_facilities(self):
+        self.assertEqual(
+            parse_facilities(' Proyektor ,AC;;  Sound   System\nproyektor, '),
+            {'proyektor': 'Proyektor', 'ac': 'AC', 'sound-system': 'Sound System'},
+        )
+        self.assertEqual(parse_facilities(''), {})
+    
+    def test_room_save_syncs_tags(self):
+        self.assertEqual(self.tags(self.hall), ['ac', 'proyektor', 'sound-system'])
+        # Nama tampilan dari penulisan pertama; slug menyatukan variasi huruf
+        self.assertEqual(Facility.objects.get(slug='proyektor').name, 'Proyektor')
+        
+        self.hall.facilities = 'AC, Panggung'
+        self.hall.save()
+        self.assertEqual(self.tags(self.hall), ['ac', 'panggung'])
+        
+        self.hall.facilities = ''
+        self.hall.save(update_fields=['capacity'])
+        self.assertEqual(self.tags(self.hall), ['ac', 'panggung'])
+    
+    def test_and_filter(self):
+        url = reverse('room_search_api')
+        with self.assertNumQueries(1):
+            response = self.client.get(url + '?facility=proyektor&facility=ac')
+        self.assertEqual([room['id'] for room in response.json()['rooms']], [self.hall.pk, self.meeting.pk])
+        response = self.client.get(url, {'facility': 'proyektor,sound-system', 'min_capacity': 50})
+        self.assertEqual([room['id'] for room in response.json()['rooms']], [self.hall.pk])
+        response = self.client.get(url, {'facility': ['ac', 'tidak-ada']})
+        self.assertEqual(response.json()['rooms'], [])
+        
+        response = self.client.get(reverse('room_list'), {'facility': 'wifi'})
+        self.assertEqual(list(response.context['rooms']), [self.meeting])
+        self.assertContains(response, 'value="wifi"')
+        self.assertEqual(response.context['selected_facilities'], ['wifi'])
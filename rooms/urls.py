@@ -9,12 +9,15 @@ urlpatterns = [
     path('rooms/', views.RoomListView.as_view(), name='room_list'),
     path('rooms/create/', views.create_room, name='create_room'),
     path('rooms/<int:pk>/', views.RoomDetailView.as_view(), name='room_detail'),
+    path('rooms/<int:pk>/calendar/', views.calendar_view, name='room_calendar'),
+    path('calendar/', views.calendar_view, name='calendar'),
     
     # Booking URLs
     path('bookings/', views.BookingListView.as_view(), name='booking_list'),
     path('bookings/<int:pk>/', views.BookingDetailView.as_view(), name='booking_detail'),
     path('bookings/create/', views.create_booking, name='create_booking'),
     path('bookings/create/<int:room_id>/', views.create_booking, name='create_booking_room'),
+    path('bookings/series/create/', views.create_booking_series, name='create_booking_series'),
     path('bookings/<int:pk>/update/', views.update_booking, name='update_booking'),
     path('bookings/<int:pk>/cancel/', views.cancel_booking, name='cancel_booking'),
     
@@ -22,9 +25,30 @@ urlpatterns = [
     path('bookings/<int:pk>/approve/', views.approve_booking, name='approve_booking'),
     path('bookings/<int:pk>/reject/', views.reject_booking, name='reject_booking'),
     path('manage-bookings/', views.manage_bookings, name='manage_bookings'),
+    path('manage-bookings/bulk/', views.bulk_booking_action, name='bulk_booking_action'),
+    path('manage-bookings/export/', views.export_bookings, name='export_bookings'),
+    path('manage-bookings/archive/', views.archived_bookings, name='archived_bookings'),
+    path('manage-bookings/archive/<int:pk>/', views.archived_booking_detail, name='archived_booking_detail'),
+    path('manage-bookings/import/', views.import_bookings_view, name='import_bookings'),
+    path('manage-bookings/import/rejects/<str:token>/', views.import_rejects, name='import_rejects'),
+    path('analytics/', views.analytics_dashboard, name='analytics'),
     
     # AJAX URLs
     path('ajax/check-availability/', views.check_availability, name='check_availability'),
+    path('ajax/check-availability/batch/', views.check_availability_batch, name='check_availability_batch'),
+    path('ajax/availability-grid/', views.availability_grid, name='availability_grid'),
+    path('ajax/free-slots/', views.free_slots, name='free_slots'),
+    
+    # JSON API
+    path('api/rooms/', views.room_search_api, name='room_search_api'),
+    path('api/rooms/autocomplete/', views.room_autocomplete, name='room_autocomplete'),
+    path('api/rooms/<int:pk>/events/', views.calendar_events, name='room_calendar_events'),
+    path('api/events/', views.calendar_events, name='calendar_events'),
+    path('api/analytics/', views.analytics_api, name='analytics_api'),
+    
+    # iCalendar subscription feeds (token bertanda tangan)
+    path('feeds/rooms/<int:pk>.ics', views.room_ics, name='room_ics'),
+    path('feeds/users/<int:pk>.ics', views.user_ics, name='user_ics'),
     
     # Monitoring & Health Check URLs
     path('health/', views.health_check, name='health_check'),
@@ -1,15 +1,48 @@
+import csv
+import io
+import secrets
+
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
+from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import condition, require_POST
 from django.contrib.auth import login
 from django.contrib import messages
-from django.db.models import Q
+from django.db.models import Count, Max, Q
+from django.core.cache import cache
 from django.utils import timezone
+from datetime import date, timedelta
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.views.generic import ListView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from .models import Room, Booking, BookingHistory
-from .forms import CustomUserCreationForm, BookingForm, BookingUpdateForm, BookingStatusForm, RoomForm
+from django.utils.decorators import method_decorator
+from .models import ArchivedBooking, Room, Booking
+from .availability import business_hours, current_version, find_free_slots, has_conflict
+from . import analytics, bitmaps, calendar, ics, pagecache, rollups
+from .catalog import active_rooms, facility_options, get_active_room
+from .decorators import cache_response
+from .archive import ARCHIVE_STATUSES
+from .exports import EXPORT_FORMATS, filter_bookings, stream_export
+from .search import AUTOCOMPLETE_LIMIT, autocomplete, search_rooms
+from .imports import detect_format, import_bookings, write_rejects
+from .forms import CustomUserCreationForm, BookingForm, BookingImportForm, BookingSeriesForm, BookingUpdateForm, BookingStatusForm, RoomForm
+
+BATCH_AVAILABILITY_LIMIT = 200
+ROOM_FILTER_PARAMS = ('search', 'min_capacity', 'facility', 'start', 'end')
+FREE_SLOT_MAX_DAYS = 60
+FREE_SLOT_MAX_RESULTS = 50
+GRID_MAX_DAYS = 31
+WEEKDAY_LABELS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+def parse_datetime_param(value):
+    """Parse parameter waktu ISO 8601 dari query string menjadi datetime aware"""
+    from datetime import datetime
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
 
 def register(request):
     """View untuk registrasi user baru"""
@@ -24,6 +57,100 @@ def register(request):
         form = CustomUserCreationForm()
     return render(request, 'registration/register.html', {'form': form})
 
+def selected_facilities(params):
+    """Slug fasilitas dari ?facility=a&facility=b (atau ?facility=a,b)"""
+    return [slug for value in params.getlist('facility') for slug in value.split(',') if slug]
+
+def filter_rooms(queryset, params):
+    """
+    Terapkan filter pencarian ruangan dari query string
+
+    Mendukung search (teks), min_capacity, facility (slug, boleh berulang;
+    ruangan harus memiliki semuanya), serta start/end untuk hanya
+    menampilkan ruangan yang kosong pada rentang tersebut.
+    Melempar ValueError jika parameter tidak valid.
+    """
+    search = params.get('search')
+    if search:
+        # Terurut relevansi (FULLTEXT / indeks trigram), bukan LIKE '%x%'
+        queryset = search_rooms(queryset, search)
+    
+    min_capacity = params.get('min_capacity')
+    if min_capacity:
+        queryset = queryset.with_min_capacity(int(min_capacity))
+    
+    facilities = selected_facilities(params)
+    if facilities:
+        queryset = queryset.with_facilities(facilities)
+    
+    start_value, end_value = params.get('start'), params.get('end')
+    if start_value or end_value:
+        if not (start_value and end_value):
+            raise ValueError('Waktu mulai dan selesai harus diisi bersamaan')
+        start_dt = parse_datetime_param(start_value)
+        end_dt = parse_datetime_param(end_value)
+        if start_dt >= end_dt:
+            raise ValueError('Waktu mulai harus sebelum waktu selesai')
+        queryset = queryset.available_between(start_dt, end_dt)
+    
+    return queryset
+
+def room_list_tags(request):
+    # Filter waktu bergantung pada booking, bukan hanya data ruangan
+    if request.GET.get('start') or request.GET.get('end'):
+        return [pagecache.ROOMS_TAG, pagecache.BOOKINGS_TAG]
+    return [pagecache.ROOMS_TAG]
+
+def _stamp(moment):
+    return int(moment.timestamp() * 1_000_000) if moment else 0
+
+def _validators(request, *moments, count=None):
+    """
+    (etag, last_modified) dari waktu perubahan terakhir beberapa sumber
+
+    ETag memuat user (dan status staff) karena isi halaman berbeda per
+    user, serta jumlah baris jika diberikan agar penghapusan ikut terdeteksi.
+    """
+    viewer = f'{request.user.pk or 0}.{int(request.user.is_staff)}'
+    parts = [viewer] + ([str(count)] if count is not None else []) + [str(_stamp(moment)) for moment in moments]
+    present = [moment for moment in moments if moment is not None]
+    return '-'.join(parts), max(present) if present else None
+
+def _phase_changes(now):
+    """
+    Agregat waktu mulai/selesai terakhir yang sudah terlewati per `now`
+
+    Dipakai sebagai momen tambahan validator: ikut maju saat booking
+    mulai berlangsung atau lewat, meskipun updated_at tidak berubah.
+    """
+    return {
+        'last_started': Max('start_datetime', filter=Q(start_datetime__lte=now)),
+        'last_ended': Max('end_datetime', filter=Q(end_datetime__lt=now)),
+    }
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified untuk view baca berbasis class
+
+    get_validators() harus murah (agregat berindeks, tanpa memuat objek).
+    Jika cocok dengan If-None-Match/If-Modified-Since, respons 304 dikirim
+    sebelum get_object()/get_queryset() dan tanpa render template.
+    """
+
+    def get_validators(self):
+        """(etag, last_modified), atau (None, None) jika tidak bisa dihitung"""
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        # Pesan flash yang tertunda harus tampil: jangan jawab dengan 304
+        etag, last_modified = (None, None) if messages.get_messages(request) else self.get_validators()
+        view = condition(
+            etag_func=lambda request, *args, **kwargs: etag,
+            last_modified_func=lambda request, *args, **kwargs: last_modified,
+        )(super().get)
+        return view(request, *args, **kwargs)
+
+@method_decorator(cache_response(tags=room_list_tags), name='dispatch')
 class RoomListView(ListView):
     """View untuk menampilkan daftar ruangan"""
     model = Room
@@ -32,22 +159,48 @@ class RoomListView(ListView):
     paginate_by = 9
 
     def get_queryset(self):
-        queryset = Room.objects.filter(is_active=True)
-        search = self.request.GET.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(location__icontains=search) |
-                Q(description__icontains=search)
-            )
+        # Tanpa filter daftar ruangan cukup diambil dari katalog
+        if not any(self.request.GET.get(param) for param in ROOM_FILTER_PARAMS):
+            return active_rooms()
+        queryset = Room.objects.active()
+        try:
+            queryset = filter_rooms(queryset, self.request.GET)
+        except ValueError as e:
+            messages.error(self.request, f'Filter tidak valid: {str(e)}')
         return queryset
 
-class RoomDetailView(DetailView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Query string filter tanpa nomor halaman, untuk link pagination
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        context['filter_query'] = params.urlencode()
+        context['facility_options'] = facility_options()
+        context['selected_facilities'] = selected_facilities(self.request.GET)
+        return context
+
+@method_decorator(
+    cache_response(tags=lambda request, pk: [pagecache.ROOMS_TAG, pagecache.room_tag(pk)]),
+    name='dispatch',
+)
+class RoomDetailView(ConditionalGetMixin, DetailView):
     """View untuk detail ruangan"""
     model = Room
     template_name = 'rooms/room_detail.html'
     context_object_name = 'room'
 
+    def get_validators(self):
+        # Room.updated_at (lookup pk) + agregat booking mendatang (indeks ruangan/status/mulai);
+        # jumlah berubah saat booking mendatang dimulai, jadi daftar tidak basi
+        pk = self.kwargs['pk']
+        room_modified = Room.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        if room_modified is None:
+            return None, None
+        state = Booking.objects.filter(
+            room_id=pk, status='approved', start_datetime__gte=timezone.now()
+        ).order_by().aggregate(count=Count('pk'), last_modified=Max('updated_at'))
+        return _validators(self.request, room_modified, state['last_modified'], count=state['count'])
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Ambil booking yang akan datang untuk ruangan ini
@@ -59,9 +212,10 @@ class RoomDetailView(DetailView):
         context['upcoming_bookings'] = upcoming_bookings
         return context
 
+@cache_response(tags=[pagecache.ROOMS_TAG])
 def home(request):
     """View untuk halaman utama"""
-    rooms = Room.objects.filter(is_active=True)[:6]
+    rooms = active_rooms()[:6]
     recent_bookings = None
     
     if request.user.is_authenticated:
@@ -78,7 +232,9 @@ def create_booking(request, room_id=None):
     """View untuk membuat booking baru"""
     room = None
     if room_id:
-        room = get_object_or_404(Room, id=room_id, is_active=True)
+        room = get_active_room(room_id)
+        if room is None:
+            raise Http404('Ruangan tidak ditemukan')
     
     if request.method == 'POST':
         form = BookingForm(request.POST, user=request.user)
@@ -89,6 +245,9 @@ def create_booking(request, room_id=None):
                 booking.save()
                 messages.success(request, 'Booking berhasil dibuat!')
                 return redirect('booking_detail', pk=booking.pk)
+            except ValidationError as e:
+                # Konflik jadwal terdeteksi saat save() di bawah lock ruangan
+                form.add_error(None, e.messages)
             except Exception as e:
                 messages.error(request, f'Error: {str(e)}')
     else:
@@ -102,13 +261,53 @@ def create_booking(request, room_id=None):
         'room': room
     })
 
-class BookingListView(LoginRequiredMixin, ListView):
+@login_required
+def create_booking_series(request):
+    """View untuk membuat booking berulang"""
+    report = None
+    if request.method == 'POST':
+        form = BookingSeriesForm(request.POST)
+        if form.is_valid():
+            series = form.save(commit=False)
+            series.user = request.user
+            report = series.create_bookings()
+            created = sum(1 for item in report if item['booking'] is not None)
+            failed = len(report) - created
+            if created:
+                messages.success(request, f'{created} booking berulang berhasil dibuat dan menunggu persetujuan.')
+            if failed:
+                messages.warning(request, f'{failed} kejadian tidak dibuat. Lihat laporan di bawah.')
+    else:
+        form = BookingSeriesForm()
+    
+    return render(request, 'rooms/create_booking_series.html', {
+        'form': form,
+        'report': report,
+    })
+
+class BookingListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     """View untuk menampilkan daftar booking user"""
     model = Booking
     template_name = 'rooms/booking_list.html'
     context_object_name = 'bookings'
     paginate_by = 10
 
+    def get_validators(self):
+        # Satu agregat atas booking user (indeks user/created_at), termasuk nama ruangan;
+        # jumlah yang sudah mulai/berakhir mengubah ETag saat badge dan tombol berganti
+        now = timezone.now()
+        state = Booking.objects.filter(user=self.request.user).order_by().aggregate(
+            count=Count('pk'), last_modified=Max('updated_at'), room_modified=Max('room__updated_at'),
+            started=Count('pk', filter=Q(start_datetime__lte=now)),
+            ended=Count('pk', filter=Q(end_datetime__lt=now)),
+            **_phase_changes(now),
+        )
+        return _validators(
+            self.request, state['last_modified'], state['room_modified'],
+            state['last_started'], state['last_ended'],
+            count=f"{state['count']}.{state['started']}.{state['ended']}",
+        )
+
     def get_queryset(self):
         queryset = Booking.objects.filter(user=self.request.user).order_by('-created_at')
         status = self.request.GET.get('status')
@@ -116,12 +315,33 @@ class BookingListView(LoginRequiredMixin, ListView):
             queryset = queryset.filter(status=status)
         return queryset
 
-class BookingDetailView(LoginRequiredMixin, DetailView):
+class BookingDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     """View untuk detail booking"""
     model = Booking
     template_name = 'rooms/booking_detail.html'
     context_object_name = 'booking'
 
+    def get_validators(self):
+        # Satu agregat: booking (pk), ruangannya, dan riwayat status (indeks booking_id);
+        # fase waktu (belum mulai/berlangsung/lewat) menentukan badge dan tombol edit/batal
+        now = timezone.now()
+        state = Booking.objects.filter(pk=self.kwargs['pk'], user=self.request.user).order_by().aggregate(
+            modified=Max('updated_at'),
+            room_modified=Max('room__updated_at'),
+            history_count=Count('history'),
+            history_modified=Max('history__created_at'),
+            **_phase_changes(now),
+        )
+        if state['modified'] is None:
+            return None, None
+        phase = 'after' if state['last_ended'] else 'during' if state['last_started'] else 'before'
+        etag, last_modified = _validators(
+            self.request, state['modified'], state['room_modified'], state['history_modified'],
+            state['last_started'], state['last_ended'],
+            count=state['history_count'],
+        )
+        return f'{etag}-{phase}', last_modified
+
     def get_queryset(self):
         return Booking.objects.filter(user=self.request.user)
 
@@ -133,7 +353,7 @@ class BookingDetailView(LoginRequiredMixin, DetailView):
 @login_required
 def update_booking(request, pk):
     """View untuk mengupdate booking"""
-    booking = get_object_or_404(Booking, pk=pk, user=request.user)
+    booking = get_object_or_404(Booking.objects.select_related('room'), pk=pk, user=request.user)
     
     # Hanya bisa edit jika status pending atau belum lewat
     if booking.status != 'pending' or booking.is_past:
@@ -147,6 +367,8 @@ def update_booking(request, pk):
                 form.save()
                 messages.success(request, 'Booking berhasil diupdate!')
                 return redirect('booking_detail', pk=pk)
+            except ValidationError as e:
+                form.add_error(None, e.messages)
             except Exception as e:
                 messages.error(request, f'Error: {str(e)}')
     else:
@@ -167,18 +389,13 @@ def cancel_booking(request, pk):
         return redirect('booking_detail', pk=pk)
     
     if request.method == 'POST':
-        old_status = booking.status
-        booking.status = 'cancelled'
-        booking.save()
-        
-        # Simpan history
-        BookingHistory.objects.create(
-            booking=booking,
-            old_status=old_status,
-            new_status='cancelled',
-            changed_by=request.user,
+        cancelled = Booking.objects.transition(
+            booking, ['pending', 'approved'], 'cancelled', request.user,
             notes='Dibatalkan oleh user'
         )
+        if not cancelled:
+            messages.error(request, 'Booking tidak dapat dibatalkan.')
+            return redirect('booking_detail', pk=pk)
         
         messages.success(request, 'Booking berhasil dibatalkan.')
         return redirect('booking_detail', pk=pk)
@@ -203,6 +420,16 @@ def create_room(request):
     
     return render(request, 'rooms/create_room.html', {'form': form})
 
+def _availability_etag(request):
+    # Versi ruangan di cache bersama naik setelah setiap penulisan booking
+    # ruangan itu, jadi validator tidak perlu query database
+    try:
+        room_id = int(request.GET['room_id'])
+    except (KeyError, ValueError):
+        return None
+    return f'{room_id}-{current_version(room_id)}'
+
+@condition(etag_func=_availability_etag)
 def check_availability(request):
     """AJAX view untuk mengecek ketersediaan ruangan"""
     room_id = request.GET.get('room_id')
@@ -214,21 +441,14 @@ def check_availability(request):
         return JsonResponse({'available': False, 'message': 'Parameter tidak lengkap'})
     
     try:
-        from datetime import datetime
-        start_dt = datetime.fromisoformat(start_datetime.replace('Z', '+00:00'))
-        end_dt = datetime.fromisoformat(end_datetime.replace('Z', '+00:00'))
-        
-        conflicting_bookings = Booking.objects.filter(
-            room_id=room_id,
-            status__in=['approved', 'pending'],
-            start_datetime__lt=end_dt,
-            end_datetime__gt=start_dt
-        )
+        start_dt = parse_datetime_param(start_datetime)
+        end_dt = parse_datetime_param(end_datetime)
         
-        if booking_id:
-            conflicting_bookings = conflicting_bookings.exclude(id=booking_id)
-        
-        if conflicting_bookings.exists():
+        # Jalur cepat bitmap slot; saat edit booking sendiri harus dikecualikan
+        free = None if booking_id else bitmaps.is_free(int(room_id), start_dt, end_dt)
+        if free is None:
+            free = not has_conflict(int(room_id), start_dt, end_dt, exclude_id=int(booking_id) if booking_id else None)
+        if not free:
             return JsonResponse({
                 'available': False,
                 'message': 'Ruangan tidak tersedia pada waktu tersebut'
@@ -239,6 +459,230 @@ def check_availability(request):
     except Exception as e:
         return JsonResponse({'available': False, 'message': f'Error: {str(e)}'})
 
+def check_availability_batch(request):
+    """
+    AJAX view untuk matriks ketersediaan banyak ruangan x banyak jendela waktu
+
+    Parameter: rooms=1,2,3 dan window=<mulai>/<selesai> (boleh diulang).
+    Hasil per ruangan berupa string '1'/'0' sesuai urutan window.
+    """
+    try:
+        room_ids = [int(value) for value in request.GET.get('rooms', '').split(',') if value.strip()]
+        windows = []
+        for value in request.GET.getlist('window'):
+            start_value, end_value = value.split('/')
+            start_dt = parse_datetime_param(start_value)
+            end_dt = parse_datetime_param(end_value)
+            if start_dt >= end_dt:
+                raise ValueError('Waktu mulai harus sebelum waktu selesai')
+            windows.append((start_dt, end_dt))
+    except ValueError as e:
+        return JsonResponse({'error': f'Parameter tidak valid: {str(e)}'}, status=400)
+    
+    if not room_ids or not windows:
+        return JsonResponse({'error': 'Parameter tidak lengkap'}, status=400)
+    if len(room_ids) > BATCH_AVAILABILITY_LIMIT or len(windows) > BATCH_AVAILABILITY_LIMIT:
+        return JsonResponse({'error': f'Maksimal {BATCH_AVAILABILITY_LIMIT} ruangan dan {BATCH_AVAILABILITY_LIMIT} jendela waktu'}, status=400)
+    
+    matrix = bitmaps.availability_matrix(room_ids, windows)
+    return JsonResponse({
+        'rooms': room_ids,
+        'windows': [[start.isoformat(), end.isoformat()] for start, end in windows],
+        'available': [''.join('1' if free else '0' for free in matrix[room_id]) for room_id in room_ids],
+    })
+
+def free_slots(request):
+    """
+    AJAX view untuk mencari jendela kosong berikutnya pada sebuah ruangan
+
+    Parameter: room_id, duration (menit), start (opsional, default sekarang),
+    days (rentang pencarian), limit, business_hours=1 untuk jam operasional.
+    """
+    try:
+        room_id = int(request.GET['room_id'])
+        duration = timedelta(minutes=int(request.GET.get('duration', 60)))
+        start_value = request.GET.get('start')
+        search_start = max(parse_datetime_param(start_value), timezone.now()) if start_value else timezone.now()
+        days = min(int(request.GET.get('days', 7)), FREE_SLOT_MAX_DAYS)
+        limit = min(int(request.GET.get('limit', 5)), FREE_SLOT_MAX_RESULTS)
+        search_end = search_start + timedelta(days=days)
+    except (KeyError, ValueError, OverflowError) as e:
+        # OverflowError: duration sangat besar atau start mendekati datetime.max
+        return JsonResponse({'error': f'Parameter tidak valid: {str(e)}'}, status=400)
+    
+    if duration <= timedelta(0) or days <= 0 or limit <= 0:
+        return JsonResponse({'error': 'Parameter tidak valid'}, status=400)
+    
+    hours = business_hours() if request.GET.get('business_hours') in ('1', 'true') else None
+    # Jalur cepat bitmap slot; database hanya jika indeks tidak bisa dipakai
+    slots = bitmaps.find_free_slots(room_id, duration, search_start, search_end, limit=limit, hours=hours)
+    if slots is None:
+        slots = find_free_slots(room_id, duration, search_start, search_end, limit=limit, hours=hours)
+    return JsonResponse({
+        'room_id': room_id,
+        'duration': int(duration.total_seconds() // 60),
+        'slots': [
+            {'start': timezone.localtime(start).isoformat(), 'end': timezone.localtime(end).isoformat()}
+            for start, end in slots
+        ],
+    })
+
+def availability_grid(request):
+    """
+    AJAX view grid ketersediaan per slot 15 menit untuk banyak ruangan
+
+    Parameter: rooms=1,2,3, start (YYYY-MM-DD, default hari ini) dan days.
+    Setiap hari dikirim sebagai 24 karakter hex (96 bit, bit 1 = terisi,
+    bit terendah = 00:00-00:15).
+    """
+    try:
+        room_ids = [int(value) for value in request.GET.get('rooms', '').split(',') if value.strip()]
+        start_date = date.fromisoformat(request.GET['start']) if request.GET.get('start') else timezone.localdate()
+        days = int(request.GET.get('days', 7))
+    except ValueError as e:
+        return JsonResponse({'error': f'Parameter tidak valid: {str(e)}'}, status=400)
+    
+    if not room_ids or not 0 < days <= GRID_MAX_DAYS:
+        return JsonResponse({'error': f'Parameter tidak lengkap (maksimal {GRID_MAX_DAYS} hari)'}, status=400)
+    if len(room_ids) > BATCH_AVAILABILITY_LIMIT:
+        return JsonResponse({'error': f'Maksimal {BATCH_AVAILABILITY_LIMIT} ruangan'}, status=400)
+    
+    grid = bitmaps.day_grid(room_ids, [start_date + timedelta(days=i) for i in range(days)])
+    return JsonResponse({
+        'slot_minutes': int(bitmaps.SLOT.total_seconds() // 60),
+        'rooms': {str(room_id): days for room_id, days in grid.items()},
+    })
+
+def room_search_api(request):
+    """JSON API pencarian ruangan aktif (search, min_capacity, start/end)"""
+    try:
+        rooms = filter_rooms(Room.objects.active(), request.GET)
+        rooms = list(rooms.values('id', 'name', 'location', 'capacity', 'facilities'))
+    except ValueError as e:
+        return JsonResponse({'error': f'Parameter tidak valid: {str(e)}'}, status=400)
+    
+    for room in rooms:
+        room['url'] = reverse('room_detail', kwargs={'pk': room['id']})
+    return JsonResponse({'count': len(rooms), 'rooms': rooms})
+
+def room_autocomplete(request):
+    """JSON autocomplete nama ruangan aktif untuk ?q= (toleran salah ketik)"""
+    try:
+        limit = min(int(request.GET.get('limit', AUTOCOMPLETE_LIMIT)), AUTOCOMPLETE_LIMIT)
+    except ValueError:
+        return JsonResponse({'error': 'Parameter limit harus berupa angka'}, status=400)
+    rooms = autocomplete(request.GET.get('q', ''), limit=max(limit, 1))
+    return JsonResponse({'results': [
+        {'id': room.pk, 'name': room.name, 'location': room.location, 'url': room.get_absolute_url()}
+        for room in rooms
+    ]})
+
+def calendar_range(request):
+    """Ambil rentang ?start=&end= untuk feed kalender (ValueError jika tidak valid)"""
+    start_value = request.GET.get('start')
+    end_value = request.GET.get('end')
+    if not start_value or not end_value:
+        raise ValueError('Parameter start dan end wajib diisi')
+    start = parse_datetime_param(start_value)
+    end = parse_datetime_param(end_value)
+    if start >= end:
+        raise ValueError('Waktu mulai harus sebelum waktu selesai')
+    if end - start > calendar.CALENDAR_MAX_RANGE:
+        raise ValueError(f'Rentang maksimal {calendar.CALENDAR_MAX_RANGE.days} hari')
+    return start, end
+
+def _calendar_state(request, pk=None):
+    # Dipanggil oleh etag_func dan last_modified_func: cukup satu query agregat
+    if not hasattr(request, '_calendar_state'):
+        try:
+            start, end = calendar_range(request)
+        except ValueError:
+            request._calendar_state = (None, None)
+        else:
+            request._calendar_state = calendar.feed_state(start, end, pk)
+    return request._calendar_state
+
+@login_required
+def calendar_view(request, pk=None):
+    """View untuk kalender booking (semua ruangan atau satu ruangan)"""
+    room = get_object_or_404(Room, pk=pk) if pk is not None else None
+    feed_url = reverse('room_calendar_events', args=[pk]) if pk is not None else reverse('calendar_events')
+    # Langganan .ics: kalender ruangan ini, atau booking milik user di kalender umum
+    if room is not None:
+        ics_url = ics_subscription_url(request, 'room', room.pk)
+    else:
+        ics_url = ics_subscription_url(request, 'user', request.user.pk)
+    return render(request, 'rooms/calendar.html', {
+        'room': room,
+        'rooms': active_rooms(),
+        'feed_url': feed_url,
+        'ics_url': ics_url,
+    })
+
+@login_required
+@condition(
+    etag_func=lambda request, pk=None: _calendar_state(request, pk)[0],
+    last_modified_func=lambda request, pk=None: _calendar_state(request, pk)[1],
+)
+def calendar_events(request, pk=None):
+    """
+    Feed JSON event kalender untuk rentang ?start=&end=
+
+    Mengirim ETag/Last-Modified sehingga klien yang polling mendapat 304
+    selama tidak ada booking di rentang tersebut yang berubah.
+    """
+    try:
+        start, end = calendar_range(request)
+    except ValueError as e:
+        return JsonResponse({'error': f'Parameter tidak valid: {str(e)}'}, status=400)
+    
+    return JsonResponse(calendar.events(start, end, pk), safe=False)
+
+def ics_subscription_url(request, kind, pk):
+    """URL absolut langganan .ics beserta token bertanda tangan"""
+    path = reverse('room_ics' if kind == 'room' else 'user_ics', args=[pk])
+    return request.build_absolute_uri(f'{path}?token={ics.feed_token(kind, pk)}')
+
+def _ics_state(request, kind, pk):
+    # Validator hanya dihitung untuk token yang sah, dan cukup sekali per request
+    if not hasattr(request, '_ics_state'):
+        if not ics.check_token(kind, pk, request.GET.get('token')):
+            request._ics_state = (None, None)
+        elif kind == 'room':
+            request._ics_state = ics.feed_validators(room_id=pk)
+        else:
+            request._ics_state = ics.feed_validators(user_id=pk)
+    return request._ics_state
+
+def _ics_response(request, name, bookings, filename):
+    response = StreamingHttpResponse(
+        ics.stream_calendar(name, bookings, request.get_host()),
+        content_type='text/calendar; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
+
+@condition(
+    etag_func=lambda request, pk: _ics_state(request, 'room', pk)[0],
+    last_modified_func=lambda request, pk: _ics_state(request, 'room', pk)[1],
+)
+def room_ics(request, pk):
+    """Feed iCalendar (.ics) untuk satu ruangan, diautentikasi dengan token"""
+    if not ics.check_token('room', pk, request.GET.get('token')):
+        return HttpResponseForbidden('Token tidak valid.')
+    room = get_object_or_404(Room, pk=pk)
+    return _ics_response(request, room.name, ics.feed_bookings(room_id=pk), f'room-{pk}.ics')
+
+@condition(
+    etag_func=lambda request, pk: _ics_state(request, 'user', pk)[0],
+    last_modified_func=lambda request, pk: _ics_state(request, 'user', pk)[1],
+)
+def user_ics(request, pk):
+    """Feed iCalendar (.ics) untuk booking milik satu user, diautentikasi dengan token"""
+    if not ics.check_token('user', pk, request.GET.get('token')):
+        return HttpResponseForbidden('Token tidak valid.')
+    return _ics_response(request, 'Booking Saya', ics.feed_bookings(user_id=pk), 'bookings.ics')
+
 @login_required
 def approve_booking(request, pk):
     """View untuk menyetujui booking (hanya staff)"""
@@ -252,21 +696,15 @@ def approve_booking(request, pk):
         messages.error(request, 'Booking ini sudah diproses.')
         return redirect('booking_detail', pk=pk)
     
-    # Update booking status
-    old_status = booking.status
-    booking.status = 'approved'
-    booking.approved_by = request.user
-    booking.approved_at = timezone.now()
-    booking.save()
-    
-    # Create history record
-    BookingHistory.objects.create(
-        booking=booking,
-        old_status=old_status,
-        new_status='approved',
-        changed_by=request.user,
-        notes=f'Booking disetujui oleh {request.user.get_full_name() or request.user.username}'
+    # Update bersyarat: jika staff lain sudah memproses, transisi ini kalah
+    approved = Booking.objects.transition(
+        booking, ['pending'], 'approved', request.user,
+        notes=f'Booking disetujui oleh {request.user.get_full_name() or request.user.username}',
+        fields={'approved_by': request.user, 'approved_at': timezone.now()},
     )
+    if not approved:
+        messages.error(request, 'Booking ini sudah diproses.')
+        return redirect('booking_detail', pk=pk)
     
     messages.success(request, f'Booking "{booking.title}" berhasil disetujui!')
     return redirect('booking_detail', pk=pk)
@@ -287,20 +725,14 @@ def reject_booking(request, pk):
     if request.method == 'POST':
         rejection_reason = request.POST.get('rejection_reason', '')
         
-        # Update booking status
-        old_status = booking.status
-        booking.status = 'rejected'
-        booking.notes = rejection_reason
-        booking.save()
-        
-        # Create history record
-        BookingHistory.objects.create(
-            booking=booking,
-            old_status=old_status,
-            new_status='rejected',
-            changed_by=request.user,
-            notes=f'Booking ditolak oleh {request.user.get_full_name() or request.user.username}. Alasan: {rejection_reason}'
+        rejected = Booking.objects.transition(
+            booking, ['pending'], 'rejected', request.user,
+            notes=f'Booking ditolak oleh {request.user.get_full_name() or request.user.username}. Alasan: {rejection_reason}',
+            fields={'notes': rejection_reason},
         )
+        if not rejected:
+            messages.error(request, 'Booking ini sudah diproses.')
+            return redirect('booking_detail', pk=pk)
         
         messages.success(request, f'Booking "{booking.title}" berhasil ditolak.')
         return redirect('booking_detail', pk=pk)
@@ -316,30 +748,304 @@ def manage_bookings(request):
     
     bookings = Booking.objects.select_related('user', 'room').order_by('-created_at')
     
-    # Filter berdasarkan status
-    status_filter = request.GET.get('status')
-    if status_filter:
-        bookings = bookings.filter(status=status_filter)
-    
-    # Filter berdasarkan ruangan
-    room_filter = request.GET.get('room')
-    if room_filter:
-        bookings = bookings.filter(room_id=room_filter)
+    # Filter status, ruangan, dan tanggal (sama dengan ekspor)
+    try:
+        bookings = filter_bookings(bookings, request.GET)
+    except ValueError as e:
+        messages.error(request, f'Filter tidak valid: {str(e)}')
     
     # Pagination
     paginator = Paginator(bookings, 15)
     page_number = request.GET.get('page')
     bookings = paginator.get_page(page_number)
     
+    # Query string filter tanpa nomor halaman, untuk link pagination dan ekspor
+    params = request.GET.copy()
+    params.pop('page', None)
+    
     context = {
         'bookings': bookings,
-        'rooms': Room.objects.filter(is_active=True),
+        'rooms': active_rooms(),
         'status_choices': Booking.STATUS_CHOICES,
-        'current_status': status_filter,
-        'current_room': room_filter,
+        'current_status': request.GET.get('status'),
+        'current_room': request.GET.get('room'),
+        'current_date_from': request.GET.get('date_from', ''),
+        'current_date_to': request.GET.get('date_to', ''),
+        'filter_query': params.urlencode(),
     }
     
     return render(request, 'rooms/manage_bookings.html', context)
 
+@login_required
+def archived_bookings(request):
+    """Daftar booking yang sudah diarsipkan, hanya baca (hanya staff)"""
+    if not request.user.is_staff:
+        messages.error(request, 'Anda tidak memiliki izin untuk mengakses halaman ini.')
+        return redirect('home')
+    
+    bookings = ArchivedBooking.objects.select_related('user', 'room').order_by('-start_datetime')
+    try:
+        bookings = filter_bookings(bookings, request.GET)
+    except ValueError as e:
+        messages.error(request, f'Filter tidak valid: {str(e)}')
+    
+    paginator = Paginator(bookings, 15)
+    bookings = paginator.get_page(request.GET.get('page'))
+    
+    params = request.GET.copy()
+    params.pop('page', None)
+    
+    context = {
+        'bookings': bookings,
+        'rooms': active_rooms(),
+        'status_choices': [choice for choice in Booking.STATUS_CHOICES if choice[0] in ARCHIVE_STATUSES],
+        'current_status': request.GET.get('status'),
+        'current_room': request.GET.get('room'),
+        'current_date_from': request.GET.get('date_from', ''),
+        'current_date_to': request.GET.get('date_to', ''),
+        'filter_query': params.urlencode(),
+    }
+    return render(request, 'rooms/archived_bookings.html', context)
+
+@login_required
+def archived_booking_detail(request, pk):
+    """Detail booking arsip beserta riwayat statusnya (hanya staff)"""
+    if not request.user.is_staff:
+        messages.error(request, 'Anda tidak memiliki izin untuk mengakses halaman ini.')
+        return redirect('home')
+    
+    booking = get_object_or_404(ArchivedBooking.objects.select_related('user', 'room', 'approved_by'), pk=pk)
+    history = booking.history.select_related('changed_by')
+    return render(request, 'rooms/archived_booking_detail.html', {'booking': booking, 'history': history})
+
+@login_required
+def export_bookings(request):
+    """
+    Ekspor booking sebagai CSV atau JSONL (hanya staff)
+
+    Memakai filter yang sama dengan Kelola Booking. Baris dialirkan
+    per potongan sehingga memori tetap datar untuk ekspor besar.
+    include_archive=1 ikut menyertakan booking yang sudah diarsipkan.
+    """
+    if not request.user.is_staff:
+        messages.error(request, 'Anda tidak memiliki izin untuk mengakses halaman ini.')
+        return redirect('home')
+    
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Format harus salah satu dari: {", ".join(EXPORT_FORMATS)}'}, status=400)
+    try:
+        bookings = filter_bookings(Booking.objects.all(), request.GET)
+        archived = None
+        if request.GET.get('include_archive') == '1':
+            archived = filter_bookings(ArchivedBooking.objects.all(), request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': f'Parameter tidak valid: {str(e)}'}, status=400)
+    
+    content_type = 'text/csv; charset=utf-8' if export_format == 'csv' else 'application/x-ndjson; charset=utf-8'
+    response = StreamingHttpResponse(stream_export(bookings, export_format, archived=archived), content_type=content_type)
+    filename = f'bookings-{timezone.localtime():%Y%m%d-%H%M}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+IMPORT_REJECTS_KEY = 'import-rejects:{token}'
+IMPORT_REJECTS_TIMEOUT = 60 * 60
+IMPORT_REJECTS_SHOWN = 100
+
+@login_required
+def import_bookings_view(request):
+    """View untuk impor booking massal dari file CSV/JSONL (hanya staff)"""
+    if not request.user.is_staff:
+        messages.error(request, 'Anda tidak memiliki izin untuk mengakses halaman ini.')
+        return redirect('home')
+    
+    report = None
+    rejects_url = None
+    if request.method == 'POST':
+        form = BookingImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            import_format = detect_format(upload.name)
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            try:
+                report = import_bookings(
+                    stream, import_format,
+                    actor=request.user,
+                    default_status=form.cleaned_data['status'],
+                    dry_run=form.cleaned_data['dry_run'],
+                )
+            except (UnicodeDecodeError, csv.Error) as e:
+                messages.error(request, f'File tidak dapat dibaca: {str(e)}')
+            else:
+                verb = 'dapat dibuat (uji coba)' if form.cleaned_data['dry_run'] else 'berhasil dibuat'
+                messages.success(request, f'{report.created} dari {report.total} booking {verb}.')
+                if report.rejected:
+                    # File penolakan disimpan sementara di cache untuk diunduh
+                    content = io.StringIO()
+                    write_rejects(report.rejected, content, import_format)
+                    token = secrets.token_urlsafe(16)
+                    cache.set(
+                        IMPORT_REJECTS_KEY.format(token=token),
+                        (request.user.pk, import_format, content.getvalue()),
+                        IMPORT_REJECTS_TIMEOUT,
+                    )
+                    rejects_url = reverse('import_rejects', args=[token])
+                    messages.warning(request, f'{len(report.rejected)} baris ditolak.')
+    else:
+        form = BookingImportForm()
+    
+    return render(request, 'rooms/import_bookings.html', {
+        'form': form,
+        'report': report,
+        'rejected': report.rejected[:IMPORT_REJECTS_SHOWN] if report else [],
+        'rejects_url': rejects_url,
+    })
+
+@login_required
+def import_rejects(request, token):
+    """Unduh file baris yang ditolak dari impor terakhir"""
+    entry = cache.get(IMPORT_REJECTS_KEY.format(token=token))
+    if entry is None or entry[0] != request.user.pk:
+        raise Http404('File penolakan tidak ditemukan atau sudah kedaluwarsa.')
+    _, import_format, content = entry
+    content_type = 'text/csv; charset=utf-8' if import_format == 'csv' else 'application/x-ndjson; charset=utf-8'
+    response = HttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="rejects.{import_format}"'
+    return response
+
+@login_required
+@require_POST
+def bulk_booking_action(request):
+    """Setujui/tolak banyak booking pending sekaligus dari halaman Kelola Booking (hanya staff)"""
+    if not request.user.is_staff:
+        messages.error(request, 'Anda tidak memiliki izin untuk mengakses halaman ini.')
+        return redirect('home')
+    
+    redirect_url = reverse('manage_bookings')
+    return_query = request.POST.get('return_query', '')
+    if return_query:
+        redirect_url = f'{redirect_url}?{return_query}'
+    
+    try:
+        booking_ids = [int(pk) for pk in request.POST.getlist('booking_ids')]
+    except ValueError:
+        booking_ids = []
+    if not booking_ids:
+        messages.error(request, 'Pilih minimal satu booking.')
+        return redirect(redirect_url)
+    
+    actor_name = request.user.get_full_name() or request.user.username
+    action = request.POST.get('action')
+    conflicted = set()
+    if action == 'approve':
+        processed, conflicts = Booking.objects.bulk_approve(
+            booking_ids, request.user,
+            notes=f'Booking disetujui oleh {actor_name} (massal)'
+        )
+        if processed:
+            messages.success(request, f'{len(processed)} booking berhasil disetujui.')
+        if conflicts:
+            conflicted = {pk for pair in conflicts for pk in pair}
+            titles = dict(Booking.objects.filter(pk__in=conflicted).values_list('pk', 'title'))
+            pairs = ', '.join(f'"{titles[a]}" & "{titles[b]}"' for a, b in conflicts)
+            messages.warning(request, f'Booking berikut tidak disetujui karena jadwalnya bertumpukan: {pairs}')
+    elif action == 'reject':
+        rejection_reason = request.POST.get('rejection_reason', '')
+        processed = Booking.objects.bulk_transition(
+            booking_ids, 'pending', 'rejected', request.user,
+            notes=f'Booking ditolak oleh {actor_name} (massal). Alasan: {rejection_reason}',
+            fields={'notes': rejection_reason},
+        )
+        if processed:
+            messages.success(request, f'{len(processed)} booking berhasil ditolak.')
+    else:
+        messages.error(request, 'Aksi tidak dikenal.')
+        return redirect(redirect_url)
+    
+    skipped = len(set(booking_ids)) - len(processed) - len(conflicted)
+    if skipped:
+        messages.info(request, f'{skipped} booking dilewati karena sudah diproses.')
+    return redirect(redirect_url)
+
+def analytics_params(params):
+    """Rentang tanggal (default 30 hari terakhir) dan filter ruangan untuk analitik"""
+    today = timezone.localdate()
+    end_date = date.fromisoformat(params['end']) if params.get('end') else today
+    start_date = date.fromisoformat(params['start']) if params.get('start') else end_date - timedelta(days=29)
+    if start_date > end_date:
+        raise ValueError('Tanggal mulai harus sebelum tanggal selesai')
+    if (end_date - start_date).days + 1 > analytics.MAX_RANGE_DAYS:
+        raise ValueError(f'Rentang maksimal {analytics.MAX_RANGE_DAYS} hari')
+    room_ids = None
+    if params.get('rooms'):
+        room_ids = [int(value) for value in params['rooms'].split(',') if value.strip()]
+    return start_date, end_date, room_ids
+
+@login_required
+def analytics_dashboard(request):
+    """Halaman analitik utilisasi ruangan (hanya staff)"""
+    if not request.user.is_staff:
+        messages.error(request, 'Anda tidak memiliki izin untuk mengakses halaman ini.')
+        return redirect('home')
+    
+    report = summary = None
+    try:
+        start_date, end_date, room_ids = analytics_params(request.GET)
+    except ValueError as e:
+        messages.error(request, f'Parameter tidak valid: {str(e)}')
+    else:
+        # Ringkasan harian dibaca dari rollup; tidak butuh NumPy
+        summary = rollups.daily_summary(start_date, end_date, room_ids)
+        summary['rooms'].sort(key=lambda room: room['booked_minutes'], reverse=True)
+        if not analytics.NUMPY_AVAILABLE:
+            messages.error(request, 'Analitik per jam membutuhkan NumPy yang belum terpasang.')
+        else:
+            report = analytics.room_utilization(
+                start_date, end_date, room_ids, include_archive=request.GET.get('include_archive') == '1'
+            )
+            # Urutkan ruangan dari yang paling terpakai; heatmap per hari x jam
+            report['rooms'].sort(key=lambda room: room['occupancy'] or 0, reverse=True)
+            for peak in report['peak_hours']:
+                peak['label'] = f"{WEEKDAY_LABELS[peak['weekday']]} {peak['hour']:02d}:00"
+            report['heatmap'] = [
+                (label, report['hour_of_week'][day * 24:(day + 1) * 24])
+                for day, label in enumerate(WEEKDAY_LABELS)
+            ]
+    
+    return render(request, 'rooms/analytics.html', {
+        'report': report,
+        'summary': summary,
+        'weekday_labels': WEEKDAY_LABELS,
+        'hours': range(24),
+    })
+
+@login_required
+def analytics_api(request):
+    """
+    API JSON analitik utilisasi (hanya staff)
+
+    Parameter: start, end (YYYY-MM-DD, inklusif), rooms=1,2 (opsional) dan
+    include_archive=1 untuk ikut menghitung booking yang sudah diarsipkan
+    (ringkasan harian dari rollup selalu mencakup arsip). Dengan summary=1 hanya ringkasan harian dari rollup yang dikembalikan.
+    """
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Hanya staff yang dapat mengakses analitik'}, status=403)
+    try:
+        start_date, end_date, room_ids = analytics_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': f'Parameter tidak valid: {str(e)}'}, status=400)
+    
+    summary = rollups.daily_summary(start_date, end_date, room_ids)
+    if request.GET.get('summary') == '1':
+        return JsonResponse(summary)
+    if not analytics.NUMPY_AVAILABLE:
+        return JsonResponse({'error': 'Analitik membutuhkan NumPy'}, status=503)
+    
+    report = analytics.room_utilization(
+        start_date, end_date, room_ids, include_archive=request.GET.get('include_archive') == '1'
+    )
+    report['daily'] = summary
+    return JsonResponse(report)
+
 # Import monitoring views
 from .monitoring import health_check, health_detailed, metrics